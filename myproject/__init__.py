@@ -1,5 +1,7 @@
 # Пакет myproject
 from . import scraper
 from . import saver
+from . import driver_pool
+from . import product
 
-__all__ = ['scraper', 'saver']
+__all__ = ['scraper', 'saver', 'driver_pool', 'product']
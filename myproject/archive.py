@@ -0,0 +1,274 @@
+# archive.py
+# Запись отрендеренных страниц и повторный разбор без браузера.
+#
+# scrape_section(..., archive=...) сохраняет итоговый HTML страницы после
+# подгрузки карточек вместе с метаданными. replay() разбирает архив заново
+# тем же extractor, параллельно на всех ядрах, не обращаясь к сайту.
+import argparse
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .extractor import extract_products
+
+try:
+    import zstandard
+except ImportError:  # необязательная зависимость: без нее записи сжимаются zlib
+    zstandard = None
+
+# Архив по умолчанию; рядом лежит индекс pages.archive.idx
+DEFAULT_PATH = Path(__file__).parent / "output" / "pages.archive"
+
+# Заголовок записи: метка, кодек, длина сжатых данных
+_HEADER = struct.Struct("<4sBI")
+_MAGIC = b"PGA1"
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+
+
+class PageArchive:
+    """
+    Архив страниц, в который записи только дописываются.
+
+    Каждая запись — заголовок (метка, кодек, длина) и сжатый JSON
+    {"url", "captured_at", ..., "html"}. Сжатие — zstd, если установлен
+    пакет zstandard, иначе zlib; кодек хранится в каждой записи, поэтому
+    архив читается при любом наборе пакетов (zstd-записи требуют zstandard).
+
+    Рядом ведется индекс <архив>.idx (JSON Lines: offset, size, url,
+    captured_at), по которому записи читаются без распаковки остальных.
+    Индекс дописывается после записи, поэтому при падении процесса теряется
+    не больше одной страницы: при следующем открытии недостающие целые записи
+    добавляются в индекс по самому архиву, а оборванный хвост отрезается.
+
+    Args:
+        path (str | Path): Файл архива.
+        level (int): Уровень сжатия (zstd 1-22, zlib 1-9).
+    """
+
+    def __init__(self, path=DEFAULT_PATH, level=3):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.level = level
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        self._lock = threading.Lock()
+        self._file = None
+        self._index = None
+
+    def append(self, url, html, **metadata):
+        """
+        Дописывает страницу в архив (потокобезопасно).
+
+        Args:
+            url (str): URL страницы.
+            html (str): Итоговый HTML (driver.page_source).
+            **metadata: Дополнительные поля (timings, title и т.п.), должны сериализоваться в JSON.
+
+        Returns:
+            int: Смещение записи в архиве.
+        """
+        captured_at = metadata.pop("captured_at", time.time())
+        record = {"url": url, "captured_at": captured_at, **metadata, "html": html}
+        payload = self._compress(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            if self._file is None:
+                self._open()
+            offset = self._file.tell()
+            self._file.write(_HEADER.pack(_MAGIC, self.codec, len(payload)) + payload)
+            self._file.flush()
+            self._index.write(json.dumps({"offset": offset, "size": _HEADER.size + len(payload), "url": url,
+                                          "captured_at": captured_at}, ensure_ascii=False) + "\n")
+            self._index.flush()
+        return offset
+
+    def entries(self):
+        """
+        Записи индекса по порядку: {"offset", "size", "url", "captured_at"}.
+
+        Целые записи после последней проиндексированной (процесс упал между
+        записью страницы и индекса) тоже возвращаются; файлы не изменяются.
+        """
+        entries, end, _ = self._read_index()
+        if self.path.exists() and self.path.stat().st_size > end:
+            with open(self.path, "rb") as f:
+                entries.extend(_scan(f, end, self.path.stat().st_size))
+        return entries
+
+    def read(self, offset):
+        """Читает запись по смещению из индекса."""
+        with open(self.path, "rb") as f:
+            return _read_record(f, offset)
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for entry in self.entries():
+                yield _read_record(f, entry["offset"])
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._index.close()
+                self._file = self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _compress(self, data):
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return zlib.compress(data, min(self.level, 9))
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._recover()
+        self._file = open(self.path, "ab")
+        self._index = open(self.index_path, "a", encoding="utf-8")
+
+    def _read_index(self):
+        """Returns: (записи индекса, конец последней записи в архиве, индекс не оборван)."""
+        entries = []
+        if not self.index_path.exists():
+            return entries, 0, True
+        with open(self.index_path, "rb") as f:
+            lines = f.read().split(b"\n")
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # пустая или недописанная строка
+        end = max((entry["offset"] + entry["size"] for entry in entries), default=0)
+        return entries, end, lines[-1] == b""
+
+    def _recover(self):
+        """Дописывает в индекс записи, которых в нем нет, и отрезает оборванную запись в конце архива."""
+        if not self.path.exists():
+            self.index_path.unlink(missing_ok=True)
+            return
+        _, end, complete = self._read_index()
+        size = self.path.stat().st_size
+        if end == size and complete:
+            return
+
+        with open(self.path, "r+b") as f:
+            recovered = list(_scan(f, end, size))
+            offset = recovered[-1]["offset"] + recovered[-1]["size"] if recovered else end
+            if offset < size:
+                print(f"Архив {self.path}: отрезана оборванная запись ({size - offset} байт)")
+                f.truncate(offset)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            if not complete:
+                f.write("\n")  # отделяем оборванную строку индекса
+            for entry in recovered:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if recovered:
+            print(f"Архив {self.path}: в индекс добавлено записей: {len(recovered)}")
+
+
+def _scan(f, offset, size):
+    """Записи индекса для целых записей архива начиная с offset (до первой оборванной)."""
+    while offset + _HEADER.size <= size:
+        f.seek(offset)
+        magic, codec, length = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or offset + _HEADER.size + length > size:
+            return
+        record = _read_record(f, offset)
+        yield {"offset": offset, "size": _HEADER.size + length, "url": record["url"],
+               "captured_at": record["captured_at"]}
+        offset += _HEADER.size + length
+
+
+def _read_record(f, offset):
+    f.seek(offset)
+    magic, codec, length = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC:
+        raise ValueError(f"Повреждена запись архива по смещению {offset}")
+    payload = f.read(length)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Запись сжата zstd: установите пакет zstandard")
+        data = zstandard.ZstdDecompressor().decompress(payload)
+    else:
+        data = zlib.decompress(payload)
+    return json.loads(data)
+
+
+def _replay_chunk(path, offsets):
+    """Выполняется в процессе пула: разбирает записи архива с указанными смещениями."""
+    results = []
+    with open(path, "rb") as f:
+        for offset in offsets:
+            record = _read_record(f, offset)
+            html = record.pop("html")
+            record["products"] = extract_products(html, base_url=record["url"])
+            results.append(record)
+    return results
+
+
+def replay(path=DEFAULT_PATH, workers=None, chunk_size=32):
+    """
+    Заново разбирает страницы архива без браузера, параллельно на всех ядрах.
+
+    Args:
+        path (str | Path | PageArchive): Архив страниц.
+        workers (int | None): Количество процессов (по умолчанию — число ядер).
+        chunk_size (int): Сколько записей разбирает процесс за одно задание.
+
+    Yields:
+        dict: Метаданные записи без html и "products" — list[Product], в порядке архива.
+    """
+    archive = path if isinstance(path, PageArchive) else PageArchive(path)
+    offsets = [entry["offset"] for entry in archive.entries()]
+    chunks = [offsets[i:i + chunk_size] for i in range(0, len(offsets), chunk_size)]
+    if not chunks:
+        return
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for records in executor.map(_replay_chunk, [str(archive.path)] * len(chunks), chunks):
+            yield from records
+
+
+def replay_products(path=DEFAULT_PATH, workers=None):
+    """
+    Товары всех страниц архива без дубликатов по URL, как после обхода.
+
+    Returns:
+        list[Product]: Товары в порядке страниц архива.
+    """
+    seen_urls = set()
+    results = []
+    for record in replay(path, workers=workers):
+        for item in record["products"]:
+            if item["url"] and item["url"] not in seen_urls:
+                seen_urls.add(item["url"])
+                results.append(item)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Повторный разбор архива отрендеренных страниц")
+    parser.add_argument("archive", nargs="?", default=str(DEFAULT_PATH), help="Файл архива")
+    parser.add_argument("--workers", type=int, default=None, help="Количество процессов")
+    parser.add_argument("--save", action="store_true", help="Сохранить товары через saver.save_all")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = replay_products(args.archive, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    pages = len(PageArchive(args.archive).entries())
+    print(f"Разобрано страниц: {pages}, товаров: {len(data)} за {elapsed:.2f} с "
+          f"({pages / elapsed if elapsed else 0:.0f} стр/с)")
+    if args.save:
+        from . import saver
+        saver.save_all(data)
+
+
+if __name__ == "__main__":
+    main()
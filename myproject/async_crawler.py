@@ -0,0 +1,171 @@
+# async_crawler.py
+import asyncio
+import aiohttp
+
+from .extractor import extract_page_count, extract_products
+from .http_engine import DEFAULT_HEADERS
+from .scraper import _merge_page, _page_url
+from .throttle import AsyncTokenBucket
+
+
+async def fetch_html(session, url, limiter, timeout=30):
+    """
+    Загружает страницу с учетом лимита запросов.
+
+    Returns:
+        str | None: HTML страницы или None при ошибке/таймауте.
+    """
+    await limiter.acquire()
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status != 200:
+                print(f"HTTP {response.status} для {url}")
+                return None
+            return await response.text()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Ошибка HTTP запроса {url}: {e!r}")
+        return None
+
+
+async def scrape_all_pages_async(base_url="https://www.divan.ru/category/svet?sort=0", max_pages=50,
+                                 rps=2.0, max_in_flight=4, timeout=30, session=None, limiter=None):
+    """
+    Асинхронно обходит страницы раздела и отдает товары по мере загрузки страниц.
+
+    Сначала загружается первая страница: если на ней найдено количество страниц,
+    запрашиваются только нужные страницы. Дальше одновременно выполняется не
+    больше max_in_flight запросов, общий темп ограничивается token bucket.
+    Страницы отдаются по порядку номеров, ответы, пришедшие раньше, ждут в буфере.
+    Пустая страница или страница, все товары которой уже были, считается концом
+    раздела: страницы после нее больше не запрашиваются, а уже запущенные отменяются.
+    Ошибка загрузки или разбора страницы печатается, страница пропускается.
+
+    Args:
+        base_url (str): Базовый URL раздела без параметра page.
+        max_pages (int): Максимальное количество страниц.
+        rps (float): Лимит запросов в секунду (если limiter не передан).
+        max_in_flight (int): Максимум одновременных запросов.
+        timeout (float): Таймаут одного запроса в секундах.
+        session (aiohttp.ClientSession | None): Общая сессия, например для нескольких разделов.
+        limiter (AsyncTokenBucket | None): Общий лимитер для нескольких разделов.
+
+    Yields:
+        tuple[int, list[Product]]: Номер страницы и ее новые товары (без дубликатов
+                                по URL с ранее отданными страницами).
+    """
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(headers=DEFAULT_HEADERS)
+    if limiter is None:
+        limiter = AsyncTokenBucket(rps)
+
+    async def load(page):
+        url = _page_url(base_url, page)
+        html = await fetch_html(session, url, limiter, timeout)
+        if html is None:
+            return page, None, None  # ошибка загрузки: страница пропускается
+        try:
+            results = extract_products(html, base_url=url)
+            page_count = extract_page_count(html, per_page=len(results)) if page == 0 else None
+        except Exception as e:
+            print(f"Ошибка при разборе страницы {page}: {e}")
+            return page, None, None
+        return page, results, page_count
+
+    seen_urls = set()
+    tasks = {}
+    finished = {}  # загруженные страницы, которые ждут отдачи по порядку
+    next_page = 0
+    next_yield = 0
+    end_page = max_pages  # страница, на которой обход заканчивается (не включительно)
+    planned = False  # первая страница загружена, количество страниц известно (или не найдено)
+    try:
+        while True:
+            window = max_in_flight if planned else 1
+            while len(tasks) < window and next_page < end_page:
+                tasks[asyncio.create_task(load(next_page))] = next_page
+                next_page += 1
+            if not tasks:
+                break
+
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task not in tasks:
+                    continue  # снята вместе со страницами за концом раздела
+                tasks.pop(task)
+                page, results, page_count = task.result()
+                if page == 0:
+                    planned = True
+                    if page_count:
+                        end_page = min(page_count, max_pages)
+                        print(f"В разделе {page_count} страниц, планируем обход {end_page} страниц.")
+                if page < end_page:
+                    finished[page] = results
+
+            # Конец раздела решает первая по номеру пустая страница, а не первая пришедшая
+            while next_yield in finished:
+                page, results = next_yield, finished.pop(next_yield)
+                next_yield += 1
+                if results is None:
+                    print(f"Страница {page} не загружена, пропускаем.")
+                    continue
+
+                new_results, keep_going = _merge_page(page, results, seen_urls)
+                if new_results:
+                    yield page, new_results
+                if not keep_going:
+                    end_page = page + 1
+                    # Отменяем запросы к страницам за концом раздела
+                    for pending, pending_page in list(tasks.items()):
+                        if pending_page >= end_page:
+                            pending.cancel()
+                            tasks.pop(pending)
+                    finished.clear()
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if own_session:
+            await session.close()
+
+
+async def crawl_categories_async(base_urls, max_pages=50, rps=2.0, max_in_flight=8, timeout=30):
+    """
+    Обходит несколько разделов в одном процессе с общим лимитом запросов.
+
+    Все разделы используют одну сессию (пул соединений) и один token bucket,
+    поэтому общий темп к сайту не превышает rps.
+
+    Yields:
+        tuple[str, int, list[Product]]: URL раздела, номер страницы и новые товары.
+    """
+    limiter = AsyncTokenBucket(rps)
+    queue = asyncio.Queue()
+    done_marker = object()
+    per_category = max(1, max_in_flight // max(1, len(base_urls)))
+
+    async with aiohttp.ClientSession(headers=DEFAULT_HEADERS) as session:
+        async def pump(base_url):
+            try:
+                async for page, records in scrape_all_pages_async(
+                        base_url, max_pages=max_pages, max_in_flight=per_category,
+                        timeout=timeout, session=session, limiter=limiter):
+                    await queue.put((base_url, page, records))
+            finally:
+                await queue.put(done_marker)
+
+        pumps = [asyncio.create_task(pump(url)) for url in base_urls]
+        try:
+            remaining = len(pumps)
+            while remaining:
+                item = await queue.get()
+                if item is done_marker:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in pumps:
+                task.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
@@ -0,0 +1,370 @@
+# benchmark.py
+# Бенчмарки обхода на локальной копии сайта (replay_server.ReplaySite).
+#
+# Каждый сценарий запускается в отдельном процессе: так пиковая память (RSS)
+# относится только к нему, а Scrapy получает свежий reactor. Результаты
+# пишутся в JSON и сравниваются с прошлым прогоном (--baseline) в CI:
+#
+#     python -m myproject.benchmark --cases scrape_all_pages_http,async_crawler,light_spider \
+#         --pages 30 --eager 24 --baseline benchmark_baseline.json --relative-to async_crawler --tolerance 0.3
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .replay_server import ReplaySite
+
+DEFAULT_OUTPUT = Path(__file__).parent / "output" / "benchmark.json"
+
+# Сценарии по порядку; первые два запускают браузер
+CASES = ("scrape_section", "scrape_all_pages", "scrape_all_pages_http", "async_crawler", "light_spider")
+
+# Параметры локального сайта по умолчанию: половина карточек подгружается при прокрутке
+SITE_OPTIONS = {"categories": ["svet"], "page_count": 10, "per_page": 24, "eager": 12, "latency": 0.02}
+
+
+class _Timer:
+    """Обертка функции, запоминающая длительность каждого вызова (длительность загрузки страницы)."""
+
+    def __init__(self):
+        self.latencies = []
+
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+        return timed
+
+    def wrap_async(self, func):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+        return timed
+
+
+def _case_scrape_section(url, options, timer):
+    from . import scraper
+    from .driver_pool import DriverPool
+
+    # Один браузер на все страницы: измеряется загрузка и разбор страницы, а не запуск браузера
+    section = timer.wrap(scraper.scrape_section)
+    products = 0
+    with DriverPool(size=1, headless=True) as pool:
+        for page in range(options["pages"]):
+            products += len(section(scraper._page_url(url, page), headless=True, pool=pool))
+    return products
+
+
+def _case_scrape_all_pages(url, options, timer):
+    from . import scraper
+
+    scraper.scrape_section = timer.wrap(scraper.scrape_section)
+    return len(scraper.scrape_all_pages(url, headless=True, max_pages=options["max_pages"],
+                                        delay_between_pages=0, workers=options["workers"]))
+
+
+def _case_scrape_all_pages_http(url, options, timer):
+    from . import scraper
+
+    # Без браузера (min_cards=0): подгружаемые при прокрутке карточки не видны,
+    # и compare() отметит неполный результат
+    scraper.scrape_page_http = timer.wrap(scraper.scrape_page_http)
+    return len(scraper.scrape_all_pages(url, engine="http", max_pages=options["max_pages"], min_cards=0,
+                                        delay_between_pages=0, workers=options["workers"]))
+
+
+def _case_async_crawler(url, options, timer):
+    from . import async_crawler
+
+    async_crawler.fetch_html = timer.wrap_async(async_crawler.fetch_html)
+
+    async def crawl():
+        products = 0
+        async for page, items in async_crawler.scrape_all_pages_async(
+                url, max_pages=options["max_pages"], rps=1000, max_in_flight=options["workers"]):
+            products += len(items)
+        return products
+
+    return asyncio.run(crawl())
+
+
+def _case_light_spider(url, options, timer):
+    from scrapy import signals
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.settings import Settings
+
+    from .myproject import settings as project_settings
+    from .myproject.spiders.light_spider import LightSpider
+
+    settings = Settings()
+    settings.setmodule(project_settings, priority="project")
+    # Без темпа, кэша и записи файлов: измеряется сам обход
+    settings.setdict({
+        "SPIDER_MODULES": [],
+        "ROBOTSTXT_OBEY": False,
+        "AUTOTHROTTLE_ENABLED": False,
+        "DOWNLOAD_DELAY": 0,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": options["workers"],
+        "DOWNLOADER_MIDDLEWARES": {},
+        "ITEM_PIPELINES": {},
+        "TELNETCONSOLE_ENABLED": False,
+        "LOG_LEVEL": "INFO" if options["verbose"] else "WARNING",
+    }, priority="cmdline")
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(LightSpider)
+
+    def response_received(response, **kwargs):
+        timer.latencies.append(response.meta["download_latency"])
+
+    # Сигналы держат обработчик по слабой ссылке: функция живет, пока идет обход
+    crawler.signals.connect(response_received, signal=signals.response_received)
+    process.crawl(crawler, categories=url, allowed_domains=[urlsplit(url).hostname],
+                  max_pages=options["max_pages"])
+    process.start()
+    return crawler.stats.get_value("item_scraped_count", 0)
+
+
+_CASE_FUNCTIONS = {
+    "scrape_section": _case_scrape_section,
+    "scrape_all_pages": _case_scrape_all_pages,
+    "scrape_all_pages_http": _case_scrape_all_pages_http,
+    "async_crawler": _case_async_crawler,
+    "light_spider": _case_light_spider,
+}
+
+
+def _run_case(name, url, options, results):
+    """Выполняется в дочернем процессе: запускает сценарий и кладет итог в очередь results."""
+    if not options["verbose"]:
+        sys.stdout = open(os.devnull, "w", encoding="utf-8")
+    timer = _Timer()
+    start = time.perf_counter()
+    try:
+        products = _CASE_FUNCTIONS[name](url, options, timer)
+    except Exception as e:
+        results.put({"case": name, "error": f"{type(e).__name__}: {e}"})
+        return
+    if not products:
+        # Например, браузер не запустился: scrape_section возвращает пустой список
+        results.put({"case": name, "error": "не получено ни одного товара"})
+        return
+    results.put(summarize(name, time.perf_counter() - start, timer.latencies, products, _peak_rss_mb()))
+
+
+def summarize(name, seconds, latencies, products, peak_rss_mb=None):
+    """Итог сценария: скорость, перцентили задержки страниц (мс) и пиковая память (МБ)."""
+    pages = len(latencies)
+    return {
+        "case": name,
+        "pages": pages,
+        "products": products,
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(pages / seconds, 2) if seconds else None,
+        "products_per_sec": round(products / seconds, 2) if seconds else None,
+        "latency_p50_ms": _percentile(latencies, 0.50),
+        "latency_p95_ms": _percentile(latencies, 0.95),
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+def _percentile(values, fraction):
+    """Перцентиль по ближайшему рангу, в миллисекундах."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)] * 1000, 1)
+
+
+def _peak_rss_mb():
+    """Пиковая память текущего процесса в МБ (None, если платформа не сообщает)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS — байты
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_benchmarks(cases=CASES, output=DEFAULT_OUTPUT, site_options=None, workers=4, max_pages=50,
+                   timeout=600, verbose=False):
+    """
+    Запускает сценарии против локального сайта и пишет результаты в JSON.
+
+    Args:
+        cases (Iterable[str]): Сценарии из CASES.
+        output (str | Path | None): Файл результатов. None — не сохранять.
+        site_options (dict | None): Параметры ReplaySite (по умолчанию SITE_OPTIONS).
+        workers (int): Параллельность: браузеры, потоки или одновременные запросы.
+        max_pages (int): Ограничение страниц раздела для обходов.
+        timeout (float): Максимальное время одного сценария в секундах.
+        verbose (bool): Показывать вывод парсеров.
+
+    Returns:
+        dict: Отчет {"created_at", "python", "platform", "site", "results": [...]};
+              у сценария, который не удалось выполнить (например, нет браузера), — поле error.
+    """
+    site_options = {**SITE_OPTIONS, **(site_options or {})}
+    options = {"workers": workers, "max_pages": max_pages, "pages": site_options["page_count"], "verbose": verbose}
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with ReplaySite(**site_options) as site:
+        url = site.category_url(site.categories[0])
+        for name in cases:
+            if name not in _CASE_FUNCTIONS:
+                raise ValueError(f"Неизвестный сценарий: {name!r} (ожидается один из {', '.join(CASES)})")
+            print(f"Бенчмарк {name}...")
+            channel = context.Queue()
+            process = context.Process(target=_run_case, args=(name, url, options, channel))
+            process.start()
+            try:
+                result = channel.get(timeout=timeout)
+            except queue.Empty:
+                result = {"case": name, "error": f"не завершился за {timeout} с"}
+                process.terminate()
+            process.join()
+            results.append(result)
+            print(_format(result))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "site": {key: value for key, value in site_options.items() if key != "recording"},
+        "workers": workers,
+        "max_pages": max_pages,
+        "results": results,
+    }
+    if output is not None:
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Результаты сохранены: {output.absolute()}")
+    return report
+
+
+def compare(report, baseline, tolerance=0.2, relative_to=None):
+    """
+    Сравнивает отчет с прошлым прогоном.
+
+    Регрессия — сценарий завершился с ошибкой; собрал не все страницы и товары
+    локального сайта (страниц min(page_count, max_pages), на каждой per_page
+    карточек) или не столько же товаров, сколько в baseline; скорость страниц
+    упала больше чем на tolerance, либо p95 задержки или пиковая память выросли
+    больше чем на tolerance.
+
+    С relative_to сравнивается только скорость страниц в долях от сценария
+    relative_to того же прогона: так baseline, снятый на другой машине, годится
+    для CI. p95 по нескольким десяткам страниц и память между машинами не
+    сравниваются — они шумят сильнее допуска.
+
+    Returns:
+        list[str]: Описания регрессий (пустой список — регрессий нет).
+    """
+    previous = {result["case"]: result for result in baseline["results"] if "error" not in result}
+    regressions = []
+    for result in report["results"]:
+        if "error" in result:
+            regressions.append(f"{result['case']}: ошибка — {result['error']}")
+            continue
+        regressions.extend(_check_complete(result, report.get("site"), report.get("max_pages")))
+        old = previous.get(result["case"])
+        if old is None:
+            continue
+        if old["products"] != result["products"]:
+            regressions.append(f"{result['case']}: products {old['products']} -> {result['products']}")
+        if relative_to is None:
+            checks = (("pages_per_sec", -1), ("latency_p95_ms", 1), ("peak_rss_mb", 1))
+            new_metrics, old_metrics = result, old
+        else:
+            checks = (("pages_per_sec", -1),)
+            new_metrics, old_metrics = _relative(report, result, relative_to), _relative(baseline, old, relative_to)
+        for metric, direction in checks:
+            new_value, old_value = new_metrics.get(metric), old_metrics.get(metric)
+            if not new_value or not old_value:
+                continue
+            change = (new_value - old_value) / old_value * direction
+            if change > tolerance:
+                regressions.append(f"{result['case']}: {metric} {old_value} -> {new_value}")
+    return regressions
+
+
+def _check_complete(result, site, max_pages):
+    """Сценарий собрал все страницы раздела и все карточки на них."""
+    if not site:
+        return []
+    pages = site["page_count"] if max_pages is None else min(site["page_count"], max_pages)
+    problems = []
+    if result["products"] != pages * site["per_page"]:
+        problems.append(f"{result['case']}: собрано {result['products']} товаров из {pages * site['per_page']}")
+    if result["pages"] < pages:
+        problems.append(f"{result['case']}: загружено {result['pages']} страниц из {pages}")
+    return problems
+
+
+def _relative(report, result, relative_to):
+    """Скорость страниц сценария в долях от сценария relative_to того же прогона."""
+    reference = next((item for item in report["results"]
+                      if item["case"] == relative_to and "error" not in item), None)
+    value, base = result.get("pages_per_sec"), reference and reference.get("pages_per_sec")
+    return {"pages_per_sec": round(value / base, 3) if value and base else None}
+
+
+def _format(result):
+    if "error" in result:
+        return f"  {result['case']}: ошибка — {result['error']}"
+    return (f"  {result['case']}: {result['pages']} стр., {result['products']} товаров за {result['seconds']} с | "
+            f"{result['pages_per_sec']} стр/с, {result['products_per_sec']} товаров/с | "
+            f"p50 {result['latency_p50_ms']} мс, p95 {result['latency_p95_ms']} мс | RSS {result['peak_rss_mb']} МБ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки обхода на локальной копии divan.ru")
+    parser.add_argument("--cases", default=",".join(CASES), help="Сценарии через запятую")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Файл результатов (JSON)")
+    parser.add_argument("--baseline", default=None, help="Прошлые результаты для поиска регрессий")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимое ухудшение (0.2 = 20%%)")
+    parser.add_argument("--relative-to", default=None,
+                        help="Сравнивать только скорость страниц в долях от этого сценария")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=SITE_OPTIONS["page_count"], help="Страниц в разделе")
+    parser.add_argument("--per-page", type=int, default=SITE_OPTIONS["per_page"], help="Карточек на странице")
+    parser.add_argument("--eager", type=int, default=SITE_OPTIONS["eager"], help="Карточек в HTML до прокрутки")
+    parser.add_argument("--latency", type=float, default=SITE_OPTIONS["latency"], help="Задержка сервера, секунд")
+    parser.add_argument("--recording", default=None, help="Записанная страница раздела с карточками")
+    parser.add_argument("--verbose", action="store_true", help="Показывать вывод парсеров")
+    args = parser.parse_args()
+
+    site_options = {"page_count": args.pages, "per_page": args.per_page, "eager": args.eager,
+                    "latency": args.latency, "recording": args.recording}
+    report = run_benchmarks(args.cases.split(","), args.output, site_options, workers=args.workers,
+                            verbose=args.verbose)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.relative_to)
+        for regression in regressions:
+            print(f"РЕГРЕССИЯ {regression}")
+        if regressions:
+            sys.exit(1)
+        print("Регрессий нет.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# blocking.py
+import json
+import threading
+
+# Шаблоны для Network.setBlockedURLs (поддерживается только wildcard «*»)
+IMAGE_PATTERNS = ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"]
+FONT_PATTERNS = ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"]
+MEDIA_PATTERNS = ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"]
+ANALYTICS_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*mc.yandex.ru*",
+    "*yandex.ru/metrika*",
+    "*top-fwz1.mail.ru*",
+    "*vk.com/rtrg*",
+    "*facebook.net*",
+    "*criteo.*",
+    "*hotjar.com*",
+]
+
+
+class BlockingProfile:
+    """
+    Профиль блокировки ресурсов для рендеринга страниц.
+
+    Блокировка выполняется средствами Chrome DevTools Protocol
+    (Network.setBlockedURLs): заблокированные запросы браузер даже не отправляет.
+    Счетчики заблокированных и загруженных запросов собираются из журнала
+    производительности драйвера.
+
+    Args:
+        images, fonts, media, analytics (bool): Какие группы ресурсов блокировать.
+        deny (list[str]): Дополнительные шаблоны URL для блокировки.
+        allow (list[str]): Шаблоны, которые нужно исключить из блокировки
+                           (например, "*.svg*", если иконки нужны для разбора).
+    """
+
+    def __init__(self, images=True, fonts=True, media=True, analytics=True, deny=(), allow=()):
+        patterns = []
+        if images:
+            patterns += IMAGE_PATTERNS
+        if fonts:
+            patterns += FONT_PATTERNS
+        if media:
+            patterns += MEDIA_PATTERNS
+        if analytics:
+            patterns += ANALYTICS_PATTERNS
+        patterns += list(deny)
+        allowed = set(allow)
+        self.patterns = [p for p in dict.fromkeys(patterns) if p not in allowed]
+        self.stats = {"blocked_requests": 0, "allowed_requests": 0, "allowed_bytes": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def resolve(cls, blocking):
+        """True — профиль по умолчанию, False/None — без блокировки, иначе профиль как есть."""
+        if blocking is True:
+            return cls()
+        if not blocking:
+            return None
+        return blocking
+
+    def configure_options(self, options):
+        """Включает журнал производительности, из которого считаются счетчики."""
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    def apply(self, driver):
+        """Включает блокировку в уже запущенном браузере."""
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+
+    def collect_stats(self, driver):
+        """
+        Разбирает накопившийся журнал производительности драйвера и обновляет счетчики.
+
+        Размер заблокированных ответов неизвестен (они не загружались), поэтому
+        для них считается только количество запросов.
+        """
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return self.stats
+        blocked = allowed = allowed_bytes = 0
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.loadingFailed" and params.get("blockedReason"):
+                blocked += 1
+            elif method == "Network.loadingFinished":
+                allowed += 1
+                allowed_bytes += int(params.get("encodedDataLength", 0))
+        with self._lock:
+            self.stats["blocked_requests"] += blocked
+            self.stats["allowed_requests"] += allowed
+            self.stats["allowed_bytes"] += allowed_bytes
+        return self.stats
+
+    def summary(self):
+        """Строка со счетчиками для вывода в лог."""
+        return (f"заблокировано запросов: {self.stats['blocked_requests']}, "
+                f"загружено: {self.stats['allowed_requests']} "
+                f"({self.stats['allowed_bytes'] / 1024:.0f} КБ)")
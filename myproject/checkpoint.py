@@ -0,0 +1,108 @@
+# checkpoint.py
+import json
+import os
+from pathlib import Path
+
+# Файл контрольной точки по умолчанию
+DEFAULT_PATH = Path(__file__).parent / "output" / "checkpoint.jsonl"
+
+
+class CheckpointStore:
+    """
+    Контрольные точки обхода раздела в формате JSON Lines.
+
+    Каждая завершенная страница дописывается в файл одной строкой и сразу
+    сбрасывается на диск (flush + fsync). Строка, оборванная при падении
+    процесса, при чтении просто игнорируется, поэтому файл всегда содержит
+    целые страницы.
+
+    Формат строк:
+        {"base_url": ...}                      — заголовок обхода
+        {"page": N, "records": [...]}          — новые товары страницы N
+        {"page_count": N}                      — количество страниц раздела
+        {"finished": true}                     — обход завершен
+
+    Args:
+        path (str | Path): Путь к файлу контрольной точки.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._file = None
+
+    def load(self, base_url):
+        """
+        Читает контрольную точку обхода base_url.
+
+        Returns:
+            dict | None: {"pages": {N: records}, "page_count": int | None},
+                         или None, если продолжать нечего (нет файла, другой раздел,
+                         обход уже завершен).
+        """
+        if not self.path.exists():
+            return None
+        pages = {}
+        page_count = None
+        header = None
+        finished = False
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # недописанная строка после падения
+                if "base_url" in entry:
+                    header = entry["base_url"]
+                elif "page" in entry:
+                    pages[entry["page"]] = entry["records"]
+                elif "page_count" in entry:
+                    page_count = entry["page_count"]
+                elif entry.get("finished"):
+                    finished = True
+        if header != base_url:
+            print(f"Контрольная точка относится к другому разделу ({header}), начинаем заново.")
+            return None
+        if finished:
+            print("Предыдущий обход завершен, начинаем заново.")
+            return None
+        return {"pages": pages, "page_count": page_count}
+
+    def start(self, base_url, resume=False):
+        """Открывает файл для дозаписи; без resume начинает новую контрольную точку."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            torn = False
+            with open(self.path, "rb") as f:
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                # Отделяем оборванную строку, чтобы новая запись не склеилась с ней
+                self._file.write("\n")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append({"base_url": base_url})
+
+    def append_page(self, page, records):
+        self._append({"page": page, "records": records})
+
+    def set_page_count(self, page_count):
+        self._append({"page_count": page_count})
+
+    def finish(self):
+        """Отмечает обход завершенным и закрывает файл."""
+        self._append({"finished": True})
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, entry):
+        # Строка пишется одним вызовом write, чтобы при падении терялась только она.
+        # default=dict: товары Product сериализуются как словари
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=dict) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
@@ -0,0 +1,153 @@
+# delta.py
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .http_cache import normalize_url
+
+# Индекс прошлого обхода: канонический URL -> хэш содержимого товара
+DEFAULT_INDEX = Path(__file__).parent / "output" / "snapshot_index.json"
+
+# Каталог файлов изменений delta_<время>.jsonl
+DEFAULT_DELTA_DIR = Path(__file__).parent / "output"
+
+# Поля, изменение которых считается изменением товара
+CONTENT_FIELDS = ("name", "price", "currency", "instock_text", "instock_schema")
+
+
+def content_hash(item):
+    """Короткий хэш полей CONTENT_FIELDS товара (16 hex-символов)."""
+    content = "\x1f".join(str(item.get(field, "")) for field in CONTENT_FIELDS)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SnapshotIndex:
+    """
+    Компактный индекс прошлого обхода: для каждого товара хранится только
+    хэш его содержимого, а не сам товар.
+
+    Args:
+        path (str | Path): Файл индекса (JSON).
+    """
+
+    def __init__(self, path=DEFAULT_INDEX):
+        self.path = Path(path)
+        self.hashes = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.hashes = json.load(f)
+
+    def diff(self, records, full=True):
+        """
+        Сравнивает товары текущего обхода с индексом и обновляет индекс в памяти.
+
+        Args:
+            records (Iterable[dict]): Товары текущего обхода.
+            full (bool): Обход покрыл весь раздел. Только тогда товары, которых
+                         нет в обходе, считаются удаленными.
+
+        Yields:
+            dict: События {"event": "added" | "changed", "record": товар}
+                  и {"event": "removed", "url": url}.
+        """
+        previous = self.hashes
+        current = {}
+        for item in records:
+            url = normalize_url(item["url"])
+            digest = content_hash(item)
+            current[url] = digest
+            old = previous.get(url)
+            if old is None:
+                yield {"event": "added", "record": item}
+            elif old != digest:
+                yield {"event": "changed", "record": item}
+
+        if full:
+            for url in previous.keys() - current.keys():
+                yield {"event": "removed", "url": url}
+        else:
+            # Непросмотренные товары остаются в индексе как были
+            current = {**previous, **current}
+        self.hashes = current
+
+    def save(self):
+        """Атомарно записывает индекс: при падении остается прежняя версия файла."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.hashes, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+
+class Changes(dict):
+    """
+    Количество событий added / changed / removed и индекс текущего обхода.
+
+    Пока не вызван commit(), индекс на диске остается от прошлого обхода:
+    если сохранение результатов упадет, следующий запуск снова увидит те же изменения.
+    """
+
+    def __init__(self, index, counts):
+        super().__init__(counts)
+        self.index = index
+
+    def commit(self):
+        """Записывает индекс текущего обхода (после того как результаты сохранены)."""
+        self.index.save()
+
+
+def detect_changes(records, index_path=DEFAULT_INDEX, delta_dir=DEFAULT_DELTA_DIR, full=True, commit=True):
+    """
+    Находит изменения относительно прошлого обхода и пишет их в delta_<время>.jsonl.
+
+    Файл изменений создается, только если что-то изменилось, поэтому
+    потребителям достаточно обработать новые delta-файлы.
+
+    Args:
+        records (Iterable[dict]): Товары текущего обхода.
+        index_path (str | Path): Файл индекса прошлого обхода.
+        delta_dir (str | Path): Каталог для файлов изменений.
+        full (bool): Обход покрыл весь раздел (см. SnapshotIndex.diff).
+        commit (bool): Сразу записать индекс. False — индекс записывается вызовом
+                       commit() у результата, когда результаты обхода сохранены.
+
+    Returns:
+        Changes: Количество событий added / changed / removed (как dict[str, int]);
+                 все нули — изменений нет.
+    """
+    index = SnapshotIndex(index_path)
+    counts = {"added": 0, "changed": 0, "removed": 0}
+    delta_path = _delta_path(Path(delta_dir))
+    f = None
+    try:
+        for event in index.diff(records, full=full):
+            if f is None:
+                delta_path.parent.mkdir(parents=True, exist_ok=True)
+                f = open(delta_path, "w", encoding="utf-8")
+            f.write(json.dumps(event, ensure_ascii=False, default=dict) + "\n")
+            counts[event["event"]] += 1
+    finally:
+        if f is not None:
+            f.close()
+    changes = Changes(index, counts)
+    if commit:
+        changes.commit()
+
+    if any(counts.values()):
+        print(f"Изменения: добавлено {counts['added']}, изменено {counts['changed']}, "
+              f"удалено {counts['removed']} -> {delta_path.absolute()}")
+    else:
+        print("Изменений с прошлого обхода нет.")
+    return changes
+
+
+def _delta_path(delta_dir):
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    path = delta_dir / f"delta_{stamp}.jsonl"
+    suffix = 1
+    while path.exists():  # несколько запусков в одну секунду
+        suffix += 1
+        path = delta_dir / f"delta_{stamp}_{suffix}.jsonl"
+    return path
@@ -0,0 +1,229 @@
+# driver_pool.py
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from contextlib import contextmanager
+import queue
+import threading
+import time
+
+# Путь к браузеру Brave
+BRAVE_PATH = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+def build_options(headless=False, blocking=None):
+    """Собирает настройки браузера, общие для всех драйверов."""
+    options = Options()
+    options.binary_location = BRAVE_PATH
+
+    # Добавляем User-Agent, режим инкогнито и очистку кэша для избежания блокировки
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    options.add_argument("--incognito")
+    options.add_argument("--disable-cache")
+
+    # Оптимизация для ускорения загрузки
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    if headless:
+        options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+
+    # Используем eager для более быстрой загрузки (не ждем всех ресурсов)
+    options.page_load_strategy = 'eager'
+
+    if blocking is not None:
+        blocking.configure_options(options)
+    return options
+
+
+def create_driver(headless=False, timeout=60, blocking=None):
+    """
+    Запускает новый экземпляр браузера.
+
+    Сначала пробует chromedriver.exe из папки проекта, затем системный драйвер.
+    Если передан профиль blocking (BlockingProfile), включает блокировку ресурсов.
+    """
+    options = build_options(headless, blocking)
+    print("Инициализация ChromeDriver...")
+    try:
+        service = Service("chromedriver.exe")  # драйвер лежит в папке проекта
+        driver = webdriver.Chrome(service=service, options=options)
+    except Exception as e:
+        print(f"Ошибка при запуске chromedriver.exe: {e}")
+        print("Пробуем использовать системный ChromeDriver...")
+        driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(timeout)
+    if blocking is not None:
+        try:
+            blocking.apply(driver)
+        except Exception as e:
+            print(f"Не удалось включить блокировку ресурсов: {e}")
+    return driver
+
+
+class DriverPool:
+    """
+    Пул «прогретых» браузеров, которые переиспользуются между страницами.
+
+    Драйвер берется через acquire() (или контекстный менеджер driver()) и
+    возвращается через release(). Перед выдачей драйвер проверяется на
+    работоспособность, а после max_pages_per_driver страниц или превышения
+    max_memory_mb (JS heap страницы) пересоздается.
+
+    Args:
+        size (int): Максимальное количество одновременно открытых браузеров.
+        headless (bool): Запускать браузеры в headless режиме.
+        timeout (int): Таймаут загрузки страницы в секундах.
+        max_pages_per_driver (int): Через сколько страниц драйвер пересоздается.
+        max_memory_mb (int | None): Порог памяти JS heap в МБ, None — без проверки.
+        blocking (BlockingProfile | None): Профиль блокировки ресурсов для всех браузеров пула.
+    """
+
+    def __init__(self, size=1, headless=False, timeout=60, max_pages_per_driver=20, max_memory_mb=None,
+                 blocking=None):
+        self.size = max(1, size)
+        self.headless = headless
+        self.timeout = timeout
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_memory_mb = max_memory_mb
+        self.blocking = blocking
+        self._idle = queue.LifoQueue()  # LIFO: чаще берем самый «теплый» драйвер
+        self._pages = {}  # id(driver) -> количество обработанных страниц
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, timeout=None):
+        """
+        Возвращает рабочий драйвер, при необходимости запуская новый.
+
+        Args:
+            timeout (float | None): Сколько секунд ждать, если все драйверы заняты.
+                                    None — ждать без ограничения.
+
+        Raises:
+            TimeoutError: Ни один драйвер не освободился за timeout секунд.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        driver = create_driver(self.headless, self.timeout, self.blocking)
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    self._pages[id(driver)] = 0
+                    return driver
+                # Все драйверы заняты — ждем, пока какой-нибудь освободится или закроется
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    driver = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError(f"Нет свободного драйвера в пуле за {timeout} с") from None
+
+            if driver is None:
+                continue  # драйвер закрыт — в пуле освободилось место для нового
+            if self._is_healthy(driver):
+                return driver
+            print("Драйвер не отвечает, пересоздаем...")
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        """
+        Возвращает драйвер в пул.
+
+        Args:
+            driver: Драйвер, полученный через acquire().
+            broken (bool): True, если при работе возникла ошибка WebDriver —
+                           такой драйвер закрывается, а не переиспользуется.
+        """
+        pages = self._pages.get(id(driver), 0) + 1
+        self._pages[id(driver)] = pages
+
+        if self._closed or broken:
+            self._discard(driver)
+        elif self.max_pages_per_driver and pages >= self.max_pages_per_driver:
+            print(f"Драйвер обработал {pages} страниц, пересоздаем...")
+            self._discard(driver)
+        elif self.max_memory_mb and self._memory_mb(driver) > self.max_memory_mb:
+            print(f"Драйвер превысил порог памяти {self.max_memory_mb} МБ, пересоздаем...")
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        """Контекстный менеджер: with pool.driver() as driver: ..."""
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        """Закрывает все свободные драйверы пула."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        with self._lock:
+            self._created -= 1
+        if not self._closed:
+            # Будим поток, ожидающий в acquire(): он запустит драйвер на освободившееся место
+            self._idle.put(None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass  # Игнорируем ошибки при закрытии драйвера
+        except Exception as e:
+            print(f"Ошибка при закрытии драйвера: {e}")
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _memory_mb(driver):
+        try:
+            used = driver.execute_script(
+                "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0")
+            return (used or 0) / (1024 * 1024)
+        except Exception:
+            return 0
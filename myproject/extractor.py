@@ -0,0 +1,227 @@
+# extractor.py
+# Извлечение товаров из готового HTML без браузера.
+#
+# Используется и Selenium-парсером (driver.page_source), и Scrapy-пауком
+# (response.text), а также для повторного разбора сохраненных страниц.
+# Модуль не импортирует ничего из пакета, чтобы его можно было подключить
+# и как myproject.extractor, и как extractor (из каталога Scrapy-проекта).
+import math
+import re
+from urllib.parse import parse_qs, urljoin, urlsplit
+from cssselect import HTMLTranslator
+from lxml import etree, html as lxml_html
+
+try:
+    from .product import NO_DATA, Product
+except ImportError:
+    from product import NO_DATA, Product  # extractor подключен как модуль верхнего уровня
+
+BASE_URL = "https://www.divan.ru"
+
+# Преобразование кода валюты в читаемый формат
+CURRENCY_MAP = {"RUB": "руб.", "USD": "$", "EUR": "€"}
+
+_translator = HTMLTranslator()
+
+
+def _css(selector, prefix="descendant-or-self::"):
+    """Компилирует CSS-селектор в XPath один раз при импорте модуля."""
+    return etree.XPath(_translator.css_to_xpath(selector, prefix=prefix))
+
+
+# Карточки товаров: тот же порядок поиска, что и в scraper._EXTRACT_CARDS_JS
+_CARD_SELECTORS = [
+    _css("div.ProductCardMain_card__KQzzn"),
+    _css('div[itemtype="http://schema.org/Product"]'),
+    _css("div.ProductCard"),
+]
+
+_URL = _css('link[itemprop="url"]', prefix="descendant::")
+_NAME = _css('div[itemprop="name"]', prefix="descendant::")
+_PRICE_TEXT = _css('span[data-testid="price"]', prefix="descendant::")
+_PRICE_META = _css('meta[itemprop="price"]', prefix="descendant::")
+_CURRENCY_META = _css('meta[itemprop="priceCurrency"]', prefix="descendant::")
+_CURRENCY_SPAN = etree.XPath('descendant::span[contains(@class, "ui-XXdez")]')
+_INSTOCK = _css("div.MainInfo_count__MmnNN", prefix="descendant::")
+_AVAILABILITY = _css('link[itemprop="availability"]', prefix="descendant::")
+
+# Признаки общего количества страниц/товаров раздела
+_PAGE_LINKS = etree.XPath('//a[contains(@href, "page=")]/@href')
+_STATE_PAGES = re.compile(r'"(?:totalPages|pagesCount|pageCount|lastPage)"\s*:\s*(\d+)')
+_STATE_TOTAL = re.compile(r'"(?:totalCount|productsCount|productCount)"\s*:\s*(\d+)')
+_COUNT_LABEL = re.compile(r'(\d[\d\s\u00a0]*)\s+товар', re.IGNORECASE)
+
+# Ссылки на разделы каталога в меню сайта
+_CATEGORY_LINKS = etree.XPath('//a[contains(@href, "/category/")]/@href')
+
+
+def _text(element):
+    """Текст элемента без лишних пробелов и переносов строк."""
+    return " ".join(element.text_content().split())
+
+
+def _first(xpath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def parse_card(card, base_url=BASE_URL):
+    """
+    Извлекает поля одной карточки товара.
+
+    Args:
+        card: Элемент lxml с карточкой товара.
+        base_url (str): URL страницы для построения абсолютных ссылок.
+
+    Returns:
+        Product | None: Данные товара или None, если у карточки нет ссылки.
+    """
+    link = _first(_URL, card)
+    href = link.get("href") if link is not None else None
+    if not href:
+        return None
+
+    name_elem = _first(_NAME, card)
+    name = _text(name_elem) if name_elem is not None else ""
+
+    # Цена: отображаемый текст, иначе значение из микроразметки
+    price_elem = _first(_PRICE_TEXT, card)
+    price = _text(price_elem) if price_elem is not None else ""
+    if not price:
+        meta = _first(_PRICE_META, card)
+        price = meta.get("content", "") if meta is not None else ""
+
+    # Валюта: meta[itemprop=priceCurrency] -> span.ui-XXdez -> "нет данных"
+    currency = NO_DATA
+    meta = _first(_CURRENCY_META, card)
+    if meta is not None:
+        code = meta.get("content")
+        currency = CURRENCY_MAP.get(code, code) if code else NO_DATA
+    else:
+        span = _first(_CURRENCY_SPAN, price_elem) if price_elem is not None else None
+        if span is None:
+            span = _first(_CURRENCY_SPAN, card)
+        if span is not None:
+            currency = _text(span) or NO_DATA
+
+    instock_elem = _first(_INSTOCK, card)
+    availability = _first(_AVAILABILITY, card)
+
+    return Product(
+        name=name or NO_DATA,
+        price=price or NO_DATA,
+        currency=currency,
+        url=urljoin(base_url, href),
+        instock_text=(_text(instock_elem) if instock_elem is not None else "") or NO_DATA,
+        instock_schema=(availability.get("href") if availability is not None else None) or NO_DATA,
+    )
+
+
+def find_cards(document):
+    """Возвращает элементы карточек товаров первым сработавшим селектором."""
+    for selector in _CARD_SELECTORS:
+        cards = selector(document)
+        if cards:
+            return cards
+    return []
+
+
+def extract_products(html, base_url=BASE_URL):
+    """
+    Извлекает товары из HTML-страницы раздела.
+
+    Args:
+        html (str | bytes): Исходный код страницы (driver.page_source,
+                            response.text или сохраненный файл).
+        base_url (str): URL страницы для построения абсолютных ссылок.
+
+    Returns:
+        list[Product]: Товары без дубликатов по URL, в порядке появления на странице.
+    """
+    if not html:
+        return []
+    document = lxml_html.fromstring(html)
+    results = []
+    seen_urls = set()
+    for card in find_cards(document):
+        record = parse_card(card, base_url)
+        if record is None or record["url"] in seen_urls:
+            continue
+        seen_urls.add(record["url"])
+        results.append(record)
+    return results
+
+
+def extract_from_response(response):
+    """Извлекает товары из Scrapy-ответа."""
+    return extract_products(response.text, base_url=response.url)
+
+
+def extract_page_count(html, per_page=None):
+    """
+    Определяет количество страниц раздела по первой странице.
+
+    Источники, по порядку: встроенное состояние страницы (totalPages и т.п.),
+    ссылки пагинации (?page=N, нумерация с 0), подпись с количеством товаров
+    («123 товара») вместе с числом карточек на странице per_page.
+
+    Args:
+        html (str | bytes): HTML первой страницы раздела.
+        per_page (int | None): Количество карточек на первой странице.
+
+    Returns:
+        int | None: Количество страниц или None, если определить не удалось.
+    """
+    if not html:
+        return None
+    text = html.decode("utf-8", "ignore") if isinstance(html, bytes) else html
+
+    pages = [int(value) for value in _STATE_PAGES.findall(text)]
+    if pages and max(pages) > 0:
+        return max(pages)
+
+    document = lxml_html.fromstring(html)
+    numbers = []
+    for href in _PAGE_LINKS(document):
+        for value in parse_qs(urlsplit(href).query).get("page", []):
+            if value.isdigit():
+                numbers.append(int(value))
+    if numbers:
+        return max(numbers) + 1
+
+    if per_page:
+        totals = [int(value) for value in _STATE_TOTAL.findall(text)]
+        label = _COUNT_LABEL.search(" ".join(document.text_content().split()))
+        if label:
+            totals.append(int(re.sub(r"\D", "", label.group(1))))
+        totals = [total for total in totals if total > 0]
+        if totals:
+            return math.ceil(max(totals) / per_page)
+    return None
+
+
+def extract_categories(html, base_url=BASE_URL):
+    """
+    Находит разделы каталога по ссылкам /category/... в меню страницы.
+
+    Args:
+        html (str | bytes): HTML главной страницы (или любой страницы с меню).
+        base_url (str): URL страницы для построения абсолютных ссылок.
+
+    Returns:
+        list[str]: URL разделов без параметров, без дубликатов, в порядке меню.
+                   Ссылки на другие сайты отбрасываются.
+    """
+    if not html:
+        return []
+    document = lxml_html.fromstring(html)
+    host = urlsplit(base_url).netloc
+    categories = []
+    for href in _CATEGORY_LINKS(document):
+        parts = urlsplit(urljoin(base_url, href.strip()))
+        if parts.netloc != host:
+            continue
+        url = f"{parts.scheme}://{parts.netloc}{parts.path.rstrip('/')}"
+        if url not in categories:
+            categories.append(url)
+    return categories
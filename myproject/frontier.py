@@ -0,0 +1,286 @@
+# frontier.py
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from . import scraper
+from .blocking import BlockingProfile
+from .checkpoint import CheckpointStore
+from .driver_pool import DriverPool
+from .extractor import BASE_URL, extract_categories
+from .http_cache import ResponseCache, normalize_url
+from .http_engine import HttpFetcher
+from .throttle import HostRateLimiter
+
+# Когда каждый раздел последний раз был обойден полностью
+DEFAULT_STATE = Path(__file__).parent / "output" / "frontier_state.json"
+
+# Контрольные точки разделов для resume=True: <хэш URL раздела>.jsonl
+DEFAULT_CHECKPOINT_DIR = Path(__file__).parent / "output" / "frontier_checkpoints"
+
+# Разделы по умолчанию: (URL, важность). Используются, если в меню сайта ничего не нашлось.
+DEFAULT_CATEGORIES = [
+    ("https://www.divan.ru/category/svet", 2.0),
+    ("https://www.divan.ru/category/lamp", 1.0),
+]
+
+
+class Category:
+    """
+    Раздел каталога в очереди обхода.
+
+    Args:
+        url (str): Базовый URL раздела без параметра page.
+        weight (float): Важность раздела (множитель приоритета).
+        crawled_at (float | None): Время последнего полного обхода (time.time()).
+    """
+
+    def __init__(self, url, weight=1.0, crawled_at=None):
+        self.url = url
+        self.weight = weight
+        self.crawled_at = crawled_at
+        self.score = 0.0
+        self.pages = 0
+        self.products = 0
+        self.complete = False  # все страницы раздела обойдены в этом запуске
+
+    def priority(self, now):
+        """Важность * давность обновления; раздел, который еще не обходили, идет первым."""
+        if self.crawled_at is None:
+            return float("inf")
+        return self.weight * max(now - self.crawled_at, 0.0)
+
+
+def discover_categories(url=BASE_URL, fetcher=None):
+    """
+    Находит разделы каталога в меню страницы сайта.
+
+    Args:
+        url (str): Страница с меню (по умолчанию главная).
+        fetcher (HttpFetcher | None): HTTP-клиент. Если не передан, создается на один запрос.
+
+    Returns:
+        list[str]: URL разделов в порядке меню (пустой список, если страница не загрузилась).
+    """
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = HttpFetcher(pool_size=1)
+    try:
+        html = fetcher.fetch(url)
+    finally:
+        if own_fetcher:
+            fetcher.close()
+    categories = extract_categories(html, base_url=url)
+    print(f"В меню {url} найдено разделов: {len(categories)}")
+    return categories
+
+
+class Frontier:
+    """
+    Обход нескольких разделов каталога по приоритету с бюджетом времени.
+
+    Первыми обходятся разделы с наибольшим приоритетом: важность раздела *
+    время с последнего полного обхода (новые разделы — раньше всех). Каждый
+    раздел обходится через scraper.iter_pages — с тем же планированием
+    страниц, остановкой на пустой странице или странице из одних дубликатов,
+    контрольными точками и архивом, что и scrape_all_pages. Браузеры, кэш и
+    архив общие для всех разделов.
+
+    Товар, встречающийся в нескольких разделах, отдается только из первого.
+    Запросы к каждому хосту ограничены max_rps_per_host. Когда бюджет времени
+    исчерпан, новые страницы не загружаются; разделы, которые не успели обойти,
+    остаются «старыми» и в следующий раз идут первыми, а с resume=True
+    продолжаются с контрольной точки.
+
+    Args:
+        categories (Iterable[str | tuple[str, float]] | None): URL разделов или пары
+                   (URL, важность). None — найти разделы в меню главной страницы.
+        engine (str): "http" или "selenium", как в scraper.scrape_all_pages.
+        headless (bool): Режим браузера для engine="selenium" и fallback.
+        workers (int): Количество страниц раздела, загружаемых одновременно.
+        max_rps_per_host (float | None): Запросов в секунду к одному хосту.
+        budget (float | None): Бюджет времени на обход в секундах. None — без ограничения.
+        max_pages (int): Максимальное количество страниц одного раздела.
+        min_cards (int | None): Порог карточек для перехода на Selenium в режиме
+                   engine="http" (None — по первой странице раздела, см. scrape_all_pages).
+        blocking (bool | BlockingProfile): Блокировка ресурсов в браузерах пула.
+        cache (bool | ResponseCache | None): Дисковый кэш ответов для engine="http".
+        resume (bool): Продолжать разделы, не обойденные до конца в прошлый раз,
+                   с контрольной точки (по файлу на раздел в checkpoint_dir).
+        checkpoint_dir (str | Path): Каталог контрольных точек разделов.
+        archive (bool | str | Path | PageArchive | None): Архив страниц, как в scrape_all_pages.
+        state_path (str | Path): Файл со временем последнего обхода разделов.
+    """
+
+    def __init__(self, categories=None, engine="http", headless=True, workers=2, max_rps_per_host=1 / 3,
+                 budget=None, max_pages=50, min_cards=None, blocking=True, cache=None, resume=False,
+                 checkpoint_dir=DEFAULT_CHECKPOINT_DIR, archive=None, state_path=DEFAULT_STATE):
+        if engine not in ("selenium", "http"):
+            raise ValueError(f"Неизвестный engine: {engine!r} (ожидается 'selenium' или 'http')")
+        self.categories = categories
+        self.engine = engine
+        self.headless = headless
+        self.workers = max(workers, 1)
+        self.limiter = HostRateLimiter(max_rps_per_host)
+        self.budget = budget
+        self.max_pages = max_pages
+        self.min_cards = min_cards
+        self.blocking = blocking
+        self.cache = cache
+        self.resume = resume
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.archive = archive
+        self.state_path = Path(state_path)
+        self.complete = False
+        self.unfinished = []
+
+    def crawl(self, sinks=(), collect=True):
+        """
+        Обходит разделы в порядке приоритета, пока не кончатся разделы или бюджет времени.
+
+        Args:
+            sinks (list[saver.Sink]): Потоковые записи, как в scrape_all_pages.
+            collect (bool): Если False, товары не накапливаются в памяти.
+
+        Returns:
+            list[Product]: Товары всех разделов без дубликатов. После вызова
+                           complete — все разделы обойдены полностью, unfinished —
+                           URL разделов, которые не успели или не смогли обойти.
+        """
+        started = time.monotonic()
+        deadline = started + self.budget if self.budget else None
+        state = self._load_state()
+        all_results = []
+        seen_urls = set()
+        total = 0
+        categories = []
+
+        pool = DriverPool(size=self.workers, headless=self.headless,
+                          blocking=BlockingProfile.resolve(self.blocking))
+        own_cache = self.cache is True
+        cache = ResponseCache() if own_cache else self.cache
+        archive = self.archive
+        own_archive = False
+        if archive:
+            # Импорт здесь, как в scraper.iter_pages
+            from .archive import PageArchive
+
+            own_archive = not isinstance(archive, PageArchive)
+            if own_archive:
+                archive = PageArchive() if archive is True else PageArchive(archive)
+        for sink in sinks:
+            sink.open()
+        try:
+            categories = self._prepare(state)
+            for category in categories:
+                if _expired(deadline):
+                    break
+                for records in self._crawl_category(category, deadline, pool, cache, archive or None, seen_urls):
+                    for sink in sinks:
+                        sink.write_batch(records)
+                    if collect:
+                        all_results.extend(records)
+                    total += len(records)
+                if category.complete:
+                    category.crawled_at = time.time()
+                    state[normalize_url(category.url)] = {"crawled_at": category.crawled_at,
+                                                          "pages": category.pages, "products": category.products}
+                    print(f"Раздел обойден: {category.url} (страниц {category.pages}, "
+                          f"новых товаров {category.products})")
+        finally:
+            self._save_state(state)
+            for sink in sinks:
+                sink.close()
+            if own_cache:
+                cache.close()
+            if own_archive:
+                archive.close()
+            pool.close()
+
+        self.unfinished = [category.url for category in categories if not category.complete]
+        self.complete = not self.unfinished
+        print(f"\nОбход каталога за {time.monotonic() - started:.0f} с: разделов {len(categories)}, "
+              f"товаров {total}, не успели обойти: {len(self.unfinished)}")
+        return all_results
+
+    def _crawl_category(self, category, deadline, pool, cache, archive, seen_urls):
+        """
+        Обходит раздел через scraper.iter_pages, пока не кончатся страницы или время.
+
+        Yields:
+            list[Product]: Товары страницы, которых не было в предыдущих разделах.
+        """
+        print(f"\n=== Раздел {category.url} ===")
+        checkpoint = self._checkpoint(category) if self.resume else None
+        pages = scraper.iter_pages(category.url, headless=self.headless, max_pages=self.max_pages,
+                                   delay_between_pages=0, pool=pool, workers=self.workers,
+                                   blocking=self.blocking, engine=self.engine, min_cards=self.min_cards,
+                                   resume=self.resume, checkpoint=checkpoint, cache=cache or None,
+                                   archive=archive, limiter=self.limiter.for_host(category.url))
+        try:
+            while not _expired(deadline):
+                try:
+                    page, records = next(pages)
+                except StopIteration:
+                    category.complete = True
+                    return
+                category.pages += 1
+                new_results = []
+                for item in records:
+                    if item["url"] not in seen_urls:
+                        seen_urls.add(item["url"])
+                        new_results.append(item)
+                category.products += len(new_results)
+                if new_results:
+                    yield new_results
+            print(f"Бюджет времени исчерпан, раздел {category.url} не обойден до конца.")
+        except Exception as e:
+            print(f"Ошибка при обходе раздела {category.url}: {e}")
+        finally:
+            pages.close()
+
+    def _checkpoint(self, category):
+        """Контрольная точка раздела: отдельный файл на каждый раздел."""
+        name = hashlib.blake2b(normalize_url(category.url).encode("utf-8"), digest_size=8).hexdigest()
+        return CheckpointStore(self.checkpoint_dir / f"{name}.jsonl")
+
+    def _prepare(self, state):
+        """Собирает разделы без дубликатов и вычисляет их приоритет."""
+        entries = self.categories
+        if entries is None:
+            entries = discover_categories() or DEFAULT_CATEGORIES
+        categories = {}
+        for entry in entries:
+            url, weight = (entry, 1.0) if isinstance(entry, str) else entry
+            key = normalize_url(url)
+            if key in categories:
+                categories[key].weight = max(categories[key].weight, weight)
+                continue
+            categories[key] = Category(url, weight, state.get(key, {}).get("crawled_at"))
+
+        now = time.time()
+        for category in categories.values():
+            category.score = category.priority(now)
+        ordered = sorted(categories.values(), key=lambda c: (-c.score, -c.weight))
+        print("Очередь разделов: " + ", ".join(category.url for category in ordered))
+        return ordered
+
+    def _load_state(self):
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state):
+        """Атомарно записывает состояние: при падении остается прежняя версия файла."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+
+def _expired(deadline):
+    return deadline is not None and time.monotonic() >= deadline
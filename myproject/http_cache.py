@@ -0,0 +1,199 @@
+# http_cache.py
+# Дисковый кэш HTTP-ответов для HttpFetcher и Scrapy (middlewares.ResponseCacheMiddleware).
+#
+# Модуль не импортирует ничего из пакета, чтобы его можно было подключить
+# и как myproject.http_cache, и как http_cache (из каталога Scrapy-проекта).
+import codecs
+import fnmatch
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import charset_normalizer
+except ImportError:  # необязательная зависимость (ставится вместе с requests)
+    charset_normalizer = None
+
+# Каталог кэша по умолчанию
+DEFAULT_DIR = Path(__file__).parent / "output" / "http_cache"
+
+# Параметры, которые не влияют на содержимое страницы
+IGNORED_PARAMS = ("utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "yclid", "gclid")
+
+# Заголовки ответа, которые сохраняются вместе с телом
+STORED_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+
+def normalize_url(url):
+    """
+    Приводит URL к каноническому виду для ключа кэша: схема и хост в нижнем
+    регистре, параметры отсортированы, метки рекламы и фрагмент отброшены.
+    """
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in IGNORED_PARAMS)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def _known_encoding(name):
+    try:
+        return codecs.lookup(name).name if name else None
+    except LookupError:
+        return None
+
+
+class CachedResponse:
+    """Ответ из кэша: статус, сохраненные заголовки, тело, кодировка и признак свежести."""
+
+    def __init__(self, url, status, headers, body, fresh, encoding=None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.fresh = fresh
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        """
+        Тело в виде строки. Кодировка: сохраненная с ответом, затем charset из
+        Content-Type, затем определенная по содержимому (как apparent_encoding
+        в requests), в крайнем случае UTF-8.
+        """
+        encoding = _known_encoding(self.encoding)
+        if encoding is None:
+            match = _CHARSET.search(self.headers.get("content-type", ""))
+            encoding = _known_encoding(match.group(1) if match else None)
+        if encoding is None and charset_normalizer is not None:
+            best = charset_normalizer.from_bytes(self.body).best()
+            encoding = _known_encoding(best.encoding if best else None)
+        return self.body.decode(encoding or "utf-8", "replace")
+
+    def conditional_headers(self):
+        """Заголовки для условного запроса (ответ 304, если страница не изменилась)."""
+        headers = {}
+        if self.headers.get("etag"):
+            headers["If-None-Match"] = self.headers["etag"]
+        if self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+
+class ResponseCache:
+    """
+    Кэш HTTP-ответов на диске.
+
+    Тела ответов хранятся сжатыми (zlib) в SQLite вместе с заголовками.
+    Свежесть определяется TTL по шаблону URL; устаревшие записи не удаляются,
+    а перепроверяются условным запросом (ETag / Last-Modified). При превышении
+    max_bytes удаляются записи, к которым дольше всего не обращались (LRU).
+
+    Args:
+        directory (str | Path): Каталог кэша.
+        max_bytes (int): Бюджет на сжатые тела ответов.
+        default_ttl (float): Время жизни записи в секундах.
+        ttl_rules (list[tuple[str, float]]): Пары (шаблон URL в стиле fnmatch, TTL),
+                                             первое совпадение побеждает.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=200 * 1024 * 1024, default_ttl=3600, ttl_rules=()):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_rules = list(ttl_rules)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.directory / "responses.sqlite", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                encoding TEXT
+            )""")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+        if "encoding" not in columns:  # кэш, созданный до появления колонки
+            self._db.execute("ALTER TABLE responses ADD COLUMN encoding TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    def ttl_for(self, url):
+        for pattern, ttl in self.ttl_rules:
+            if fnmatch.fnmatch(url, pattern):
+                return ttl
+        return self.default_ttl
+
+    def get(self, url):
+        """
+        Returns:
+            CachedResponse | None: Запись кэша (свежая или требующая перепроверки).
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, stored_at, encoding FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        status, headers, body, stored_at, encoding = row
+        fresh = time.time() - stored_at < self.ttl_for(url)
+        return CachedResponse(url, status, json.loads(headers), zlib.decompress(body), fresh, encoding)
+
+    def store(self, url, status, headers, body, encoding=None):
+        """
+        Сохраняет ответ. headers — любой словарь заголовков (регистр не важен),
+        encoding — кодировка тела (response.encoding), если она известна.
+        """
+        if isinstance(body, str):
+            body = body.encode(encoding or "utf-8")
+        kept = {name.lower(): value for name, value in headers.items() if name.lower() in STORED_HEADERS}
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, body, size, stored_at, accessed_at, encoding) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), status, json.dumps(kept), compressed, len(compressed), now, now, encoding))
+            self._evict()
+            self._db.commit()
+
+    def touch(self, url):
+        """Продлевает свежесть записи после ответа 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                             (now, now, normalize_url(url)))
+            self._db.commit()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
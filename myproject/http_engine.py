@@ -0,0 +1,125 @@
+# http_engine.py
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .driver_pool import USER_AGENT
+from .extractor import extract_page_count, extract_products
+
+try:
+    import brotli  # noqa: F401  — urllib3 сам распаковывает br, если пакет установлен
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.5",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+
+class HttpFetcher:
+    """
+    Загрузка страниц без браузера через общий пул keep-alive соединений.
+
+    Args:
+        pool_size (int): Размер пула соединений на хост (не меньше числа потоков).
+        timeout (float): Таймаут запроса в секундах.
+        retries (int): Количество повторов при ошибках соединения и ответах 429/5xx.
+        headers (dict | None): Дополнительные заголовки запросов.
+        cache (ResponseCache | None): Дисковый кэш ответов. Свежие страницы берутся
+                                      из кэша, устаревшие перепроверяются по ETag/Last-Modified.
+    """
+
+    def __init__(self, pool_size=10, timeout=30, retries=2, headers=None, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        retry = Retry(total=retries, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET", "HEAD"), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url):
+        """
+        Загружает страницу.
+
+        Returns:
+            str | None: HTML страницы или None, если запрос не удался.
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and cached.fresh:
+            return cached.text
+
+        headers = cached.conditional_headers() if cached is not None else {}
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException as e:
+            print(f"Ошибка HTTP запроса {url}: {e}")
+            return None
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(url)
+            return cached.text
+        if response.status_code != 200:
+            print(f"HTTP {response.status_code} для {url}")
+            return None
+        if self.cache is not None:
+            self.cache.store(url, response.status_code, response.headers, response.content,
+                             encoding=response.encoding or response.apparent_encoding)
+        return response.text
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def scrape_page_http(url, fetcher, min_cards=1, fallback=None, page_info=None, archive=None):
+    """
+    Парсит страницу раздела без браузера, при необходимости переключаясь на Selenium.
+
+    Args:
+        url (str): URL страницы.
+        fetcher (HttpFetcher): Клиент с пулом соединений.
+        min_cards (int): Если в статическом HTML найдено меньше карточек,
+                         страница отдается fallback.
+        fallback (callable | None): Функция fallback(url) -> list[Product], обычно
+                                    scrape_section с пулом браузеров. page_info
+                                    передается ей, только если он запрошен.
+        page_info (dict | None): Если передан, в него записывается page_count —
+                                 количество страниц раздела (или None).
+        archive (PageArchive | None): Архив страниц: HTML записывается, если страница
+                                      разобрана без браузера (иначе ее запишет fallback).
+
+    Returns:
+        list[Product]: Список товаров страницы.
+    """
+    started = time.perf_counter()
+    html = fetcher.fetch(url)
+    fetched = time.perf_counter()
+    results = extract_products(html, base_url=url) if html else []
+    if len(results) >= min_cards or fallback is None:
+        print(f"HTTP: найдено товаров {len(results)} на {url}")
+        if page_info is not None:
+            page_info["page_count"] = extract_page_count(html, per_page=len(results))
+        if archive is not None and html:
+            archive.append(url, html, final_url=url, products=len(results),
+                           timings={"load": round(fetched - started, 3),
+                                    "extract": round(time.perf_counter() - fetched, 3)})
+        return results
+    print(f"HTTP: найдено {len(results)} карточек (меньше {min_cards}), загружаем через браузер...")
+    if page_info is None:
+        return fallback(url)
+    return fallback(url, page_info=page_info)
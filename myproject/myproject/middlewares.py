@@ -5,9 +5,16 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
+from scrapy.http import HtmlResponse
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+
+try:
+    from myproject.http_cache import ResponseCache  # запуск из корня репозитория
+except ImportError:
+    from http_cache import ResponseCache  # scrapy crawl из каталога myproject/
 
 
 class MyprojectSpiderMiddleware:
@@ -99,3 +106,125 @@ class MyprojectDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ResponseCacheMiddleware:
+    """
+    Дисковый кэш ответов (http_cache.ResponseCache) для Scrapy.
+
+    Свежий ответ возвращается из кэша без запроса к сайту. Для устаревшего
+    добавляются заголовки If-None-Match / If-Modified-Since, и на ответ 304
+    отдается сохраненное тело.
+
+    Настройки:
+        RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_DIR, RESPONSE_CACHE_MAX_BYTES,
+        RESPONSE_CACHE_TTL, RESPONSE_CACHE_TTL_RULES
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("RESPONSE_CACHE_ENABLED"):
+            raise NotConfigured
+        cache = ResponseCache(
+            directory=settings.get("RESPONSE_CACHE_DIR", ".scrapy/response_cache"),
+            max_bytes=settings.getint("RESPONSE_CACHE_MAX_BYTES", 200 * 1024 * 1024),
+            default_ttl=settings.getfloat("RESPONSE_CACHE_TTL", 3600),
+            ttl_rules=settings.getlist("RESPONSE_CACHE_TTL_RULES", []),
+        )
+        s = cls(cache)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def process_request(self, request, spider):
+        if request.method != "GET":
+            return None
+        cached = self.cache.get(request.url)
+        if cached is None:
+            return None
+        if cached.fresh:
+            return self._build_response(request, cached)
+        request.meta["response_cache_entry"] = cached
+        for name, value in cached.conditional_headers().items():
+            request.headers.setdefault(name, value)
+        return None
+
+    def process_response(self, request, response, spider):
+        if request.method != "GET" or "cached" in response.flags:
+            return response
+        cached = request.meta.get("response_cache_entry")
+        if response.status == 304 and cached is not None:
+            self.cache.touch(request.url)
+            return self._build_response(request, cached)
+        if response.status == 200:
+            headers = {k.decode(): response.headers.get(k).decode("latin-1") for k in response.headers.keys()}
+            self.cache.store(request.url, response.status, headers, response.body,
+                             encoding=getattr(response, "encoding", None))
+        return response
+
+    def spider_closed(self, spider):
+        self.cache.close()
+
+    @staticmethod
+    def _build_response(request, cached):
+        headers = {k.title(): v for k, v in cached.headers.items()}
+        return HtmlResponse(url=request.url, status=cached.status, headers=headers, body=cached.body,
+                            encoding=cached.encoding, request=request, flags=["cached"])
+
+
+class BackoffMiddleware:
+    """
+    Замедление при ответах 429/5xx в дополнение к AutoThrottle.
+
+    AutoThrottle подстраивает задержку только по времени ответа и не реагирует
+    на 429 Too Many Requests. Этот middleware при таком ответе удваивает задержку
+    слота загрузки (не меньше Retry-After и не больше AUTOTHROTTLE_MAX_DELAY),
+    а запрос повторяет RetryMiddleware. Пока сервер отвечает быстро, AutoThrottle
+    снова уменьшает задержку.
+
+    Настройки:
+        BACKOFF_HTTP_CODES, BACKOFF_MIN_DELAY, AUTOTHROTTLE_MAX_DELAY
+    """
+
+    def __init__(self, crawler, codes, min_delay, max_delay):
+        self.crawler = crawler
+        self.codes = set(codes)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            crawler,
+            codes=[int(code) for code in settings.getlist("BACKOFF_HTTP_CODES", [429, 500, 502, 503, 504])],
+            min_delay=settings.getfloat("BACKOFF_MIN_DELAY", 1.0),
+            max_delay=settings.getfloat("AUTOTHROTTLE_MAX_DELAY", 60.0),
+        )
+
+    def process_response(self, request, response, spider):
+        if response.status not in self.codes:
+            return response
+        slot = self._slot(request)
+        if slot is not None:
+            delay = max(slot.delay * 2, self.min_delay, self._retry_after(response))
+            slot.delay = min(delay, self.max_delay)
+            spider.logger.info(f"HTTP {response.status} для {request.url}, задержка {slot.delay:.1f} с")
+        return response
+
+    def _slot(self, request):
+        key = request.meta.get("download_slot")
+        if key is None or self.crawler.engine is None:
+            return None
+        return self.crawler.engine.downloader.slots.get(key)
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After")
+        try:
+            return float(value.decode())
+        except (AttributeError, ValueError):
+            return 0.0  # нет заголовка или дата вместо секунд
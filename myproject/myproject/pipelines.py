@@ -8,53 +8,95 @@
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
-import pandas as pd
-import json, csv, os
+from pathlib import Path
 
-OUTPUT_DIR = "output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+from .items import MyprojectItem
+
+try:
+    from myproject import saver  # запуск из корня репозитория
+except ImportError:
+    import saver  # scrapy crawl из каталога myproject/
+
+# Поля товара: отсутствующие в item записываются пустыми, порядок колонок — как в saver.save_all
+FIELDS = list(MyprojectItem.fields)
+
+# Форматы по умолчанию (ключи saver.SINKS)
+FORMATS = ("csv", "json", "jsonl", "xlsx", "html")
 
 
 class MyprojectPipeline:
     def process_item(self, item, spider):
         return item
 
-OUTPUT_DIR = "output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
 
 class SavePipeline:
-    def open_spider(self, spider):
-        self.data = []
+    """
+    Потоковое сохранение товаров через sink-и saver (те же файлы, что и у save_all).
 
-    def close_spider(self, spider):
-        # Сохраняем в CSV
-        csv_path = os.path.join(OUTPUT_DIR, "results.csv")
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["name", "price", "link"])
-            writer.writeheader()
-            writer.writerows(self.data)
-
-        # Сохраняем в JSON
-        json_path = os.path.join(OUTPUT_DIR, "results.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
-
-        # Сохраняем в XLSX
-        xlsx_path = os.path.join(OUTPUT_DIR, "results.xlsx")
-        df = pd.DataFrame(self.data)
-        df.to_excel(xlsx_path, index=False)
-
-        # Сохраняем HTML
-        html_path = os.path.join(OUTPUT_DIR, "results.html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write("<html><body><h1>Результаты парсинга</h1><table border='1'>")
-            f.write("<tr><th>Название</th><th>Цена</th><th>Ссылка</th></tr>")
-            for row in self.data:
-                f.write(f"<tr><td>{row['name']}</td><td>{row['price']}</td><td>{row['currency']}</td><td><a href='{row['url']}'>{row['url']}</a><td>{row['instock_text']}</td></td></tr>")
-            f.write("</table></body></html>")
+    Sink-и открываются в open_spider, товары копятся пачками по SAVE_FLUSH_EVERY
+    и передаются всем sink-ам, после каждой пачки буферы сбрасываются на диск.
+    Память не зависит от размера обхода, а при аварийной остановке теряется
+    не больше одной пачки.
+
+    Настройки:
+        SAVE_OUTPUT_DIR: Каталог результатов (по умолчанию saver.OUTPUT_DIR).
+        SAVE_FORMATS: Список форматов из saver.SINKS.
+        SAVE_FLUSH_EVERY: Размер пачки товаров.
+    """
+
+    def __init__(self, output_dir=None, formats=FORMATS, flush_every=100):
+        self.output_dir = Path(output_dir) if output_dir else saver.OUTPUT_DIR
+        self.formats = list(formats)
+        self.flush_every = max(flush_every, 1)
+        self.sinks = []
+        self.batch = []
+        self.count = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            output_dir=settings.get("SAVE_OUTPUT_DIR"),
+            formats=settings.getlist("SAVE_FORMATS") or FORMATS,
+            flush_every=settings.getint("SAVE_FLUSH_EVERY", 100),
+        )
+
+    def open_spider(self, spider):
+        for name in self.formats:
+            sink_class = saver.SINKS[name]
+            # Абсолютный путь: sink пишет в него, а не в saver.OUTPUT_DIR
+            sink = sink_class(filename=str(self.output_dir.absolute() / sink_class.default_filename))
+            sink.open()
+            self.sinks.append(sink)
 
     def process_item(self, item, spider):
-        self.data.append(dict(item))
+        record = dict.fromkeys(FIELDS)
+        record.update(ItemAdapter(item).asdict())
+        self.batch.append(record)
+        self.count += 1
+        if len(self.batch) >= self.flush_every:
+            self._write_batch()
         return item
 
+    def close_spider(self, spider):
+        errors = []
+        try:
+            self._write_batch()
+        except Exception as e:
+            errors.append(e)
+        for sink in self.sinks:
+            # Каждый sink закрывается, даже если другой упал
+            try:
+                sink.close()
+            except Exception as e:
+                errors.append(e)
+                spider.logger.error(f"Не удалось завершить {sink.filepath}: {e}")
+        self.sinks = []
+        spider.logger.info(f"Сохранено товаров: {self.count} в {self.output_dir.absolute()}")
+        if errors:
+            raise errors[0]
+
+    def _write_batch(self):
+        batch, self.batch = self.batch, []
+        for sink in self.sinks:
+            sink.write_batch(batch)
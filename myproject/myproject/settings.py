@@ -24,9 +24,16 @@ ADDONS = {}
 ROBOTSTXT_OBEY = True
 
 # Concurrency and throttling settings
+# Потолок параллельности: фактический темп подбирает AutoThrottle (см. ниже)
 #CONCURRENT_REQUESTS = 16
-CONCURRENT_REQUESTS_PER_DOMAIN = 1
-DOWNLOAD_DELAY = 1
+CONCURRENT_REQUESTS_PER_DOMAIN = 8
+# Минимальная задержка между запросами к домену, ниже нее AutoThrottle не опускается
+DOWNLOAD_DELAY = 0.25
+
+# 429 тоже повторяем: перед повтором BackoffMiddleware увеличивает задержку
+RETRY_ENABLED = True
+RETRY_TIMES = 3
+RETRY_HTTP_CODES = [429, 500, 502, 503, 504, 522, 524, 408]
 
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
@@ -51,6 +58,10 @@ DOWNLOAD_DELAY = 1
 #DOWNLOADER_MIDDLEWARES = {
 #    "myproject.middlewares.MyprojectDownloaderMiddleware": 543,
 #}
+DOWNLOADER_MIDDLEWARES = {
+    "myproject.middlewares.ResponseCacheMiddleware": 580,  # после распаковки gzip (590)
+    "myproject.middlewares.BackoffMiddleware": 560,  # видит 429/5xx раньше RetryMiddleware (550)
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -81,6 +92,16 @@ ITEM_PIPELINES = {
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
+# Пока сервер отвечает быстро, задержка снижается до DOWNLOAD_DELAY и параллельно
+# идет до AUTOTHROTTLE_TARGET_CONCURRENCY запросов; при росте задержки ответа или
+# ответах 429/5xx (BackoffMiddleware) темп снижается
+AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_START_DELAY = 1.0
+AUTOTHROTTLE_MAX_DELAY = 30.0
+AUTOTHROTTLE_TARGET_CONCURRENCY = 4.0
+BACKOFF_HTTP_CODES = [429, 500, 502, 503, 504]
+BACKOFF_MIN_DELAY = 2.0
+
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
 #HTTPCACHE_ENABLED = True
@@ -89,5 +110,17 @@ ITEM_PIPELINES = {
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
+# Кэш ответов с перепроверкой по ETag/Last-Modified и LRU-вытеснением
+# (общий с HttpFetcher, см. http_cache.py). По умолчанию выключен: в пределах
+# TTL цены и наличие отдаются из кэша. Для разработки: -s RESPONSE_CACHE_ENABLED=True
+RESPONSE_CACHE_ENABLED = False
+RESPONSE_CACHE_DIR = ".scrapy/response_cache"
+RESPONSE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+RESPONSE_CACHE_TTL = 3600
+# Пары (шаблон URL, TTL в секундах), первое совпадение побеждает
+RESPONSE_CACHE_TTL_RULES = [
+    ("*/product/*", 24 * 3600),
+]
+
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
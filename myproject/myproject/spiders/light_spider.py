@@ -1,29 +1,86 @@
 # light_spider.py
 import scrapy
-from myproject.items import MyprojectItem
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from ..items import MyprojectItem
+
+try:
+    from myproject.extractor import extract_from_response, extract_page_count  # запуск из корня репозитория
+except ImportError:
+    from extractor import extract_from_response, extract_page_count  # scrapy crawl из каталога myproject/
+
+
+def page_url(url, page):
+    """URL страницы раздела: параметр page заменяется или добавляется."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "page"]
+    query.append(("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
 
 
 class LightSpider(scrapy.Spider):
+    """
+    Обход раздела со всеми страницами пагинации.
+
+    Первая страница определяет количество страниц раздела (extractor.extract_page_count),
+    и остальные страницы ставятся в очередь сразу — их параллельно загружает Scrapy
+    с AutoThrottle. Если количество страниц не найдено, страницы запрашиваются
+    по одной до первой пустой страницы или страницы, на которой нет новых для
+    раздела товаров (как scraper._merge_page).
+
+    Разделы из categories обходятся в порядке списка: запросы первого раздела
+    получают больший priority. Товары, встречающиеся в нескольких разделах,
+    отдаются один раз, одинаковые страницы отсекает фильтр дубликатов Scrapy.
+
+    Аргументы: scrapy crawl light -a max_pages=10 -a categories=URL1,URL2
+    """
+
     name = "light"
     allowed_domains = ["divan.ru"]
     start_urls = ["https://www.divan.ru/category/svet"]
 
-    def parse(self, response):
-        # Находим все карточки товаров по семантическому атрибуту
-        lamps = response.css('div[itemtype="http://schema.org/Product"]')
+    def __init__(self, *args, max_pages=50, categories=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_pages = int(max_pages)
+        if categories:
+            self.start_urls = [url.strip() for url in categories.split(",") if url.strip()]
+        self.seen_urls = set()
+        self.category_urls = {}  # базовый URL раздела -> URL товаров, найденных в разделе
 
-        for lamp in lamps:
-            item = MyprojectItem()
-            item["name"] = lamp.css('[itemprop="name"]::text').get() or "нет данных"
-            item["price"] = lamp.css('meta[itemprop="price"]::attr(content)').get() or "нет данных"
-            item["currency"] = lamp.css('meta[itemprop="priceCurrency"]::attr(content)').get() or "нет данных"
+    async def start(self):
+        for index, url in enumerate(self.start_urls):
+            yield scrapy.Request(url, callback=self.parse, cb_kwargs={"base_url": url, "page": 0},
+                                 priority=len(self.start_urls) - index)
 
-            # Ссылка: используем urljoin для корректного абсолютного пути
-            url = lamp.css('link[itemprop="url"]::attr(href)').get()
-            item["url"] = response.urljoin(url) if url else "нет данных"
+    def parse(self, response, base_url=None, page=0):
+        # Поля извлекаются тем же кодом, что и в Selenium-парсере (extractor.py)
+        products = extract_from_response(response)
+        for product in products:
+            # Товары повторяются между страницами, если сайт меняет порядок выдачи
+            if product.url not in self.seen_urls:
+                self.seen_urls.add(product.url)
+                yield product.to_item(MyprojectItem)
 
-            item["instock_text"] = lamp.css('div.MainInfo_count__MmnNN::text').get() or "нет данных"
-            item["instock_schema"] = lamp.css('link[itemprop="availability"]::attr(href)').get() or "нет данных"
+        base_url = base_url or response.url
+        category_urls = self.category_urls.setdefault(base_url, set())
+        new_in_category = {product.url for product in products} - category_urls
+        category_urls |= new_in_category
+        priority = response.request.priority  # страницы раздела наследуют его приоритет
+        if page == 0:
+            page_count = extract_page_count(response.text, per_page=len(products))
+            if page_count:
+                self.logger.info(f"В разделе {page_count} страниц: {base_url}")
+                for next_page in range(1, min(page_count, self.max_pages)):
+                    yield self._page_request(base_url, next_page, follow=False, priority=priority)
+                return
+        elif not response.meta.get("follow"):
+            return
 
-            yield item
+        # Количество страниц неизвестно: идем, пока страницы добавляют новые товары раздела
+        if not new_in_category:
+            self.logger.info(f"На странице {page} нет новых товаров, конец раздела: {base_url}")
+        elif page + 1 < self.max_pages:
+            yield self._page_request(base_url, page + 1, follow=True, priority=priority)
 
+    def _page_request(self, base_url, page, follow, priority=0):
+        return scrapy.Request(page_url(base_url, page), callback=self.parse, priority=priority,
+                              cb_kwargs={"base_url": base_url, "page": page}, meta={"follow": follow})
@@ -0,0 +1,71 @@
+# product.py
+# Компактная запись товара, общая для Selenium-парсера, Scrapy-паука и saver.
+#
+# Модуль не импортирует ничего из пакета, чтобы его можно было подключить
+# и как myproject.product, и как product (из каталога Scrapy-проекта).
+import sys
+from collections.abc import Mapping
+
+NO_DATA = "нет данных"
+
+
+class Product(Mapping):
+    """
+    Товар с фиксированным набором полей в __slots__.
+
+    Вместо словаря на каждый товар хранится объект без __dict__, а
+    повторяющиеся строки (валюта, текст наличия, ссылка schema.org) интернируются,
+    поэтому тысячи товаров ссылаются на одни и те же строковые объекты.
+
+    Запись ведет себя как неизменяемый словарь (product["url"], product.get(...),
+    dict(product), MyprojectItem(**product)), поэтому ее принимают все функции
+    saver и код, написанный для словарей.
+    """
+
+    __slots__ = ("name", "price", "currency", "url", "instock_text", "instock_schema")
+
+    def __init__(self, name=NO_DATA, price=NO_DATA, currency=NO_DATA, url="", instock_text=NO_DATA,
+                 instock_schema=NO_DATA):
+        self.name = name
+        self.price = price
+        self.currency = _intern(currency)
+        self.url = url
+        self.instock_text = _intern(instock_text)
+        self.instock_schema = _intern(instock_schema)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Создает запись из словаря (лишние ключи отбрасываются)."""
+        if isinstance(data, cls):
+            return data
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def to_item(self, item_class=None):
+        """Преобразует запись в Scrapy item (по умолчанию items.MyprojectItem)."""
+        if item_class is None:
+            try:
+                from myproject.items import MyprojectItem as item_class  # scrapy crawl из каталога myproject/
+            except ImportError:
+                from myproject.myproject.items import MyprojectItem as item_class  # запуск из корня репозитория
+        return item_class(**self.to_dict())
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return f"Product({self.to_dict()!r})"
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
@@ -0,0 +1,260 @@
+# replay_server.py
+# Локальная замена divan.ru для тестов и бенчмарков (benchmark.py).
+#
+# Сервер отдает разделы каталога из записанных карточек товаров: пагинация
+# через ?page=N (с ссылками на все страницы, как на сайте) и, по желанию,
+# подгрузка карточек при прокрутке (lazy loading) через fetch-запросы.
+import argparse
+import copy
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from lxml import html as lxml_html
+
+from .extractor import find_cards
+
+# Карточка товара в разметке divan.ru; {url}, {name}, {price}, {price_text}, {count} подставляются
+CARD_TEMPLATE = """<div class="ProductCardMain_card__KQzzn">
+  <div itemscope itemtype="http://schema.org/Product">
+    <link itemprop="url" href="{url}">
+    <div itemprop="name">{name}</div>
+    <div itemprop="offers" itemscope itemtype="http://schema.org/Offer">
+      <meta itemprop="price" content="{price}">
+      <meta itemprop="priceCurrency" content="RUB">
+      <link itemprop="availability" href="http://schema.org/InStock">
+    </div>
+    <span data-testid="price">{price_text} <span class="ui-XXdez">руб.</span></span>
+    <div class="MainInfo_count__MmnNN">В наличии {count} шт.</div>
+  </div>
+</div>
+"""
+
+# Подгрузка карточек при прокрутке: когда низ списка виден, запрашивается
+# следующая пачка; после последней пачки появляется маркер div.catalog-end
+_LAZY_JS = """
+<script>
+(() => {
+  const list = document.getElementById('catalog');
+  const sentinel = document.getElementById('sentinel');
+  let offset = %(offset)d, loading = false, done = false;
+  const visible = () => sentinel.getBoundingClientRect().top <= window.innerHeight;
+  const load = async () => {
+    if (loading || done) return;
+    loading = true;
+    const response = await fetch('%(lazy_url)s&offset=' + offset);
+    const html = await response.text();
+    loading = false;
+    if (!html.trim()) {
+      done = true;
+      sentinel.insertAdjacentHTML('afterend', '<div class="catalog-end"></div>');
+      return;
+    }
+    list.insertAdjacentHTML('beforeend', html);
+    offset += %(batch)d;
+    if (visible()) load();
+  };
+  new IntersectionObserver((entries) => { if (entries[0].isIntersecting) load(); }).observe(sentinel);
+})();
+</script>
+"""
+
+
+class ReplaySite:
+    """
+    HTTP-сервер с разделами каталога в разметке divan.ru.
+
+    Каждый раздел — page_count страниц по per_page карточек; страницы после
+    последней пустые. Карточки берутся из записанной страницы раздела
+    (recording — например, сохраненный driver.page_source) или из CARD_TEMPLATE,
+    ссылка на товар у каждой карточки своя.
+
+    Args:
+        categories (Iterable[str]): Разделы: /category/<slug>.
+        page_count (int): Количество страниц в разделе.
+        per_page (int): Карточек на странице.
+        eager (int | None): Сколько карточек отдается в HTML сразу; остальные
+                            подгружаются скриптом при прокрутке пачками по eager.
+                            None — все карточки сразу.
+        latency (float): Задержка ответа на каждый запрос в секундах.
+        recording (str | Path | None): Записанная страница раздела с карточками.
+        host (str): Адрес сервера.
+        port (int): Порт (0 — любой свободный).
+    """
+
+    def __init__(self, categories=("svet",), page_count=5, per_page=24, eager=None, latency=0.0,
+                 recording=None, host="127.0.0.1", port=0):
+        self.categories = list(categories)
+        self.page_count = page_count
+        self.per_page = per_page
+        self.eager = eager
+        self.latency = latency
+        self.templates = _recorded_cards(recording) if recording else [CARD_TEMPLATE]
+        self.requests = []
+        self._pages = {}
+        self._server = _Server((host, port), _handler(self))
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def category_url(self, slug):
+        return f"{self.url}/category/{slug}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Обслуживает запросы в текущем потоке (до KeyboardInterrupt или close())."""
+        self._server.serve_forever()
+
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def cards(self, slug, page, start=0, stop=None):
+        """HTML карточек страницы раздела с номерами [start, stop)."""
+        key = (slug, page)
+        cards = self._pages.get(key)
+        if cards is None:
+            cards = []
+            if slug in self.categories and 0 <= page < self.page_count:
+                cards = [self._card(slug, page, index) for index in range(self.per_page)]
+            self._pages[key] = cards
+        return "".join(cards[start:stop])
+
+    def render_home(self):
+        links = "".join(f'<a href="/category/{escape(slug)}">{escape(slug)}</a>\n' for slug in self.categories)
+        return f'<html><head><meta charset="utf-8"><title>Каталог</title></head><body><nav>\n{links}</nav></body></html>'
+
+    def render_page(self, slug, page):
+        """Страница раздела: первые eager карточек, пагинация и скрипт подгрузки."""
+        eager = self.per_page if self.eager is None else self.eager
+        cards = self.cards(slug, page, 0, eager)
+        pagination = "".join(f'<a href="?page={number}">{number + 1}</a>' for number in range(self.page_count))
+        script = ""
+        if eager < self.per_page and self.cards(slug, page):
+            batch = eager or self.per_page
+            script = _LAZY_JS % {"offset": eager, "batch": batch,
+                                 "lazy_url": f"/lazy/{slug}?page={page}&batch={batch}"}
+        return (f'<html><head><meta charset="utf-8"><title>{escape(slug)}</title></head><body>\n'
+                f'<div id="catalog">\n{cards}</div>\n<div id="sentinel"></div>\n'
+                f'<nav class="pagination">{pagination}</nav>\n{script}</body></html>')
+
+    def _card(self, slug, page, index):
+        number = page * self.per_page + index
+        template = self.templates[number % len(self.templates)]
+        price = 1000 + number * 10
+        return (template.replace("{url}", f"/product/{slug}-{number}")
+                .replace("{name}", f"Товар {slug} {number}")
+                .replace("{price}", str(price))
+                .replace("{price_text}", f"{price:,}".replace(",", " "))
+                .replace("{count}", str(number % 7 + 1)))
+
+
+class _Server(ThreadingHTTPServer):
+    # Стандартная очередь соединений (5) переполняется при параллельных клиентах,
+    # и лишние соединения ждут повтора SYN около секунды — это искажает задержки
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def _recorded_cards(recording):
+    """Шаблоны карточек из записанной страницы: ссылка на товар заменяется на {url}."""
+    with open(recording, "rb") as f:
+        document = lxml_html.fromstring(f.read())
+    templates = []
+    for card in find_cards(document):
+        card = copy.deepcopy(card)
+        links = card.xpath('.//link[@itemprop="url"]')
+        if not links:
+            continue
+        links[0].set("href", "{url}")
+        templates.append(lxml_html.tostring(card, encoding="unicode"))
+    if not templates:
+        raise ValueError(f"В записи {recording} нет карточек товаров со ссылками")
+    return templates
+
+
+def _handler(site):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, как у настоящего сайта
+
+        def do_GET(self):
+            site.requests.append(self.path)
+            if site.latency:
+                time.sleep(site.latency)
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            page = int(query.get("page", ["0"])[0])
+            segments = parts.path.strip("/").split("/")
+
+            if parts.path == "/":
+                self._send(200, site.render_home())
+            elif len(segments) == 2 and segments[0] == "category":
+                self._send(200, site.render_page(segments[1], page))
+            elif len(segments) == 2 and segments[0] == "lazy":
+                offset = int(query.get("offset", ["0"])[0])
+                batch = int(query.get("batch", [str(site.per_page)])[0])
+                self._send(200, site.cards(segments[1], page, offset, offset + batch))
+            else:
+                self._send(404, "<html><body>Not found</body></html>")
+
+        def _send(self, status, text):
+            body = text.encode("utf-8")
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # клиент отменил запрос (например, страница за концом раздела)
+
+        def log_message(self, *args):
+            pass
+
+    return ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная замена divan.ru для тестов и бенчмарков")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--categories", default="svet,lamp", help="Разделы через запятую")
+    parser.add_argument("--pages", type=int, default=5, help="Страниц в разделе")
+    parser.add_argument("--per-page", type=int, default=24, help="Карточек на странице")
+    parser.add_argument("--eager", type=int, default=None, help="Карточек в HTML до прокрутки")
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа, секунд")
+    parser.add_argument("--recording", default=None, help="Записанная страница раздела")
+    args = parser.parse_args()
+
+    site = ReplaySite(args.categories.split(","), page_count=args.pages, per_page=args.per_page,
+                      eager=args.eager, latency=args.latency, recording=args.recording, port=args.port)
+    print(f"Сервер запущен: {site.url} (Ctrl+C — остановить)")
+    for slug in site.categories:
+        print(f"  {site.category_url(slug)}")
+    try:
+        site.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.close()
+
+
+if __name__ == "__main__":
+    main()
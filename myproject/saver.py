@@ -1,9 +1,17 @@
 # saver.py
-import csv, json, pandas as pd
-from jinja2 import Template
+import csv, json, re, sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from jinja2 import DictLoader, Environment
 from pathlib import Path
 import time
 
+try:
+    from .http_cache import normalize_url
+except ImportError:
+    from http_cache import normalize_url  # saver подключен как модуль верхнего уровня (Scrapy-пайплайн)
+
 # Директория для сохранения файлов.
 # Используем абсолютный путь относительно файла saver.py
 OUTPUT_DIR = Path(__file__).parent / "output"
@@ -17,39 +25,158 @@ HEADER_NAMES = {
     "price": "Цена",
     "currency": "Валюта",
     "url": "Ссылка",
-    "instock_text": "Наличие"
+    "instock_text": "Наличие",
+    "instock_schema": "Наличие (schema.org)"
+}
+
+# Ширина колонок XLSX в символах (остальные поля — XLSX_DEFAULT_WIDTH)
+XLSX_COLUMN_WIDTHS = {
+    "name": 60,
+    "price": 12,
+    "currency": 10,
+    "url": 70,
+    "instock_text": 25,
+    "instock_schema": 30,
 }
+XLSX_DEFAULT_WIDTH = 15
+
+# openpyxl держит гиперссылки в памяти до сохранения книги (~2 КБ на ссылку),
+# поэтому кликабельными делаются только первые XLSX_MAX_HYPERLINKS ссылок, дальше — текст
+# (Excel и сам не поддерживает больше 65 530 гиперссылок на лист).
+XLSX_MAX_HYPERLINKS = 10000
+
+# Строк в одной группе строк Parquet / пачке Arrow: столько товаров держится в памяти при записи
+ARROW_ROW_GROUP_SIZE = 50000
+
+# Количество товаров в тексте наличия: "В наличии: 7 шт.", "В наличии: более 20 шт."
+_STOCK_COUNT = re.compile(r"(\d+)\s*шт")
+
+# Сколько строк таблицы помещается на одну HTML-страницу; при большем количестве
+# отчет разбивается на связанные файлы results.html, results_2.html, ...
+HTML_PAGE_SIZE = 5000
+
+# HTML-шаблон разбит на части, чтобы строки таблицы можно было писать по мере поступления
+HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Парсинг результатов</title>
+    <meta charset="utf-8">
+    <style>
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #4CAF50; color: white; }
+        tr:nth-child(even) { background-color: #f2f2f2; }
+        a { color: #0066cc; }
+        nav { margin: 12px 0; }
+    </style>
+</head>
+<body>
+    <h1>Результаты парсинга</h1>
+{% if nav %}{% include "nav" %}{% endif %}
+    <table>
+        <tr>
+{% for header in headers %}
+            <th>{{ header }}</th>
+{% endfor %}
+        </tr>
+"""
+
+HTML_ROWS = """{% for row in rows %}
+        <tr>
+{% for value in row %}
+{% if fields[loop.index0] == 'url' %}
+            <td><a href="{{ value }}">{{ value }}</a></td>
+{% else %}
+            <td>{{ value or '—' }}</td>
+{% endif %}
+{% endfor %}
+        </tr>
+{% endfor %}
+"""
+
+HTML_TAIL = """    </table>
+{% if nav %}{% include "nav" %}{% endif %}
+</body>
+</html>
+"""
+
+HTML_NAV = """    <nav>
+{% if nav.prev %}
+        <a href="{{ nav.prev }}">&larr; Назад</a>
+{% endif %}
+        Страница {{ nav.page }}{% if nav.pages %} из {{ nav.pages }}{% endif %}
+
+{% if nav.next %}
+        <a href="{{ nav.next }}">Вперед &rarr;</a>
+{% endif %}
+    </nav>
+"""
+
+HTML_TEMPLATE = HTML_HEAD + HTML_ROWS + HTML_TAIL
+
+# Шаблоны компилируются один раз при первом использовании и кэшируются окружением
+_HTML_ENV = Environment(
+    loader=DictLoader({"head": HTML_HEAD, "rows": HTML_ROWS, "tail": HTML_TAIL, "nav": HTML_NAV,
+                       "page": HTML_TEMPLATE}),
+    autoescape=True,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+)
+
+
+class Table:
+    """
+    Нормализованная таблица товаров, общая для всех форматов save_all.
+
+    Attributes:
+        fields (list[str]): Порядок полей: сначала из FIELDS, затем остальные ключи.
+        headers (list[str]): Русские заголовки колонок (HEADER_NAMES).
+        rows (list[list]): Значения по полям; отсутствующие заполнены пустой строкой.
+    """
+
+    def __init__(self, fields, rows):
+        self.fields = fields
+        self.headers = [HEADER_NAMES.get(field, field) for field in fields]
+        self.rows = rows
+
+
+def build_table(data):
+    """Один проход по товарам: порядок полей, заголовки и строки таблицы."""
+    fields = _fields(data)
+    return Table(fields, _rows(data, fields))
+
+
+def _fields(records):
+    """Поля таблицы: сначала из FIELDS, затем остальные ключи в порядке появления."""
+    keys = {}
+    for item in records:
+        keys.update(dict.fromkeys(item))
+    # Определяем поля из данных (используем только те, что есть в данных)
+    available_fields = [field for field in FIELDS if field in keys]
+    # Если в данных есть поля, которых нет в FIELDS, добавляем их
+    available_fields.extend(key for key in keys if key not in FIELDS)
+    # Используем доступные поля или все FIELDS, если данных нет
+    return available_fields or list(FIELDS)
+
 
-def save_csv(data, filename="results.csv"):
+def _rows(records, fields):
+    return [["" if item.get(field) is None else item[field] for field in fields] for item in records]
+
+
+def save_csv(data, filename="results.csv", table=None):
     if not data:
         print("Предупреждение: Нет данных для сохранения в CSV")
         return
     filepath = OUTPUT_DIR / filename
     filepath.parent.mkdir(parents=True, exist_ok=True)
     print(f"Сохраняем CSV в: {filepath.absolute()}")
-    
-    # Определяем поля из данных (используем только те, что есть в данных)
-    available_fields = []
-    if data:
-        # Берем поля из первого элемента
-        available_fields = [field for field in FIELDS if field in data[0]]
-        # Если в данных есть поля, которых нет в FIELDS, добавляем их
-        for key in data[0].keys():
-            if key not in FIELDS and key not in available_fields:
-                available_fields.append(key)
-    
-    # Используем доступные поля или все FIELDS, если данные полные
-    fields_to_use = available_fields if available_fields else FIELDS
-    fieldnames = [HEADER_NAMES.get(field, field) for field in fields_to_use]
-    
+
+    table = table or build_table(data)
     with open(filepath, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for item in data:  # data = список словарей от парсера
-            writer.writerow({
-                HEADER_NAMES.get(field, field): item.get(field, "")
-                for field in fields_to_use
-            })
+        writer = csv.writer(f)
+        writer.writerow(table.headers)
+        writer.writerows(table.rows)
 
 
 def save_json(data, filename="results.json"):
@@ -61,94 +188,734 @@ def save_json(data, filename="results.json"):
     print(f"Сохраняем JSON в: {filepath.absolute()}")
     
     with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        json.dump(data, f, ensure_ascii=False, indent=2, default=dict)
+
+def save_xlsx(data, filename="results.xlsx", table=None):
+    """
+    Сохраняет товары в XLSX потоково (openpyxl write_only), без pandas.
 
-def save_xlsx(data, filename="results.xlsx"):
+    Args:
+        data (list[dict] | Iterable[dict]): Товары; можно передать генератор,
+                                            тогда в памяти держится одна пачка строк.
+        filename (str): Имя файла в OUTPUT_DIR.
+        table (Table | None): Готовая таблица из build_table (используется в save_all).
+    """
     if not data:
         print("Предупреждение: Нет данных для сохранения в XLSX")
         return
-    filepath = OUTPUT_DIR / filename
-    filepath.parent.mkdir(parents=True, exist_ok=True)
-    print(f"Сохраняем XLSX в: {filepath.absolute()}")
-    
+    sink = XlsxSink(filename)
+    print(f"Сохраняем XLSX в: {sink.filepath.absolute()}")
+
     try:
-        df = pd.DataFrame(data)
-        # Определяем поля, которые есть в данных
-        available_fields = [field for field in FIELDS if field in df.columns]
-        # Если есть все поля из FIELDS, используем их, иначе используем все доступные
-        if available_fields == FIELDS:
-            df = df[FIELDS]
-            df.rename(columns=HEADER_NAMES, inplace=True)
-        else:
-            # Используем только доступные поля
-            df = df[available_fields]
-            df.rename(columns={k: HEADER_NAMES.get(k, k) for k in available_fields}, inplace=True)
-        df.to_excel(filepath, index=False)
-    except PermissionError:
-        print(f"ОШИБКА: Файл {filepath.name} открыт в другой программе.")
-        print("Закройте файл и попробуйте снова, или файл будет пропущен.")
-        temp_filename = f"results_{int(time.time())}.xlsx"
-        temp_filepath = OUTPUT_DIR / temp_filename
-        df.to_excel(temp_filepath, index=False)
-        print(f"Файл сохранен с временным именем: {temp_filename}")
+        with sink:
+            if table is not None:
+                sink.write_rows(table.fields, table.rows)
+            else:
+                for batch in _chunks(data, 1000):
+                    sink.write_batch(batch)
     except Exception as e:
-            print(f"Не удалось сохранить XLSX файл: {e}")
+        print(f"Не удалось сохранить XLSX файл: {e}")
+
+
+def _chunks(records, size):
+    """Разбивает список или итератор товаров на пачки по size штук."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def render_html(data, filename="results.html", table=None, page_size=HTML_PAGE_SIZE):
+    """
+    Сохраняет товары в HTML-таблицу.
 
+    Шаблон рендерится потоково (generate) прямо в файл, весь документ в памяти
+    не собирается. Если товаров больше page_size, отчет разбивается на страницы
+    results.html, results_2.html, ... со ссылками «Назад» / «Вперед».
 
-def render_html(data, filename="results.html"):
+    Returns:
+        str | None: Путь к первой странице отчета.
+    """
     if not data:
         print("Предупреждение: Нет данных для сохранения в HTML")
         return None
     filepath = OUTPUT_DIR / filename
     filepath.parent.mkdir(parents=True, exist_ok=True)
 
-    template = """
-       <html>
-       <head>
-           <title>Парсинг результатов</title>
-           <meta charset="utf-8">
-           <style>
-               table { border-collapse: collapse; width: 100%; }
-               th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-               th { background-color: #4CAF50; color: white; }
-               tr:nth-child(even) { background-color: #f2f2f2; }
-               a { color: #0066cc; }
-           </style>
-       </head>
-       <body>
-           <h1>Результаты парсинга</h1>
-           <table>
-               <tr>
-               {% for field in fields %}
-                   <th>{{ header_names[field] }}</th>
-               {% endfor %}
-               </tr>
-               {% for row in data %}
-               <tr>
-               {% for field in fields %}
-                   <td>
-                   {% if field == 'url' %}
-                       <a href="{{ row.get(field, '') }}">{{ row.get(field, '') }}</a>
-                   {% else %}
-                       {{ row.get(field, '') or '—' }}
-                   {% endif %}
-                   </td>
-               {% endfor %}
-               </tr>
-               {% endfor %}
-           </table>
-       </body>
-       </html>
-    """
-    html = Template(template).render(data=data, fields=FIELDS, header_names=HEADER_NAMES)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(html)
-    print(f"HTML файл сохранен: {filepath.absolute()}")
+    table = table or build_table(data)
+    pages = max(1, -(-len(table.rows) // page_size))
+    for page in range(1, pages + 1):
+        nav = _html_nav(filepath, page, pages, has_next=page < pages) if pages > 1 else None
+        rows = table.rows[(page - 1) * page_size:page * page_size]
+        with open(_html_page_path(filepath, page), "w", encoding="utf-8") as f:
+            _write_html(f, "head", headers=table.headers, nav=nav)
+            _write_html(f, "rows", rows=rows, fields=table.fields)
+            _write_html(f, "tail", nav=nav)
+    if pages > 1:
+        print(f"HTML отчет сохранен ({pages} страниц): {filepath.absolute()}")
+    else:
+        print(f"HTML файл сохранен: {filepath.absolute()}")
     return str(filepath)
 
 
-def save_all(data):
-    save_csv(data)
-    save_json(data)
-    save_xlsx(data)
-    render_html(data)
+def _write_html(f, template, **context):
+    f.writelines(_HTML_ENV.get_template(template).generate(**context))
+
+
+def _html_page_path(filepath, page):
+    """Файл страницы отчета: results.html, results_2.html, ..."""
+    return filepath if page == 1 else filepath.with_name(f"{filepath.stem}_{page}{filepath.suffix}")
+
+
+def _html_nav(filepath, page, pages=None, has_next=False):
+    return {
+        "page": page,
+        "pages": pages,
+        "prev": _html_page_path(filepath, page - 1).name if page > 1 else None,
+        "next": _html_page_path(filepath, page + 1).name if has_next else None,
+    }
+
+
+def save_parquet(data, filename="results.parquet", row_group_size=ARROW_ROW_GROUP_SIZE,
+                 compression="zstd", scraped_at=None):
+    """
+    Сохраняет товары в Parquet с типизированной схемой (см. ParquetSink).
+
+    Args:
+        data (list[dict] | Iterable[dict]): Товары; генератор пишется группами строк.
+        filename (str): Имя файла в OUTPUT_DIR.
+        row_group_size (int): Товаров в одной группе строк.
+        compression (str): Кодек сжатия ("zstd", "snappy", "gzip", None).
+        scraped_at (datetime | None): Время сбора, по умолчанию — текущее (UTC).
+    """
+    _save_arrow(ParquetSink(filename, row_group_size=row_group_size, compression=compression,
+                            scraped_at=scraped_at), data, "Parquet")
+
+
+def save_feather(data, filename="results.feather", row_group_size=ARROW_ROW_GROUP_SIZE,
+                 compression="zstd", scraped_at=None):
+    """Сохраняет товары в Arrow IPC (Feather v2) с той же схемой, что и save_parquet."""
+    _save_arrow(FeatherSink(filename, row_group_size=row_group_size, compression=compression,
+                            scraped_at=scraped_at), data, "Feather")
+
+
+def _save_arrow(sink, data, label):
+    if not data:
+        print(f"Предупреждение: Нет данных для сохранения в {label}")
+        return
+    print(f"Сохраняем {label} в: {sink.filepath.absolute()}")
+    with sink:
+        for batch in _chunks(data, sink.row_group_size):
+            sink.write_batch(batch)
+
+
+def save_sqlite(data, filename="results.sqlite", batch_size=1000, observed_at=None):
+    """
+    Дописывает товары в базу SQLite (см. SqliteSink): файл не перезаписывается,
+    а накапливает историю цен и наличия между запусками.
+    """
+    if not data:
+        print("Предупреждение: Нет данных для сохранения в SQLite")
+        return
+    sink = SqliteSink(filename, observed_at=observed_at)
+    print(f"Сохраняем SQLite в: {sink.filepath.absolute()}")
+    with sink:
+        for batch in _chunks(data, batch_size):
+            sink.write_batch(batch)
+
+
+def price_changes(filename="results.sqlite", days=7):
+    """
+    Изменения цены за последние days дней.
+
+    Returns:
+        list[tuple]: (url, время, старая цена, новая цена), сначала новые.
+    """
+    return _query(filename, """
+        SELECT url, observed_at, old_price, price FROM (
+            SELECT h.url, h.observed_at, h.price, (%s) AS old_price
+            FROM price_history h WHERE h.observed_at >= datetime('now', ?))
+        WHERE old_price IS NOT NULL AND old_price IS NOT price
+        ORDER BY observed_at DESC""" % _PREVIOUS.format(column="price"), (f"-{days} days",))
+
+
+def out_of_stock(filename="results.sqlite", days=7):
+    """
+    Товары, которые за последние days дней пропали из наличия.
+
+    Returns:
+        list[tuple]: (url, время), сначала новые.
+    """
+    return _query(filename, """
+        SELECT url, observed_at FROM (
+            SELECT h.url, h.observed_at, h.in_stock, (%s) AS was_in_stock
+            FROM price_history h WHERE h.observed_at >= datetime('now', ?))
+        WHERE in_stock = 0 AND was_in_stock = 1
+        ORDER BY observed_at DESC""" % _PREVIOUS.format(column="in_stock"), (f"-{days} days",))
+
+
+# Предыдущее наблюдение того же товара: поиск по индексу (url, observed_at)
+_PREVIOUS = """SELECT p.{column} FROM price_history p
+               WHERE p.url = h.url AND p.observed_at < h.observed_at
+               ORDER BY p.observed_at DESC LIMIT 1"""
+
+
+def _query(filename, sql, params):
+    db = sqlite3.connect(OUTPUT_DIR / filename)
+    try:
+        return db.execute(sql, params).fetchall()
+    finally:
+        db.close()
+
+
+def parse_price(price):
+    """Цена из текста карточки: "13 990" -> 13990, None — если цифр нет."""
+    if isinstance(price, int):
+        return price
+    digits = "".join(ch for ch in str(price or "") if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def parse_stock(text, schema=None):
+    """
+    Разбирает наличие товара.
+
+    Args:
+        text (str): Текст наличия с карточки ("В наличии: 7 шт.").
+        schema (str | None): Ссылка schema.org availability (".../InStock").
+
+    Returns:
+        tuple[bool | None, int | None]: Признак наличия и количество штук
+        ("более 20 шт." -> 20, нижняя граница); None — если определить нельзя.
+    """
+    lowered = (text or "").lower()
+    if "других цветах" in lowered or "нет в наличии" in lowered or "под заказ" in lowered:
+        return False, None
+    if "в наличии" in lowered:
+        match = _STOCK_COUNT.search(lowered)
+        return True, int(match.group(1)) if match else None
+    if schema and "InStock" in str(schema):
+        return True, None
+    if schema and "OutOfStock" in str(schema):
+        return False, None
+    return None, None
+
+
+def save_all(data, workers=4):
+    """
+    Сохраняет товары в CSV, JSON, XLSX и HTML.
+
+    Таблица (порядок полей, заголовки, строки) строится один раз и передается
+    всем форматам, сами файлы пишутся параллельно в пуле потоков.
+
+    Returns:
+        dict[str, float]: Время записи каждого формата в секундах.
+    """
+    if not data:
+        print("Предупреждение: Нет данных для сохранения")
+        return {}
+    table = build_table(data)
+    writers = {
+        "csv": lambda: save_csv(data, table=table),
+        "json": lambda: save_json(data),
+        "xlsx": lambda: save_xlsx(data, table=table),
+        "html": lambda: render_html(data, table=table),
+    }
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {name: executor.submit(_timed, writer) for name, writer in writers.items()}
+        timings = {name: future.result() for name, future in futures.items()}
+    print("Время записи: " + ", ".join(f"{name} {seconds:.2f} с" for name, seconds in timings.items()))
+    return timings
+
+
+def _timed(writer):
+    start = time.perf_counter()
+    writer()
+    return time.perf_counter() - start
+
+
+# --- Потоковая запись ---
+# Sink-объекты пишут товары пачками по мере поступления (например, после каждой
+# страницы в scraper.scrape_all_pages), не держа весь список в памяти:
+#
+#     with saver.CsvSink() as sink:
+#         sink.write_batch(page_items)
+
+class Sink:
+    """
+    Базовый класс потоковой записи: open() / write_batch(records) / close().
+
+    Args:
+        filename (str): Имя файла в OUTPUT_DIR.
+        flush_every (int): Сбрасывать буфер на диск каждые N пачек.
+    """
+
+    default_filename = None
+
+    def __init__(self, filename=None, flush_every=1):
+        self.filename = filename or self.default_filename
+        self.flush_every = flush_every
+        self.count = 0
+        self._batches = 0
+        self._file = None
+        self._fields = None
+
+    @property
+    def filepath(self):
+        return OUTPUT_DIR / self.filename
+
+    def open(self):
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.filepath, "w", newline="", encoding="utf-8")
+        self._write_header()
+        return self
+
+    def write_batch(self, records):
+        if not records:
+            return
+        if self._file is None:
+            self.open()
+        self._write_records(records)
+        self.count += len(records)
+        self._batches += 1
+        if self._batches % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if self._file is None:
+            return
+        self._write_footer()
+        self._file.close()
+        self._file = None
+        print(f"Сохранено {self.count} товаров в: {self.filepath.absolute()}")
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write_header(self):
+        pass
+
+    def _table_fields(self, records):
+        """Колонки табличных форматов: _fields() первой пачки, дальше те же, что в build_table."""
+        if self._fields is None:
+            self._fields = _fields(records)
+        return self._fields
+
+    def _write_records(self, records):
+        raise NotImplementedError
+
+    def _write_footer(self):
+        pass
+
+
+class CsvSink(Sink):
+    """CSV с русскими заголовками; набор полей определяется по первой пачке товаров."""
+
+    default_filename = "results.csv"
+
+    def _write_records(self, records):
+        if self.count == 0:
+            self._writer = csv.writer(self._file)
+            self._writer.writerow([HEADER_NAMES.get(field, field) for field in self._table_fields(records)])
+        self._writer.writerows(_rows(records, self._fields))
+
+
+class JsonLinesSink(Sink):
+    """JSON Lines: один товар на строку, файл валиден после каждой пачки."""
+
+    default_filename = "results.jsonl"
+
+    def _write_records(self, records):
+        self._file.write("".join(json.dumps(item, ensure_ascii=False, default=dict) + "\n" for item in records))
+
+
+class JsonSink(Sink):
+    """JSON-массив, совместимый с save_json; закрывающая скобка дописывается в close()."""
+
+    default_filename = "results.json"
+
+    def _write_header(self):
+        self._file.write("[")
+        self._empty = True
+
+    def _write_records(self, records):
+        for item in records:
+            self._file.write("\n  " if self._empty else ",\n  ")
+            self._file.write(json.dumps(item, ensure_ascii=False, default=dict))
+            self._empty = False
+
+    def _write_footer(self):
+        self._file.write("\n]\n")
+
+
+class HtmlSink(Sink):
+    """
+    HTML-таблица: заголовок пишется с первой пачкой (колонки — как в render_html),
+    строки — по мере поступления.
+
+    После page_size строк начинается следующий файл отчета (results_2.html, ...),
+    страницы связаны ссылками, как в render_html.
+    """
+
+    default_filename = "results.html"
+
+    def __init__(self, filename=None, flush_every=1, page_size=HTML_PAGE_SIZE):
+        super().__init__(filename, flush_every)
+        self.page_size = page_size
+
+    def _write_header(self):
+        self._page = 1
+        self._page_rows = 0
+        self._headers = None
+
+    def _write_records(self, records):
+        fields = self._table_fields(records)
+        if self._headers is None:
+            self._start(fields)
+        rows = _rows(records, fields)
+        while rows:
+            if self._page_rows == self.page_size:
+                self._next_page()
+            chunk = rows[:self.page_size - self._page_rows]
+            rows = rows[len(chunk):]
+            _write_html(self._file, "rows", rows=chunk, fields=fields)
+            self._page_rows += len(chunk)
+
+    def _write_footer(self):
+        if self._headers is None:
+            self._start(self._table_fields([]))
+        _write_html(self._file, "tail", nav=self._nav(has_next=False))
+
+    def _next_page(self):
+        # Число страниц заранее неизвестно, поэтому ссылка «Вперед» появляется только внизу
+        _write_html(self._file, "tail", nav=self._nav(has_next=True))
+        self._file.close()
+        self._page += 1
+        self._page_rows = 0
+        self._file = open(_html_page_path(self.filepath, self._page), "w", encoding="utf-8")
+        _write_html(self._file, "head", headers=self._headers, nav=self._nav(has_next=False))
+
+    def _start(self, fields):
+        self._headers = [HEADER_NAMES.get(field, field) for field in fields]
+        _write_html(self._file, "head", headers=self._headers, nav=None)
+
+    def _nav(self, has_next):
+        if self._page == 1 and not has_next:
+            return None
+        return _html_nav(self.filepath, self._page, has_next=has_next)
+
+
+class XlsxSink(Sink):
+    """
+    XLSX в режиме write_only (openpyxl): строки не накапливаются в памяти.
+
+    Ширина колонок берется из XLSX_COLUMN_WIDTHS, строка заголовков закреплена,
+    колонка url пишется гиперссылками. Формат XLSX — zip-архив, поэтому файл
+    появляется на диске только в close(); если он открыт в другой программе,
+    книга сохраняется под временным именем.
+    """
+
+    default_filename = "results.xlsx"
+
+    def open(self):
+        from openpyxl import Workbook
+
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._file = self._workbook  # признак открытого sink для базового класса
+        self._links = 0
+        return self
+
+    def write_batch(self, records):
+        if not records:
+            return
+        fields = self._table_fields(records)
+        self.write_rows(fields, _rows(records, fields))
+
+    def write_rows(self, fields, rows):
+        """Пишет готовые строки таблицы (значения в порядке fields)."""
+        # У write_only книги нет flush: строки уходят во временный файл openpyxl
+        if self._file is None:
+            self.open()
+        if self.count == 0:
+            self._start(fields)
+        url_index = self._url_index
+        for row in rows:
+            if url_index is not None and self._links < XLSX_MAX_HYPERLINKS and row[url_index]:
+                row = list(row)
+                row[url_index] = self._link(row[url_index])
+            self._sheet.append(row)
+        self.count += len(rows)
+
+    def close(self):
+        if self._file is None:
+            return
+        filepath = self.filepath
+        try:
+            self._workbook.save(filepath)
+        except PermissionError:
+            print(f"ОШИБКА: Файл {filepath.name} открыт в другой программе.")
+            print("Закройте файл и попробуйте снова, или файл будет пропущен.")
+            filepath = filepath.with_name(f"{filepath.stem}_{int(time.time())}.xlsx")
+            self._workbook.save(filepath)
+            print(f"Файл сохранен с временным именем: {filepath.name}")
+        self._file = None
+        print(f"Сохранено {self.count} товаров в: {filepath.absolute()}")
+
+    def _start(self, fields):
+        from openpyxl.utils import get_column_letter
+
+        self._fields = fields
+        self._url_index = fields.index("url") if "url" in fields else None
+        # В write_only режиме ширину колонок нужно задать до первой строки
+        for index, field in enumerate(fields, start=1):
+            width = XLSX_COLUMN_WIDTHS.get(field, XLSX_DEFAULT_WIDTH)
+            self._sheet.column_dimensions[get_column_letter(index)].width = width
+        self._sheet.freeze_panes = "A2"
+        self._sheet.append([HEADER_NAMES.get(field, field) for field in fields])
+
+    def _link(self, url):
+        from openpyxl.cell import WriteOnlyCell
+
+        cell = WriteOnlyCell(self._sheet, value=url)
+        cell.hyperlink = url
+        cell.style = "Hyperlink"
+        self._links += 1
+        return cell
+
+
+class SqliteSink(Sink):
+    """
+    База SQLite: текущее состояние товаров и история цен.
+
+    Таблица products хранит последнюю версию каждого товара (ключ — канонический
+    URL, повторный обход обновляет запись). В price_history строка добавляется,
+    только когда у товара меняются цена или наличие, поэтому частые повторные
+    обходы не раздувают историю. Каждая пачка — одна транзакция, журнал WAL.
+
+    Args:
+        filename (str): Имя файла базы в OUTPUT_DIR.
+        observed_at (datetime | None): Время наблюдения, по умолчанию — время открытия sink.
+    """
+
+    default_filename = "results.sqlite"
+
+    def __init__(self, filename=None, flush_every=1, observed_at=None):
+        super().__init__(filename, flush_every)
+        self.observed_at = observed_at
+
+    def open(self):
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._file = sqlite3.connect(self.filepath)
+        self._file.execute("PRAGMA journal_mode=WAL")
+        self._file.execute("PRAGMA synchronous=NORMAL")
+        self._file.executescript("""
+            CREATE TABLE IF NOT EXISTS products (
+                url TEXT PRIMARY KEY,
+                name TEXT,
+                price INTEGER,
+                price_text TEXT,
+                currency TEXT,
+                instock_text TEXT,
+                in_stock INTEGER,
+                stock_count INTEGER,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS price_history (
+                url TEXT NOT NULL,
+                observed_at TEXT NOT NULL,
+                price INTEGER,
+                in_stock INTEGER,
+                stock_count INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS price_history_url ON price_history (url, observed_at);
+            CREATE INDEX IF NOT EXISTS price_history_time ON price_history (observed_at);
+        """)
+        # Формат datetime() SQLite, чтобы работали условия вида observed_at >= datetime('now', '-7 days')
+        observed_at = (self.observed_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        self._observed_at = observed_at.strftime("%Y-%m-%d %H:%M:%S")
+        return self
+
+    def write_batch(self, records):
+        if not records:
+            return
+        if self._file is None:
+            self.open()
+        rows = []
+        for item in records:
+            in_stock, stock_count = parse_stock(item.get("instock_text"), item.get("instock_schema"))
+            rows.append({
+                "url": normalize_url(item["url"]),
+                "name": item.get("name"),
+                "price": parse_price(item.get("price")),
+                "price_text": item.get("price"),
+                "currency": item.get("currency"),
+                "instock_text": item.get("instock_text"),
+                "in_stock": in_stock,
+                "stock_count": stock_count,
+                "now": self._observed_at,
+            })
+        with self._file:  # одна транзакция на пачку
+            # История: только если цена или наличие отличаются от сохраненных
+            self._file.executemany("""
+                INSERT INTO price_history (url, observed_at, price, in_stock, stock_count)
+                SELECT :url, :now, :price, :in_stock, :stock_count
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM products WHERE url = :url
+                    AND price IS :price AND in_stock IS :in_stock AND stock_count IS :stock_count)""", rows)
+            self._file.executemany("""
+                INSERT INTO products VALUES (:url, :name, :price, :price_text, :currency, :instock_text,
+                                             :in_stock, :stock_count, :now, :now)
+                ON CONFLICT (url) DO UPDATE SET
+                    name = excluded.name, price = excluded.price, price_text = excluded.price_text,
+                    currency = excluded.currency, instock_text = excluded.instock_text,
+                    in_stock = excluded.in_stock, stock_count = excluded.stock_count,
+                    last_seen = excluded.last_seen""", rows)
+        self.count += len(records)
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        print(f"Сохранено {self.count} товаров в: {self.filepath.absolute()}")
+
+
+class ArrowSink(Sink):
+    """
+    Базовый класс типизированной записи через pyarrow (опциональная зависимость).
+
+    Схема: name, url, instock_text — строки; price — int64; currency — словарная
+    строка; in_stock (bool) и stock_count (int32) разобраны из текста наличия;
+    scraped_at — время сбора (UTC). Товары копятся до row_group_size и
+    записываются одной группой строк, поэтому память не зависит от размера обхода.
+
+    Args:
+        filename (str): Имя файла в OUTPUT_DIR.
+        row_group_size (int): Товаров в одной группе строк.
+        compression (str | None): Кодек сжатия.
+        scraped_at (datetime | None): Время сбора, по умолчанию — время открытия sink.
+    """
+
+    def __init__(self, filename=None, flush_every=1, row_group_size=ARROW_ROW_GROUP_SIZE,
+                 compression="zstd", scraped_at=None):
+        super().__init__(filename, flush_every)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.scraped_at = scraped_at
+
+    def open(self):
+        import pyarrow as pa
+
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._schema = pa.schema([
+            ("name", pa.string()),
+            ("price", pa.int64()),
+            ("currency", pa.dictionary(pa.int32(), pa.string())),
+            ("url", pa.string()),
+            ("instock_text", pa.string()),
+            ("in_stock", pa.bool_()),
+            ("stock_count", pa.int32()),
+            ("scraped_at", pa.timestamp("ms", tz="UTC")),
+        ])
+        self._file = self._open_writer(self._schema)
+        self._buffer = []
+        # Словарь валют общий для всех пачек: новые значения только дописываются в конец
+        self._currencies = {}
+        self._scraped_at = self.scraped_at or datetime.now(timezone.utc)
+        return self
+
+    def write_batch(self, records):
+        if not records:
+            return
+        if self._file is None:
+            self.open()
+        self._buffer.extend(records)
+        self.count += len(records)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush_buffer()
+
+    def close(self):
+        if self._file is None:
+            return
+        self._flush_buffer()
+        self._file.close()
+        self._file = None
+        print(f"Сохранено {self.count} товаров в: {self.filepath.absolute()}")
+
+    def _flush_buffer(self):
+        while self._buffer:
+            records = self._buffer[:self.row_group_size]
+            del self._buffer[:self.row_group_size]
+            # У ParquetWriter и IPC-writer одинаковый write_batch
+            self._file.write_batch(self._record_batch(records))
+
+    def _record_batch(self, records):
+        import pyarrow as pa
+
+        stock = [parse_stock(item.get("instock_text"), item.get("instock_schema")) for item in records]
+        indices = [self._currencies.setdefault(item.get("currency") or "", len(self._currencies))
+                   for item in records]
+        columns = [
+            pa.array([item.get("name") for item in records], pa.string()),
+            pa.array([parse_price(item.get("price")) for item in records], pa.int64()),
+            pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()),
+                                           pa.array(list(self._currencies), pa.string())),
+            pa.array([item.get("url") for item in records], pa.string()),
+            pa.array([item.get("instock_text") for item in records], pa.string()),
+            pa.array([in_stock for in_stock, _ in stock], pa.bool_()),
+            pa.array([count for _, count in stock], pa.int32()),
+            pa.array([self._scraped_at] * len(records), self._schema.field("scraped_at").type),
+        ]
+        return pa.record_batch(columns, schema=self._schema)
+
+    def _open_writer(self, schema):
+        raise NotImplementedError
+
+
+class ParquetSink(ArrowSink):
+    """Parquet: каждая пачка row_group_size товаров — отдельная группа строк."""
+
+    default_filename = "results.parquet"
+
+    def _open_writer(self, schema):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.filepath, schema, compression=self.compression)
+
+
+class FeatherSink(ArrowSink):
+    """Arrow IPC / Feather v2: читается без разбора (memory map) pandas, polars, DuckDB."""
+
+    default_filename = "results.feather"
+
+    def _open_writer(self, schema):
+        import pyarrow.ipc as ipc
+
+        # Словарь валют растет между пачками — в IPC-файле это допустимо только как delta
+        options = ipc.IpcWriteOptions(compression=self.compression, emit_dictionary_deltas=True)
+        return ipc.new_file(self.filepath, schema, options=options)
+
+
+def make_sinks(formats=("csv", "jsonl", "json", "xlsx", "html")):
+    """Создает sink-объекты для перечисленных форматов с именами файлов по умолчанию."""
+    return [SINKS[name]() for name in formats]
+
+
+SINKS = {
+    "csv": CsvSink,
+    "jsonl": JsonLinesSink,
+    "json": JsonSink,
+    "xlsx": XlsxSink,
+    "html": HtmlSink,
+    "sqlite": SqliteSink,
+    "parquet": ParquetSink,
+    "feather": FeatherSink,
+}
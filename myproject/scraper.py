@@ -1,20 +1,145 @@
 # scraper.py
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
 import time
 
+from .blocking import BlockingProfile
+from .checkpoint import DEFAULT_PATH as DEFAULT_CHECKPOINT, CheckpointStore
+from .driver_pool import DriverPool
+from .http_cache import ResponseCache
+from .http_engine import HttpFetcher, scrape_page_http
+from .throttle import RateLimiter
+from .extractor import CURRENCY_MAP, NO_DATA, extract_page_count, extract_products
+from .product import Product
 
-def scrape():
-    """Парсит одну страницу раздела lamp (для теста)."""
-    url = "https://www.divan.ru/category/lamp"
+PRODUCT_SELECTOR = 'div[itemtype="http://schema.org/Product"]'
+
+# Ждет окончания подгрузки товаров по событиям страницы, а не по фиксированным паузам.
+# MutationObserver отслеживает рост числа карточек, PerformanceObserver — XHR/fetch
+# запросы. Как только в течение settle мс нет ни новых карточек, ни запросов
+# (или появился маркер конца списка), скрипт завершается.
+_LAZY_LOAD_JS = r"""
+const [selector, settleMs, maxWaitMs, endSelector, done] = arguments;
+const count = () => document.querySelectorAll(selector).length;
+const start = performance.now();
+let last = count();
+let lastActivity = start;
+
+const toBottom = () => window.scrollTo(0, document.body.scrollHeight);
+const mutations = new MutationObserver(() => {
+    const current = count();
+    if (current !== last) {
+        last = current;
+        lastActivity = performance.now();
+        toBottom();
+    }
+});
+mutations.observe(document.body, {childList: true, subtree: true});
+
+let network = null;
+if (window.PerformanceObserver) {
+    network = new PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) {
+            if (entry.initiatorType === 'fetch' || entry.initiatorType === 'xmlhttprequest') {
+                lastActivity = performance.now();
+            }
+        }
+    });
+    try { network.observe({type: 'resource'}); } catch (e) { network = null; }
+}
+
+const finish = (reason) => {
+    mutations.disconnect();
+    if (network) network.disconnect();
+    window.scrollTo(0, 0);
+    done({count: last, reason: reason, elapsed: performance.now() - start});
+};
+
+toBottom();
+const tick = () => {
+    const now = performance.now();
+    if (endSelector && document.querySelector(endSelector)) return finish('end_marker');
+    if (now - lastActivity >= settleMs) return finish('settled');
+    if (now - start >= maxWaitMs) return finish('timeout');
+    toBottom();
+    setTimeout(tick, 100);
+};
+tick();
+"""
+
+# Извлекает поля всех карточек за один вызов execute_script.
+# Порядок поиска карточек и запасные варианты для валюты повторяют
+# _extract_cards_webdriver: meta[itemprop=priceCurrency] -> span.ui-XXdez -> "нет данных".
+_EXTRACT_CARDS_JS = r"""
+const currencyMap = arguments[0];
+const noData = arguments[1];
+const PRODUCT = 'div[itemtype="http://schema.org/Product"]';
+const text = (el) => el ? (el.innerText || el.textContent || '').trim() : '';
+
+let cards = Array.from(document.querySelectorAll('div.ProductCardMain_card__KQzzn'));
+if (cards.length === 0) {
+    const seen = new Set();
+    for (const link of document.querySelectorAll('link[itemprop="url"]')) {
+        const card = link.closest('div[class*="ProductCardMain_card"]')
+            || link.closest('div[class*="ProductCard"], div[class*="Card"]');
+        if (card && !seen.has(card)) { seen.add(card); cards.push(card); }
+    }
+}
+if (cards.length === 0) {
+    cards = Array.from(document.querySelectorAll(PRODUCT));
+}
+if (cards.length <= 1) {
+    const byName = new Set();
+    for (const nameEl of document.querySelectorAll('div[itemprop="name"]')) {
+        const card = nameEl.closest(PRODUCT);
+        if (card) byName.add(card);
+    }
+    if (byName.size > cards.length) cards = Array.from(byName);
+}
+if (cards.length === 0) {
+    cards = Array.from(document.querySelectorAll('div.ProductCard'));
+}
+
+return cards.map((card) => {
+    const link = card.querySelector('link[itemprop="url"]');
+    const priceEl = card.querySelector('span[data-testid="price"]');
+    let currency = noData;
+    const meta = card.querySelector('meta[itemprop="priceCurrency"]');
+    if (meta) {
+        const code = meta.getAttribute('content');
+        currency = code ? (currencyMap[code] || code) : noData;
+    } else {
+        const span = (priceEl && priceEl.querySelector('span[class*="ui-XXdez"]'))
+            || card.querySelector('span.ui-XXdez');
+        if (span) currency = text(span);
+    }
+    const instock = card.querySelector('div.MainInfo_count__MmnNN');
+    const availability = card.querySelector('link[itemprop="availability"]');
+    const name = card.querySelector('div[itemprop="name"]');
+    return {
+        name: name ? text(name) : noData,
+        price: priceEl ? text(priceEl).split(/\s+/).join(' ') : noData,
+        currency: currency,
+        url: link ? (link.href || link.getAttribute('href')) : null,
+        instock_text: instock ? text(instock) : noData,
+        instock_schema: availability ? availability.getAttribute('href') : noData,
+    };
+});
+"""
+
+
+def scrape(url="https://www.divan.ru/category/lamp"):
+    """Парсит одну страницу раздела (по умолчанию lamp, для теста)."""
     return scrape_section(url, headless=True)
 
-def scrape_all_pages(base_url="https://www.divan.ru/category/svet?sort=0", headless=True, max_pages=50, delay_between_pages=3):
+def scrape_all_pages(base_url="https://www.divan.ru/category/svet?sort=0", headless=True, max_pages=50,
+                     delay_between_pages=3, pool=None, max_pages_per_driver=20, workers=1, max_rps=None,
+                     blocking=True, engine="selenium", min_cards=None, resume=False, checkpoint=None,
+                     cache=None, sinks=(), collect=True, archive=None):
     """
     Проходит по всем страницам раздела divan.ru/свет и возвращает список товаров.
 
@@ -24,48 +149,376 @@ def scrape_all_pages(base_url="https://www.divan.ru/category/svet?sort=0", headl
         headless (bool): Если True, запускает браузер в headless режиме.
         max_pages (int): Максимальное количество страниц для обхода.
         delay_between_pages (int): Задержка между запросами страниц в секундах (по умолчанию 3).
+        pool (DriverPool | None): Пул драйверов. Если не передан, создается пул
+                                  на workers браузеров, которые переиспользуются всеми страницами.
+        max_pages_per_driver (int): Через сколько страниц браузер пересоздается
+                                    (только для пула, созданного здесь).
+        workers (int): Количество браузеров, загружающих страницы параллельно.
+                       При workers=1 страницы обходятся последовательно.
+        max_rps (float | None): Общий лимит запросов в секунду для параллельного режима.
+                                По умолчанию 1 / delay_between_pages.
+        blocking (bool | BlockingProfile): Блокировка картинок, шрифтов, медиа и аналитики
+                                           (только для пула, созданного здесь). True — профиль
+                                           по умолчанию, False — загружать все ресурсы.
+        engine (str): "selenium" — рендерить каждую страницу в браузере,
+                      "http" — загружать HTML без браузера через пул keep-alive соединений
+                      и открывать браузер только для страниц, где карточек меньше min_cards.
+        min_cards (int | None): Порог карточек для перехода на Selenium в режиме engine="http".
+                       None — столько же, сколько на первой странице раздела (на последней
+                       странице — одна); страницы за последней в браузер не отправляются.
+        resume (bool): Продолжить прерванный обход с контрольной точки: готовые страницы
+                       не загружаются повторно, дедупликация восстанавливается по их товарам.
+        checkpoint (str | Path | CheckpointStore | None): Файл контрольной точки. После каждой
+                       страницы ее товары дописываются туда. По умолчанию при resume=True
+                       используется output/checkpoint.jsonl, иначе контрольные точки не пишутся.
+        cache (bool | ResponseCache | None): Дисковый кэш ответов для engine="http".
+                       True — кэш в output/http_cache с настройками по умолчанию.
+        sinks (list[saver.Sink]): Потоковые записи (saver.CsvSink и т.д.): новые товары
+                       каждой страницы сразу пишутся в них. Открываются и закрываются здесь.
+        collect (bool): Если False, товары не накапливаются в памяти и возвращается
+                       пустой список — данные остаются только в sinks и контрольной точке.
+        archive (bool | str | Path | PageArchive | None): Архив страниц: HTML каждой загруженной
+                       страницы дописывается туда для повторного разбора без браузера
+                       (archive.replay). True — output/pages.archive.
 
     Returns:
-        list[dict]: Список всех товаров из раздела.
+        list[Product]: Список всех товаров из раздела (в порядке страниц).
     """
     all_results = []
-    seen_urls = set()  # Для отслеживания дубликатов между страницами
-    
-    for page in range(0, max_pages):  # Пагинация начинается с 0
-        # Формируем URL с параметром page
-        separator = "&" if "?" in base_url else "?"
-        url = f"{base_url}{separator}page={page}"
+    total = 0
+    for sink in sinks:
+        sink.open()
+    try:
+        pages = iter_pages(base_url, headless=headless, max_pages=max_pages,
+                           delay_between_pages=delay_between_pages, pool=pool,
+                           max_pages_per_driver=max_pages_per_driver, workers=workers, max_rps=max_rps,
+                           blocking=blocking, engine=engine, min_cards=min_cards, resume=resume,
+                           checkpoint=checkpoint, cache=cache, archive=archive)
+        for page, records in pages:
+            for sink in sinks:
+                sink.write_batch(records)
+            if collect:
+                all_results.extend(records)
+            total += len(records)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    print(f"\nВсего собрано уникальных товаров: {total}")
+    return all_results
+
+
+def iter_pages(base_url="https://www.divan.ru/category/svet?sort=0", headless=True, max_pages=50,
+               delay_between_pages=3, pool=None, max_pages_per_driver=20, workers=1, max_rps=None,
+               blocking=True, engine="selenium", min_cards=None, resume=False, checkpoint=None, cache=None,
+               archive=None, limiter=None):
+    """
+    Лениво обходит страницы раздела и отдает новые товары каждой страницы.
+
+    Параметры такие же, как у scrape_all_pages, и limiter (RateLimiter | None) —
+    общий лимит запросов (например, к хосту для нескольких разделов), которого
+    ждет каждая страница вместо max_rps. Страница загружается только тогда,
+    когда потребитель запросил следующую пачку. При закрытии генератора (break,
+    close(), выход из with closing(...)) браузеры, HTTP-сессия, кэш и контрольная
+    точка освобождаются сразу.
+
+    Yields:
+        tuple[int, list[Product]]: Номер страницы и ее товары без дубликатов
+                                (в порядке страниц). При resume сначала отдаются
+                                страницы, восстановленные из контрольной точки.
+    """
+    if engine not in ("selenium", "http"):
+        raise ValueError(f"Неизвестный engine: {engine!r} (ожидается 'selenium' или 'http')")
+
+    # Браузеры в пуле запускаются лениво, поэтому в режиме http пул ничего не стоит,
+    # пока не понадобится fallback
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool(size=workers, headless=headless, max_pages_per_driver=max_pages_per_driver,
+                          blocking=BlockingProfile.resolve(blocking))
+
+    own_archive = False
+    if archive:
+        # Импорт здесь: так python -m myproject.archive не импортирует модуль дважды
+        from .archive import PageArchive
+
+        own_archive = not isinstance(archive, PageArchive)
+        if own_archive:
+            archive = PageArchive() if archive is True else PageArchive(archive)
+    else:
+        archive = None
+
+    def render(url, page_info=None):
+        return scrape_section(url, headless=headless, pool=pool, page_info=page_info, archive=archive)
+
+    own_cache = False
+    fetcher = None
+    store = None
+    try:
+        state = None
+        if resume or checkpoint is not None:
+            store = checkpoint if isinstance(checkpoint, CheckpointStore) else CheckpointStore(checkpoint or DEFAULT_CHECKPOINT)
+            state = store.load(base_url) if resume else None
+            store.start(base_url, resume=state is not None)
+
+        if engine == "http":
+            own_cache = cache is True
+            if own_cache:
+                cache = ResponseCache()
+            fetcher = HttpFetcher(pool_size=max(workers, 1), cache=cache or None)
+            fetch = _http_fetch(fetcher, min_cards, render, archive)
+        else:
+            fetch = render
+
+        seen_urls, done, last_page = set(), set(), max_pages
+        if state:
+            seen_urls, done, last_page = _restore(state, max_pages)
+            for page in sorted(done):
+                yield page, [Product.from_dict(item) for item in state["pages"][page]]
+
+        if workers > 1:
+            if limiter is None:
+                if max_rps is None and delay_between_pages:
+                    max_rps = 1.0 / delay_between_pages
+                limiter = RateLimiter(max_rps)
+            pages = _iter_pages_parallel(base_url, workers, limiter, fetch,
+                                         seen_urls, done, last_page, store)
+        else:
+            pages = _iter_pages_sequential(base_url, delay_between_pages, fetch,
+                                           seen_urls, done, last_page, store, limiter)
+        try:
+            for page, records in pages:
+                # Новые товары страницы: сразу на диск
+                if store is not None:
+                    store.append_page(page, records)
+                yield page, records
+        finally:
+            pages.close()
+        if store is not None:
+            store.finish()
+    finally:
+        if store is not None:
+            store.close()
+        if fetcher is not None:
+            fetcher.close()
+        if own_cache:
+            cache.close()
+        if own_archive:
+            archive.close()
+        if pool.blocking is not None:
+            print(f"Блокировка ресурсов: {pool.blocking.summary()}")
+        if own_pool:
+            pool.close()
+
+
+def iter_products(base_url="https://www.divan.ru/category/svet?sort=0", limit=None, until=None, **kwargs):
+    """
+    Лениво отдает товары раздела по одному, по мере загрузки страниц.
+
+    Args:
+        base_url (str): Базовый URL раздела без параметра page.
+        limit (int | None): Остановиться после limit товаров.
+        until (callable | None): Остановиться после товара, для которого until(item) истинно.
+        **kwargs: Остальные параметры iter_pages / scrape_all_pages.
+
+    Yields:
+        Product: Товар. Как только обход останавливается (limit, until или закрытие
+              генератора потребителем), браузеры и соединения освобождаются.
+    """
+    pages = iter_pages(base_url, **kwargs)
+    count = 0
+    try:
+        for page, records in pages:
+            for item in records:
+                yield item
+                count += 1
+                if (limit is not None and count >= limit) or (until is not None and until(item)):
+                    return
+    finally:
+        pages.close()
+
+
+def _page_url(base_url, page):
+    """Формирует URL страницы раздела с параметром page."""
+    separator = "&" if "?" in base_url else "?"
+    return f"{base_url}{separator}page={page}"
+
+
+def _restore(state, max_pages):
+    """
+    Восстанавливает состояние обхода из контрольной точки за O(количества товаров).
+
+    Восстанавливаются все записанные страницы, в том числе после пропусков
+    (страница с ошибкой при параллельном обходе): загружаются только недостающие.
+
+    Returns:
+        tuple: (seen_urls, номера загруженных страниц, last_page).
+    """
+    seen_urls = set()
+    count = 0
+    for records in state["pages"].values():
+        count += len(records)
+        seen_urls.update(item["url"] for item in records if item.get("url"))
+    done = set(state["pages"])
+    last_page = min(state["page_count"], max_pages) if state["page_count"] else max_pages
+    print(f"Продолжаем обход со страницы {_first_missing(done)}: восстановлено {count} товаров "
+          f"с {len(done)} страниц.")
+    return seen_urls, done, last_page
+
+
+def _first_missing(done):
+    """Первая страница, которой нет среди загруженных."""
+    page = 0
+    while page in done:
+        page += 1
+    return page
+
+
+def _page_number(url):
+    """Номер страницы из параметра page URL (0, если параметра нет)."""
+    value = parse_qs(urlsplit(url).query).get("page", ["0"])[-1]
+    return int(value) if value.isdigit() else 0
+
+
+def _http_fetch(fetcher, min_cards, fallback, archive=None):
+    """
+    Функция загрузки страниц раздела для engine="http": fetch(url, page_info=None).
+
+    Порог для перехода на браузер (min_cards=None) калибруется по первой
+    странице раздела: она загружается и по HTTP, и в браузере. Число карточек
+    после рендеринга — полная страница (per_page); если в статическом HTML их
+    меньше, сайт подгружает карточки при прокрутке. Дальше страница, где в HTML
+    меньше per_page карточек, рендерится в браузере. Последняя страница бывает
+    неполной: на ней хватает одной карточки, а на сайте с подгрузкой — больше,
+    чем отдается без прокрутки. Страницы за последней (по количеству страниц
+    раздела или после неполной страницы, отрендеренной браузером) в браузер не
+    отправляются: пустая страница там — конец раздела.
+    """
+    section = {"per_page": None, "static_per_page": None, "page_count": None, "last_page": None}
+
+    def threshold(page):
+        page_count, last_page = section["page_count"], section["last_page"]
+        if page_count is not None and page >= page_count:
+            return None
+        if last_page is not None and page > last_page:
+            return None
+        if min_cards is not None:
+            return min_cards
+        per_page, static_per_page = section["per_page"], section["static_per_page"]
+        if not per_page:
+            return 1
+        if page_count and page == page_count - 1:
+            return static_per_page + 1 if per_page > static_per_page else 1
+        return per_page
+
+    def calibrate(url, info):
+        """Первая страница: статический HTML и рендеринг в браузере, порог — по большему."""
+        results = scrape_page_http(url, fetcher=fetcher, min_cards=0, page_info=info)
+        section["static_per_page"] = len(results)
+        try:
+            rendered = fallback(url)
+        except Exception as e:
+            print(f"Не удалось отрендерить первую страницу для калибровки: {e}")
+            rendered = []
+        if len(rendered) > len(results):
+            print(f"Без прокрутки в HTML {len(results)} из {len(rendered)} карточек: "
+                  f"страницы с меньшим числом карточек загружаются через браузер.")
+            results = rendered
+        return results
+
+    def fetch(url, page_info=None):
+        page = _page_number(url)
+        info = page_info if page_info is not None or page != 0 else {}
+        if page == 0 and min_cards is None and fallback is not None:
+            results = calibrate(url, info)
+        else:
+            cards = threshold(page)
+            results = scrape_page_http(url, fetcher=fetcher, min_cards=cards or 0,
+                                       fallback=fallback if cards else None, page_info=info, archive=archive)
+        if page == 0:
+            section["per_page"] = len(results) or None
+            if section["static_per_page"] is None:
+                section["static_per_page"] = len(results)
+            section["page_count"] = info.get("page_count")
+        elif section["per_page"] and len(results) < section["per_page"] and section["page_count"] is None:
+            # Неполная страница (уже после браузера) — последняя в разделе
+            last_page = section["last_page"]
+            section["last_page"] = page if last_page is None else min(last_page, page)
+        return results
+
+    return fetch
+
+
+def _plan_pages(page_info, max_pages, checkpoint=None):
+    """
+    Ограничивает обход числом страниц, найденным на первой странице раздела.
+
+    Returns:
+        int: Номер страницы, на которой обход заканчивается (не включительно).
+    """
+    page_count = page_info.get("page_count")
+    if not page_count:
+        print("Количество страниц не найдено, идем до первой пустой страницы.")
+        return max_pages
+    if checkpoint is not None:
+        checkpoint.set_page_count(page_count)
+    print(f"В разделе {page_count} страниц, планируем обход {min(page_count, max_pages)} страниц.")
+    return min(page_count, max_pages)
+
+
+def _merge_page(page, results, seen_urls):
+    """
+    Отбрасывает товары страницы, уже встречавшиеся на предыдущих страницах (по URL).
+
+    Returns:
+        tuple[list[Product], bool]: Новые товары и False, если обход раздела нужно остановить.
+    """
+    if not results:
+        print(f"Нет данных на странице {page}, останавливаемся.")
+        return [], False
+
+    # Фильтруем дубликаты между страницами
+    new_results = []
+    for item in results:
+        item_url = item.get("url", "")
+        if item_url and item_url not in seen_urls:
+            seen_urls.add(item_url)
+            new_results.append(item)
+
+    if new_results:
+        print(f"Добавлено {len(new_results)} новых товаров со страницы {page} (всего: {len(seen_urls)})")
+    else:
+        print(f"Все товары со страницы {page} уже были добавлены ранее (дубликаты)")
+        # Если все товары дубликаты, возможно, мы дошли до конца
+        if page > 0:  # Исправлено: пагинация начинается с 0
+            print("Возможно, достигнут конец раздела.")
+            return new_results, False
+    return new_results, True
+
+
+def _iter_pages_sequential(base_url, delay_between_pages, fetch, seen_urls, done, last_page,
+                           checkpoint=None, limiter=None):
+    """
+    Последовательный обход страниц раздела.
+
+    fetch(url, page_info=None) возвращает товары страницы; для первой страницы
+    в page_info записывается количество страниц раздела, если его удалось найти.
+    Страницы из done (восстановленные из контрольной точки) пропускаются.
+    """
+    max_pages = last_page
+    page = _first_missing(done)  # Пагинация начинается с 0
+    while page < last_page:
+        if page in done:
+            page += 1
+            continue
+        url = _page_url(base_url, page)
         print(f"\n=== Парсим страницу {page}: {url} ===")
-        
+        page_info = {} if page == 0 else None
+        if limiter is not None:
+            limiter.wait()
+
         try:
-            results = scrape_section(url, headless=headless)
-            if not results:
-                print(f"Нет данных на странице {page}, останавливаемся.")
-                break
-            
-            # Фильтруем дубликаты между страницами
-            new_results = []
-            for item in results:
-                item_url = item.get("url", "")
-                if item_url and item_url not in seen_urls:
-                    seen_urls.add(item_url)
-                    new_results.append(item)
-            
-            if new_results:
-                all_results.extend(new_results)
-                print(f"Добавлено {len(new_results)} новых товаров со страницы {page} (всего: {len(all_results)})")
-            else:
-                print(f"Все товары со страницы {page} уже были добавлены ранее (дубликаты)")
-                # Если все товары дубликаты, возможно, мы дошли до конца
-                if page > 0:  # Исправлено: пагинация начинается с 0
-                    print("Возможно, достигнут конец раздела.")
-                    break
-            
-            # Добавляем задержку между страницами, чтобы не перегружать сайт
-            if page < max_pages - 1:  # Не ждем после последней страницы
-                print(f"Ожидание {delay_between_pages} секунд перед следующей страницей...")
-                time.sleep(delay_between_pages)
-                    
+            results = fetch(url, page_info=page_info)
         except Exception as e:
             print(f"Ошибка при парсинге страницы {page}: {e}")
             print(f"Тип ошибки: {type(e).__name__}")
@@ -77,12 +530,92 @@ def scrape_all_pages(base_url="https://www.divan.ru/category/svet?sort=0", headl
                 # Обычная задержка при других ошибках
                 time.sleep(delay_between_pages)
             # Продолжаем со следующей страницей
+            page += 1
             continue
-    
-    print(f"\nВсего собрано уникальных товаров: {len(all_results)}")
-    return all_results
 
-def scrape_section(url, headless=False, timeout=60):
+        new_results, keep_going = _merge_page(page, results, seen_urls)
+        if new_results:
+            yield page, new_results
+        if not keep_going:
+            break
+        if page_info is not None:
+            last_page = _plan_pages(page_info, max_pages, checkpoint)
+
+        # Добавляем задержку между страницами, чтобы не перегружать сайт
+        if delay_between_pages and page < last_page - 1:  # Не ждем после последней страницы
+            print(f"Ожидание {delay_between_pages} секунд перед следующей страницей...")
+            time.sleep(delay_between_pages)
+        page += 1
+
+
+def _iter_pages_parallel(base_url, workers, limiter, fetch, seen_urls, done, last_page,
+                         checkpoint=None):
+    """
+    Параллельный обход страниц раздела несколькими браузерами.
+
+    Сначала загружается первая страница: если на ней найдено количество страниц,
+    параллельно запрашиваются ровно нужные страницы. Дальше одновременно
+    загружается не больше workers страниц. Результаты отдаются строго в порядке
+    номеров страниц, поэтому дедупликация и условие остановки работают так же,
+    как в последовательном режиме. Страницы из done не загружаются.
+    """
+    max_pages = last_page
+    start_page = _first_missing(done)
+    first_page_info = {}
+
+    def load(page):
+        limiter.wait()  # Общий бюджет запросов в секунду на все браузеры
+        url = _page_url(base_url, page)
+        print(f"\n=== Парсим страницу {page}: {url} ===")
+        return fetch(url, page_info=first_page_info if page == 0 else None)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {}
+        next_page = start_page
+        # Первую страницу раздела загружаем отдельно, чтобы спланировать остальные
+        window = 1 if start_page == 0 else workers
+        while len(futures) < window and next_page < last_page:
+            if next_page not in done:
+                futures[next_page] = executor.submit(load, next_page)
+            next_page += 1
+
+        for page in range(start_page, max_pages):
+            if page in done:
+                continue
+            future = futures.pop(page, None)
+            if future is None:
+                break
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"Ошибка при парсинге страницы {page}: {e}")
+                print(f"Тип ошибки: {type(e).__name__}")
+                results = None
+
+            if results is not None:
+                new_results, keep_going = _merge_page(page, results, seen_urls)
+                if new_results:
+                    yield page, new_results
+                if not keep_going:
+                    break
+            if page == 0:
+                last_page = _plan_pages(first_page_info, max_pages, checkpoint)
+
+            # Заполняем окно следующими страницами
+            while len(futures) < workers and next_page < last_page:
+                if next_page not in done:
+                    futures[next_page] = executor.submit(load, next_page)
+                next_page += 1
+    finally:
+        # Страницы, которые еще не начали загружаться, отменяются; текущие дожидаемся,
+        # чтобы браузеры вернулись в пул до его закрытия
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def scrape_section(url, headless=False, timeout=60, pool=None, extract="js",
+                   scroll_max_wait=20, scroll_settle=1.0, end_selector=None, blocking=True, page_info=None,
+                   archive=None):
     """
     Парсит одну страницу раздела divan.ru и возвращает список товаров.
 
@@ -91,9 +624,26 @@ def scrape_section(url, headless=False, timeout=60):
                    "https://www.divan.ru/category/svet?sort=0&page=0"
         headless (bool): Если True, запускает браузер в headless режиме.
         timeout (int): Таймаут загрузки страницы в секундах.
+        pool (DriverPool | None): Пул драйверов. Если не передан, браузер
+                                  запускается только для этой страницы.
+        extract (str): Способ извлечения товаров после рендеринга:
+                       "js" — одним вызовом execute_script в браузере,
+                       "html" — разбором driver.page_source через extractor (без запросов к браузеру).
+        scroll_max_wait (float): Максимальное время ожидания подгрузки товаров в секундах.
+        scroll_settle (float): Сколько секунд количество карточек и сетевые запросы
+                               должны не меняться, чтобы считать подгрузку завершенной.
+        end_selector (str | None): CSS-селектор маркера «больше товаров нет»;
+                                   при его появлении ожидание прекращается сразу.
+        blocking (bool | BlockingProfile): Профиль блокировки ресурсов для браузера,
+                                           запускаемого без пула (см. scrape_all_pages).
+        page_info (dict | None): Если передан, в него записывается page_count —
+                                 количество страниц раздела (или None).
+        archive (PageArchive | None): Если передан, итоговый HTML страницы после подгрузки
+                                      карточек сохраняется в архив вместе с URL и временем
+                                      этапов — для повторного разбора без браузера (archive.replay).
 
     Returns:
-        list[dict]: Список словарей с данными о товарах:
+        list[Product]: Товары (Product ведет себя как словарь) с полями:
             - name: название товара
             - price: цена
             - currency: валюта
@@ -101,49 +651,20 @@ def scrape_section(url, headless=False, timeout=60):
             - instock_text: текст о наличии
     """
 
-    options = Options()
-    options.binary_location = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
-    
-    # Добавляем User-Agent, режим инкогнито и очистку кэша для избежания блокировки
-    options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    options.add_argument("--incognito")
-    options.add_argument("--disable-cache")
-    
-    # Оптимизация для ускорения загрузки
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    if headless:
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-    else:
-        # В обычном режиме тоже добавляем размер окна
-        options.add_argument("--window-size=1920,1080")
-    
-    # Используем eager для более быстрой загрузки (не ждем всех ресурсов)
-    options.page_load_strategy = 'eager'
-    
-    print(f"Инициализация ChromeDriver для URL: {url}")
-    try:
-        # Пробуем использовать webdriver-manager для автоматической загрузки драйвера
-        print("Установка ChromeDriver через webdriver-manager...")
-        service = Service("chromedriver.exe")  # драйвер лежит в папке проекта
-        driver = webdriver.Chrome(service=service, options=options)
-    except Exception as e:
-        print(f"Ошибка при использовании webdriver-manager: {e}")
-        print("Пробуем использовать системный ChromeDriver...")
-        # Если webdriver-manager не работает, пробуем системный драйвер
-        driver = webdriver.Chrome(options=options)
-    
-    driver.set_page_load_timeout(timeout)
-    
+    # Если пул не передан, создаем временный пул на один браузер
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool(size=1, headless=headless, timeout=timeout,
+                          blocking=BlockingProfile.resolve(blocking))
+
+    print(f"Получаем драйвер из пула для URL: {url}")
+    driver = pool.acquire()
+    broken = False
+
     try:
+        driver.set_page_load_timeout(timeout)
         print("Загрузка страницы...")
+        started = time.perf_counter()
         try:
             driver.get(url)
             # Проверяем, не произошла ли переадресация на страницу ошибки
@@ -162,6 +683,8 @@ def scrape_section(url, headless=False, timeout=60):
             print("Предупреждение: Страница загрузилась частично (таймаут page load)")
             print(f"Текущий URL: {driver.current_url}")
         
+        loaded = time.perf_counter()
+
         # Ждем загрузки страницы с явным ожиданием
         wait = WebDriverWait(driver, timeout)
         try:
@@ -170,307 +693,377 @@ def scrape_section(url, headless=False, timeout=60):
         except TimeoutException:
             print("Предупреждение: Не удалось дождаться body элемента")
         
-        # Прокручиваем страницу постепенно для загрузки всех товаров (lazy loading)
-        print("Прокручиваем страницу для загрузки всех товаров...")
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        scroll_attempts = 0
-        max_scroll_attempts = 10  # Максимум попыток прокрутки
-        
-        while scroll_attempts < max_scroll_attempts:
-            # Прокручиваем вниз
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Ждем загрузки новых товаров
-            
-            # Проверяем, появилась ли новая высота страницы
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                # Если высота не изменилась, пробуем еще раз
-                scroll_attempts += 1
-                if scroll_attempts < max_scroll_attempts:
-                    time.sleep(1)
-                    # Прокручиваем еще немного
-                    driver.execute_script("window.scrollBy(0, 500);")
-                    time.sleep(1)
-            else:
-                # Высота изменилась - появились новые товары
-                scroll_attempts = 0
-                last_height = new_height
-                print(f"  Загружено больше товаров, текущая высота страницы: {new_height}px")
-        
-        # Прокручиваем обратно наверх
-        driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
-        print("Прокрутка завершена, начинаем поиск карточек товаров...")
-        
         # Ждем появления карточек товаров
         try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[itemtype="http://schema.org/Product"]')))
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_SELECTOR)))
             print("Карточки товаров обнаружены на странице")
         except TimeoutException:
             print("Предупреждение: Не удалось дождаться появления карточек товаров")
-        
-        # Пробуем найти карточки по классу ProductCardMain_card__KQzzn
-        print("Пробуем селектор: div.ProductCardMain_card__KQzzn")
-        lamps = driver.find_elements(By.CSS_SELECTOR, 'div.ProductCardMain_card__KQzzn')
-        print(f"Найдено карточек по классу ProductCardMain_card__KQzzn: {len(lamps)}")
-        
-        # Если нашли карточки по классу, используем их
-        if lamps:
-            print(f"Используем карточки, найденные по классу ProductCardMain_card__KQzzn")
+
+        # Прокручиваем страницу до тех пор, пока подгружаются новые товары (lazy loading)
+        print("Прокручиваем страницу для загрузки всех товаров...")
+        _wait_for_lazy_load(driver, max_wait=scroll_max_wait, settle=scroll_settle, end_selector=end_selector)
+        print("Прокрутка завершена, начинаем поиск карточек товаров...")
+        rendered = time.perf_counter()
+        # Итоговый HTML нужен для разбора в режиме "html" и для архива
+        html = driver.page_source if extract == "html" or archive is not None else None
+
+        if extract == "html":
+            # Браузер только рендерит, разбор идет по готовому HTML
+            results = extract_products(html, base_url=driver.current_url)
+            if page_info is not None:
+                page_info["page_count"] = extract_page_count(html, per_page=len(results))
         else:
-            # Если не нашли, пробуем найти через ссылки на товары
-            print("Пробуем найти через ссылки link[itemprop='url']")
-            url_elements = driver.find_elements(By.CSS_SELECTOR, 'link[itemprop="url"]')
-            print(f"Найдено ссылок с itemprop='url': {len(url_elements)}")
-            
-            if url_elements:
-                print(f"Используем ссылки для поиска уникальных карточек")
-                lamps = []
-                seen_urls = set()
-                for url_elem in url_elements:
-                    try:
-                        # Получаем URL товара
-                        product_url = url_elem.get_attribute("href")
-                        if product_url and product_url not in seen_urls:
-                            seen_urls.add(product_url)
-                            # Ищем родительский элемент с классом ProductCardMain_card__KQzzn
+            # Извлекаем все карточки одним вызовом execute_script
+            results = _extract_cards_js(driver)
+            if not results:
+                print("Извлечение через JavaScript не дало результатов, используем find_element...")
+                results = _extract_cards_webdriver(driver)
+            if page_info is not None:
+                page_info["page_count"] = extract_page_count(html or driver.page_source, per_page=len(results))
+
+        if archive is not None:
+            archive.append(url, html, final_url=driver.current_url, title=driver.title, products=len(results),
+                           timings={"load": round(loaded - started, 3), "render": round(rendered - loaded, 3),
+                                    "extract": round(time.perf_counter() - rendered, 3)})
+        print(f"Всего спарсено товаров: {len(results)}")
+        return results
+
+    except TimeoutException as e:
+        # Если страница не загрузилась в течение таймаута, возвращаем пустой список
+        print(f"Таймаут при загрузке страницы: {e}")
+        print(f"URL: {url}")
+        return []
+    except WebDriverException as e:
+        # Обрабатываем другие ошибки WebDriver
+        broken = True
+        print(f"Ошибка WebDriver: {e}")
+        print(f"Тип ошибки: {type(e).__name__}")
+        return []
+    except Exception as e:
+        # Обрабатываем любые другие ошибки
+        print(f"Неожиданная ошибка: {e}")
+        print(f"Тип ошибки: {type(e).__name__}")
+        import traceback
+        traceback.print_exc()
+        return []
+    finally:
+        if pool.blocking is not None and not broken:
+            pool.blocking.collect_stats(driver)
+        # Возвращаем драйвер в пул (сломанный драйвер будет закрыт)
+        pool.release(driver, broken=broken)
+        if own_pool:
+            pool.close()
+
+
+def _extract_cards_webdriver(driver):
+    """
+    Запасной способ извлечения: ищет карточки и их поля через find_element.
+
+    Делает несколько HTTP-запросов к WebDriver на каждую карточку, поэтому
+    используется, только если _extract_cards_js ничего не вернул.
+    """
+    # Пробуем найти карточки по классу ProductCardMain_card__KQzzn
+    print("Пробуем селектор: div.ProductCardMain_card__KQzzn")
+    lamps = driver.find_elements(By.CSS_SELECTOR, 'div.ProductCardMain_card__KQzzn')
+    print(f"Найдено карточек по классу ProductCardMain_card__KQzzn: {len(lamps)}")
+    
+    # Если нашли карточки по классу, используем их
+    if lamps:
+        print(f"Используем карточки, найденные по классу ProductCardMain_card__KQzzn")
+    else:
+        # Если не нашли, пробуем найти через ссылки на товары
+        print("Пробуем найти через ссылки link[itemprop='url']")
+        url_elements = driver.find_elements(By.CSS_SELECTOR, 'link[itemprop="url"]')
+        print(f"Найдено ссылок с itemprop='url': {len(url_elements)}")
+        
+        if url_elements:
+            print(f"Используем ссылки для поиска уникальных карточек")
+            lamps = []
+            seen_urls = set()
+            for url_elem in url_elements:
+                try:
+                    # Получаем URL товара
+                    product_url = url_elem.get_attribute("href")
+                    if product_url and product_url not in seen_urls:
+                        seen_urls.add(product_url)
+                        # Ищем родительский элемент с классом ProductCardMain_card__KQzzn
+                        try:
+                            parent = url_elem.find_element(By.XPATH, './ancestor::div[contains(@class, "ProductCardMain_card")][1]')
+                            lamps.append(parent)
+                        except NoSuchElementException:
+                            # Если не нашли по классу, пробуем найти ближайший контейнер карточки
                             try:
-                                parent = url_elem.find_element(By.XPATH, './ancestor::div[contains(@class, "ProductCardMain_card")][1]')
+                                parent = url_elem.find_element(By.XPATH, './ancestor::div[contains(@class, "ProductCard") or contains(@class, "Card")][1]')
                                 lamps.append(parent)
                             except NoSuchElementException:
-                                # Если не нашли по классу, пробуем найти ближайший контейнер карточки
-                                try:
-                                    parent = url_elem.find_element(By.XPATH, './ancestor::div[contains(@class, "ProductCard") or contains(@class, "Card")][1]')
-                                    lamps.append(parent)
-                                except NoSuchElementException:
-                                    continue
-                    except NoSuchElementException:
-                        # Если у ссылки нет родителя или href отсутствует
-                        continue
-                print(f"Найдено уникальных карточек через ссылки: {len(lamps)}")
-            
-            # Если все еще не нашли, пробуем селектор itemtype
-            if not lamps:
-                print("Пробуем селектор: div[itemtype='http://schema.org/Product']")
-                lamps = driver.find_elements(By.CSS_SELECTOR, 'div[itemtype="http://schema.org/Product"]')
-                print(f"Найдено по селектору itemtype: {len(lamps)}")
+                                continue
+                except NoSuchElementException:
+                    # Если у ссылки нет родителя или href отсутствует
+                    continue
+            print(f"Найдено уникальных карточек через ссылки: {len(lamps)}")
         
-        # Если все еще мало карточек, пробуем найти через div[itemprop='name']
-        if len(lamps) <= 1:
-            print("Пробуем найти через div[itemprop='name']")
-            name_elements = driver.find_elements(By.CSS_SELECTOR, 'div[itemprop="name"]')
-            print(f"Найдено элементов с itemprop='name': {len(name_elements)}")
-            
-            if len(name_elements) > len(lamps):
-                print(f"Найдено больше элементов через itemprop='name' ({len(name_elements)}), используем их")
-                lamps = []
-                seen_urls = set()  # Используем URL для уникальности
-                for name_elem in name_elements:
+        # Если все еще не нашли, пробуем селектор itemtype
+        if not lamps:
+            print("Пробуем селектор: div[itemtype='http://schema.org/Product']")
+            lamps = driver.find_elements(By.CSS_SELECTOR, 'div[itemtype="http://schema.org/Product"]')
+            print(f"Найдено по селектору itemtype: {len(lamps)}")
+    
+    # Если все еще мало карточек, пробуем найти через div[itemprop='name']
+    if len(lamps) <= 1:
+        print("Пробуем найти через div[itemprop='name']")
+        name_elements = driver.find_elements(By.CSS_SELECTOR, 'div[itemprop="name"]')
+        print(f"Найдено элементов с itemprop='name': {len(name_elements)}")
+        
+        if len(name_elements) > len(lamps):
+            print(f"Найдено больше элементов через itemprop='name' ({len(name_elements)}), используем их")
+            lamps = []
+            seen_urls = set()  # Используем URL для уникальности
+            for name_elem in name_elements:
+                try:
+                    # Пытаемся найти ссылку на товар в этой карточке
                     try:
-                        # Пытаемся найти ссылку на товар в этой карточке
+                        url_elem = name_elem.find_element(By.XPATH, './ancestor::div[@itemtype="http://schema.org/Product"][1]//link[@itemprop="url"]')
+                        product_url = url_elem.get_attribute("href")
+                    except NoSuchElementException:
+                        # Если не нашли ссылку, пробуем найти родительский контейнер
+                        parent = name_elem.find_element(By.XPATH, './ancestor::div[@itemtype="http://schema.org/Product"][1]')
                         try:
-                            url_elem = name_elem.find_element(By.XPATH, './ancestor::div[@itemtype="http://schema.org/Product"][1]//link[@itemprop="url"]')
+                            url_elem = parent.find_element(By.CSS_SELECTOR, 'link[itemprop="url"]')
                             product_url = url_elem.get_attribute("href")
                         except NoSuchElementException:
-                            # Если не нашли ссылку, пробуем найти родительский контейнер
+                            product_url = None
+                    
+                    # Используем URL для проверки уникальности
+                    if product_url and product_url not in seen_urls:
+                        seen_urls.add(product_url)
+                        # Ищем родительский элемент с itemtype="http://schema.org/Product"
+                        try:
                             parent = name_elem.find_element(By.XPATH, './ancestor::div[@itemtype="http://schema.org/Product"][1]')
+                            lamps.append(parent)
+                        except NoSuchElementException:
+                            # Если не нашли родителя с itemtype, пробуем найти любой родительский контейнер
                             try:
-                                url_elem = parent.find_element(By.CSS_SELECTOR, 'link[itemprop="url"]')
-                                product_url = url_elem.get_attribute("href")
-                            except NoSuchElementException:
-                                product_url = None
-                        
-                        # Используем URL для проверки уникальности
-                        if product_url and product_url not in seen_urls:
-                            seen_urls.add(product_url)
-                            # Ищем родительский элемент с itemtype="http://schema.org/Product"
-                            try:
-                                parent = name_elem.find_element(By.XPATH, './ancestor::div[@itemtype="http://schema.org/Product"][1]')
+                                parent = name_elem.find_element(By.XPATH, './ancestor::div[contains(@class, "Product") or contains(@class, "Card") or contains(@class, "Item")][1]')
                                 lamps.append(parent)
                             except NoSuchElementException:
-                                # Если не нашли родителя с itemtype, пробуем найти любой родительский контейнер
-                                try:
-                                    parent = name_elem.find_element(By.XPATH, './ancestor::div[contains(@class, "Product") or contains(@class, "Card") or contains(@class, "Item")][1]')
-                                    lamps.append(parent)
-                                except NoSuchElementException:
-                                    continue
-                    except NoSuchElementException:
-                        continue
-                print(f"Найдено уникальных карточек через названия: {len(lamps)}")
+                                continue
+                except NoSuchElementException:
+                    continue
+            print(f"Найдено уникальных карточек через названия: {len(lamps)}")
+    
+    if not lamps:
+        print("Пробуем селектор: div.ProductCard")
+        # Если не нашли по schema.org, пробуем другой селектор
+        lamps = driver.find_elements(By.CSS_SELECTOR, 'div.ProductCard')
+        print(f"Найдено по второму селектору: {len(lamps)}")
+    
+    print(f"Итого найдено карточек товаров: {len(lamps)}")
+    
+    # Дополнительная диагностика: проверяем, сколько элементов с itemprop="name" найдено
+    if len(lamps) <= 1:
+        print("\n=== ДИАГНОСТИКА ===")
+        name_elements_all = driver.find_elements(By.CSS_SELECTOR, 'div[itemprop="name"]')
+        print(f"Всего элементов с itemprop='name': {len(name_elements_all)}")
         
-        if not lamps:
-            print("Пробуем селектор: div.ProductCard")
-            # Если не нашли по schema.org, пробуем другой селектор
-            lamps = driver.find_elements(By.CSS_SELECTOR, 'div.ProductCard')
-            print(f"Найдено по второму селектору: {len(lamps)}")
+        # Пробуем найти все элементы с itemtype
+        all_itemtypes = driver.find_elements(By.CSS_SELECTOR, '[itemtype]')
+        print(f"Всего элементов с itemtype: {len(all_itemtypes)}")
         
-        print(f"Итого найдено карточек товаров: {len(lamps)}")
+        # Пробуем найти все ссылки с itemprop="url"
+        url_elements = driver.find_elements(By.CSS_SELECTOR, 'link[itemprop="url"]')
+        print(f"Всего ссылок с itemprop='url': {len(url_elements)}")
         
-        # Дополнительная диагностика: проверяем, сколько элементов с itemprop="name" найдено
-        if len(lamps) <= 1:
-            print("\n=== ДИАГНОСТИКА ===")
-            name_elements_all = driver.find_elements(By.CSS_SELECTOR, 'div[itemprop="name"]')
-            print(f"Всего элементов с itemprop='name': {len(name_elements_all)}")
+        if len(name_elements_all) > len(lamps):
+            print(f"\nВНИМАНИЕ: Найдено {len(name_elements_all)} элементов с itemprop='name', но только {len(lamps)} карточек!")
+            print("Пробуем пересобрать список карточек...")
+            lamps = []
+            seen_parents = set()
+            for name_elem in name_elements_all:
+                try:
+                    # Ищем родительский элемент с itemtype="http://schema.org/Product"
+                    parent = name_elem.find_element(By.XPATH, './ancestor::div[@itemtype="http://schema.org/Product"][1]')
+                    parent_id = id(parent)
+                    if parent_id not in seen_parents:
+                        lamps.append(parent)
+                        seen_parents.add(parent_id)
+                except NoSuchElementException:
+                    continue
+            print(f"После пересборки найдено карточек: {len(lamps)}")
+        print("==================\n")
+    
+    # Если ничего не найдено, выводим информацию о странице для отладки
+    if not lamps:
+        print("ВНИМАНИЕ: Карточки товаров не найдены!")
+        print(f"URL страницы: {driver.current_url}")
+        print(f"Заголовок страницы: {driver.title}")
+        # Пробуем найти любые div элементы для диагностики
+        all_divs = driver.find_elements(By.TAG_NAME, "div")
+        print(f"Всего div элементов на странице: {len(all_divs)}")
+        # Пробуем найти элементы с itemprop
+        items_with_prop = driver.find_elements(By.CSS_SELECTOR, '[itemprop]')
+        print(f"Элементов с атрибутом itemprop: {len(items_with_prop)}")
+        if items_with_prop:
+            print("Примеры itemprop атрибутов:")
+            for item in items_with_prop[:5]:
+                print(f"  - {item.tag_name}: {item.get_attribute('itemprop')}")
+    
+    if not lamps:
+        return []
+    results = []
+    
+    # Используем множество для отслеживания уникальных товаров по URL
+    seen_urls = set()
+    
+    for lamp in lamps:
+        try:
+            # Сначала получаем URL товара для проверки уникальности
+            try:
+                product_url = lamp.find_element(By.CSS_SELECTOR, 'link[itemprop="url"]').get_attribute("href")
+                # Делаем абсолютный URL, если нужно
+                if product_url and not product_url.startswith("http"):
+                    product_url = f"https://www.divan.ru{product_url}"
+            except NoSuchElementException:
+                product_url = None
             
-            # Пробуем найти все элементы с itemtype
-            all_itemtypes = driver.find_elements(By.CSS_SELECTOR, '[itemtype]')
-            print(f"Всего элементов с itemtype: {len(all_itemtypes)}")
+            # Пропускаем товары без URL или дубликаты
+            if not product_url or product_url in seen_urls:
+                if product_url:
+                    print(f"Пропущен дубликат: {product_url}")
+                continue
             
-            # Пробуем найти все ссылки с itemprop="url"
-            url_elements = driver.find_elements(By.CSS_SELECTOR, 'link[itemprop="url"]')
-            print(f"Всего ссылок с itemprop='url': {len(url_elements)}")
+            seen_urls.add(product_url)
             
-            if len(name_elements_all) > len(lamps):
-                print(f"\nВНИМАНИЕ: Найдено {len(name_elements_all)} элементов с itemprop='name', но только {len(lamps)} карточек!")
-                print("Пробуем пересобрать список карточек...")
-                lamps = []
-                seen_parents = set()
-                for name_elem in name_elements_all:
-                    try:
-                        # Ищем родительский элемент с itemtype="http://schema.org/Product"
-                        parent = name_elem.find_element(By.XPATH, './ancestor::div[@itemtype="http://schema.org/Product"][1]')
-                        parent_id = id(parent)
-                        if parent_id not in seen_parents:
-                            lamps.append(parent)
-                            seen_parents.add(parent_id)
-                    except NoSuchElementException:
-                        continue
-                print(f"После пересборки найдено карточек: {len(lamps)}")
-            print("==================\n")
-        
-        # Если ничего не найдено, выводим информацию о странице для отладки
-        if not lamps:
-            print("ВНИМАНИЕ: Карточки товаров не найдены!")
-            print(f"URL страницы: {driver.current_url}")
-            print(f"Заголовок страницы: {driver.title}")
-            # Пробуем найти любые div элементы для диагностики
-            all_divs = driver.find_elements(By.TAG_NAME, "div")
-            print(f"Всего div элементов на странице: {len(all_divs)}")
-            # Пробуем найти элементы с itemprop
-            items_with_prop = driver.find_elements(By.CSS_SELECTOR, '[itemprop]')
-            print(f"Элементов с атрибутом itemprop: {len(items_with_prop)}")
-            if items_with_prop:
-                print("Примеры itemprop атрибутов:")
-                for item in items_with_prop[:5]:
-                    print(f"  - {item.tag_name}: {item.get_attribute('itemprop')}")
-        
-        if not lamps:
-            return []
-        results = []
-        
-        # Используем множество для отслеживания уникальных товаров по URL
-        seen_urls = set()
-        
-        for lamp in lamps:
+            # Название товара
             try:
-                # Сначала получаем URL товара для проверки уникальности
-                try:
-                    product_url = lamp.find_element(By.CSS_SELECTOR, 'link[itemprop="url"]').get_attribute("href")
-                    # Делаем абсолютный URL, если нужно
-                    if product_url and not product_url.startswith("http"):
-                        product_url = f"https://www.divan.ru{product_url}"
-                except NoSuchElementException:
-                    product_url = None
-                
-                # Пропускаем товары без URL или дубликаты
-                if not product_url or product_url in seen_urls:
-                    if product_url:
-                        print(f"Пропущен дубликат: {product_url}")
-                    continue
-                
-                seen_urls.add(product_url)
-                
-                # Название товара
-                try:
-                    name_elem = lamp.find_element(By.CSS_SELECTOR, 'div[itemprop="name"]')
-                    name = name_elem.text.strip() if name_elem else "нет данных"
-                except NoSuchElementException:
-                    name = "нет данных"
-                
-                # Цена - очищаем от HTML комментариев и лишних пробелов
-                price_elem = None
-                try:
-                    price_elem = lamp.find_element(By.CSS_SELECTOR, 'span[data-testid="price"]')
-                    price = price_elem.text.strip()
-                    # Удаляем лишние пробелы и переносы строк
-                    price = ' '.join(price.split())
-                except NoSuchElementException:
-                    price = "нет данных"
+                name_elem = lamp.find_element(By.CSS_SELECTOR, 'div[itemprop="name"]')
+                name = name_elem.text.strip() if name_elem else "нет данных"
+            except NoSuchElementException:
+                name = "нет данных"
+            
+            # Цена - очищаем от HTML комментариев и лишних пробелов
+            price_elem = None
+            try:
+                price_elem = lamp.find_element(By.CSS_SELECTOR, 'span[data-testid="price"]')
+                price = price_elem.text.strip()
+                # Удаляем лишние пробелы и переносы строк
+                price = ' '.join(price.split())
+            except NoSuchElementException:
+                price = "нет данных"
 
-                # Валюта - пробуем несколько вариантов
-                currency = "нет данных"
+            # Валюта - пробуем несколько вариантов
+            currency = "нет данных"
+            try:
+                # Вариант 1: Ищем валюту через meta[itemprop="priceCurrency"]
                 try:
-                    # Вариант 1: Ищем валюту через meta[itemprop="priceCurrency"]
-                    try:
-                        currency_elem = lamp.find_element(By.CSS_SELECTOR, 'meta[itemprop="priceCurrency"]')
-                        currency = currency_elem.get_attribute("content") or "нет данных"
-                        if currency and currency != "нет данных":
-                            # Преобразуем код валюты в читаемый формат
-                            currency_map = {"RUB": "руб.", "USD": "$", "EUR": "€"}
-                            currency = currency_map.get(currency, currency)
-                    except NoSuchElementException:
-                        # Вариант 2: Ищем span.ui-XXdez внутри элемента с ценой
-                        if price_elem:
-                            try:
-                                currency_elem = price_elem.find_element(By.XPATH, './/span[contains(@class, "ui-XXdez")]')
-                                currency = currency_elem.text.strip()
-                            except NoSuchElementException:
-                                # Вариант 3: Ищем span.ui-XXdez в карточке товара
-                                currency_elems = lamp.find_elements(By.CSS_SELECTOR, 'span.ui-XXdez')
-                                if currency_elems:
-                                    currency = currency_elems[0].text.strip()
-                        else:
-                            # Вариант 4: Ищем span.ui-XXdez в карточке товара
+                    currency_elem = lamp.find_element(By.CSS_SELECTOR, 'meta[itemprop="priceCurrency"]')
+                    currency = currency_elem.get_attribute("content") or "нет данных"
+                    if currency and currency != "нет данных":
+                        # Преобразуем код валюты в читаемый формат
+                        currency = CURRENCY_MAP.get(currency, currency)
+                except NoSuchElementException:
+                    # Вариант 2: Ищем span.ui-XXdez внутри элемента с ценой
+                    if price_elem:
+                        try:
+                            currency_elem = price_elem.find_element(By.XPATH, './/span[contains(@class, "ui-XXdez")]')
+                            currency = currency_elem.text.strip()
+                        except NoSuchElementException:
+                            # Вариант 3: Ищем span.ui-XXdez в карточке товара
                             currency_elems = lamp.find_elements(By.CSS_SELECTOR, 'span.ui-XXdez')
                             if currency_elems:
                                 currency = currency_elems[0].text.strip()
-                except Exception as e:
-                    print(f"Ошибка при поиске валюты: {e}")
-                    currency = "нет данных"
-                
-                # Текст о наличии
-                try:
-                    instock_elem = lamp.find_element(By.CSS_SELECTOR, 'div.MainInfo_count__MmnNN')
-                    instock_text = instock_elem.text.strip() if instock_elem else "нет данных"
-                except NoSuchElementException:
-                    instock_text = "нет данных"
+                    else:
+                        # Вариант 4: Ищем span.ui-XXdez в карточке товара
+                        currency_elems = lamp.find_elements(By.CSS_SELECTOR, 'span.ui-XXdez')
+                        if currency_elems:
+                            currency = currency_elems[0].text.strip()
+            except Exception as e:
+                print(f"Ошибка при поиске валюты: {e}")
+                currency = "нет данных"
+            
+            # Текст о наличии
+            try:
+                instock_elem = lamp.find_element(By.CSS_SELECTOR, 'div.MainInfo_count__MmnNN')
+                instock_text = instock_elem.text.strip() if instock_elem else "нет данных"
+            except NoSuchElementException:
+                instock_text = "нет данных"
 
-                results.append({
-                    "name": name,
-                    "price": price,
-                    "currency": currency,
-                    "url": product_url,
-                    "instock_text": instock_text,
-                })
-                print(f"Добавлен товар: {name} ({product_url})")
+            results.append(Product(
+                name=name,
+                price=price,
+                currency=currency,
+                url=product_url,
+                instock_text=instock_text,
+            ))
+            print(f"Добавлен товар: {name} ({product_url})")
 
-            except Exception as e:
-                print(f"Ошибка при парсинге карточки: {e}")
-                # Пропускаем товары, которые не удалось получить
-                continue
-        
-        print(f"Всего спарсено товаров: {len(results)}")
-        return results
+        except Exception as e:
+            print(f"Ошибка при парсинге карточки: {e}")
+            # Пропускаем товары, которые не удалось получить
+            continue
+    
+    return results
 
-    except TimeoutException as e:
-        # Если страница не загрузилась в течение таймаута, возвращаем пустой список
-        print(f"Таймаут при загрузке страницы: {e}")
-        print(f"URL: {url}")
-        return []
+
+def _extract_cards_js(driver):
+    """
+    Извлекает все карточки страницы одним вызовом execute_script.
+
+    Вместо 5–8 запросов к WebDriver на каждую карточку выполняется один
+    JavaScript-сниппет, который возвращает поля всех карточек списком.
+
+    Returns:
+        list[Product]: Товары без дубликатов по URL. Пустой список, если скрипт
+                    не нашел карточек или завершился ошибкой.
+    """
+    try:
+        cards = driver.execute_script(_EXTRACT_CARDS_JS, CURRENCY_MAP, NO_DATA) or []
     except WebDriverException as e:
-        # Обрабатываем другие ошибки WebDriver
-        print(f"Ошибка WebDriver: {e}")
-        print(f"Тип ошибки: {type(e).__name__}")
-        return []
-    except Exception as e:
-        # Обрабатываем любые другие ошибки
-        print(f"Неожиданная ошибка: {e}")
-        print(f"Тип ошибки: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        print(f"Ошибка при выполнении скрипта извлечения карточек: {e}")
         return []
-    finally:
-        try:
-            driver.quit()
-        except WebDriverException:
-            pass  # Игнорируем ошибки при закрытии драйвера
+
+    results = []
+    seen_urls = set()
+    for card in cards:
+        product_url = card.get("url")
+        # Делаем абсолютный URL, если нужно
+        if product_url and not product_url.startswith("http"):
+            product_url = f"https://www.divan.ru{product_url}"
+        # Пропускаем товары без URL или дубликаты
+        if not product_url or product_url in seen_urls:
+            continue
+        seen_urls.add(product_url)
+        results.append(Product(
+            name=card.get("name") or NO_DATA,
+            price=card.get("price") or NO_DATA,
+            currency=card.get("currency") or NO_DATA,
+            url=product_url,
+            instock_text=card.get("instock_text") or NO_DATA,
+            instock_schema=card.get("instock_schema") or NO_DATA,
+        ))
+    print(f"Извлечено карточек через JavaScript: {len(results)}")
+    return results
+
+
+def _wait_for_lazy_load(driver, max_wait=20, settle=1.0, end_selector=None):
+    """
+    Прокручивает страницу вниз и ждет, пока перестанут подгружаться товары.
+
+    Ожидание завершается, как только количество карточек и XHR/fetch запросы
+    не меняются settle секунд, появляется end_selector или проходит max_wait секунд.
+    Поэтому время на страницу зависит от контента, а не от фиксированных пауз.
+
+    Returns:
+        dict | None: Итог ожидания (count, reason, elapsed) или None при ошибке.
+    """
+    try:
+        driver.set_script_timeout(max_wait + 5)
+        result = driver.execute_async_script(
+            _LAZY_LOAD_JS, PRODUCT_SELECTOR, int(settle * 1000), int(max_wait * 1000), end_selector)
+    except WebDriverException as e:
+        print(f"Предупреждение: ожидание подгрузки товаров прервано: {e}")
+        return None
+    if result:
+        print(f"  Карточек на странице: {result.get('count')} "
+              f"(завершено: {result.get('reason')}, {result.get('elapsed', 0) / 1000:.1f} с)")
+    return result
@@ -0,0 +1,95 @@
+# throttle.py
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class RateLimiter:
+    """
+    Глобальный бюджет вежливости: не больше max_rps запросов в секунду
+    на все потоки вместе.
+
+    Каждый вызов wait() резервирует следующий свободный слот и спит до него,
+    поэтому запросы из разных потоков равномерно распределяются во времени.
+
+    Args:
+        max_rps (float | None): Запросов в секунду. None или 0 — без ограничения.
+    """
+
+    def __init__(self, max_rps=None):
+        self.interval = 1.0 / max_rps if max_rps else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Блокирует поток до момента, когда можно отправить следующий запрос."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HostRateLimiter:
+    """
+    Вежливость по хостам: отдельный RateLimiter для каждого хоста, поэтому
+    запросы к разным сайтам не ждут друг друга.
+
+    Args:
+        max_rps (float | None): Запросов в секунду к одному хосту.
+    """
+
+    def __init__(self, max_rps=None):
+        self.max_rps = max_rps
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Блокирует поток до момента, когда можно отправить запрос к хосту url."""
+        self.for_host(url).wait()
+
+    def for_host(self, url):
+        """RateLimiter хоста url (общий для всех запросов к этому хосту)."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(self.max_rps)
+        return limiter
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket для asyncio: в среднем rate запросов в секунду,
+    кратковременные всплески до capacity запросов.
+
+    Args:
+        rate (float): Пополнение корзины, токенов в секунду.
+        capacity (float): Емкость корзины (максимальный всплеск).
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = None  # создается внутри работающего цикла событий
+
+    async def acquire(self):
+        """Ждет, пока в корзине появится токен, и забирает его."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
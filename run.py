@@ -1,15 +1,31 @@
-from myproject import scraper, saver
+from myproject import delta, saver
+from myproject.frontier import Frontier
+
+# Разделы каталога и их важность. None — найти разделы в меню главной страницы
+CATEGORIES = [
+    ("https://www.divan.ru/category/svet?sort=0", 2.0),
+    ("https://www.divan.ru/category/lamp", 1.0),
+]
+
+# Бюджет времени на обновление всего каталога, секунд
+BUDGET = 60 * 60
+
+# Метка: файлы results.* записаны по неполному обходу (кончился бюджет)
+PARTIAL_MARKER = saver.OUTPUT_DIR / "results.partial"
 
 def main():
-    # 1. Получаем данные с сайта (все страницы раздела)
-    print("Начинаем парсинг всех страниц раздела...")
-    # Увеличиваем задержку между страницами до 5 секунд, чтобы избежать блокировки
-    data = scraper.scrape_all_pages(
-        "https://www.divan.ru/category/svet?sort=0", 
-        headless=False, 
+    # 1. Получаем данные с сайта (все разделы каталога, самые устаревшие — первыми)
+    print("Начинаем парсинг разделов каталога...")
+    frontier = Frontier(
+        CATEGORIES,
+        engine="http",  # Браузер открывается только для страниц без карточек
+        headless=False,
         max_pages=50,
-        delay_between_pages=5  # Задержка 5 секунд между страницами
+        max_rps_per_host=0.2,  # Не чаще одного запроса в 5 секунд, чтобы избежать блокировки
+        budget=BUDGET,
+        resume=True  # Недообойденный раздел продолжается с контрольной точки
     )
+    data = frontier.crawl()
     
     if not data:
         print("Внимание: Данные не получены! Проверьте подключение к интернету и доступность сайта.")
@@ -17,17 +33,35 @@ def main():
     
     print(f"Найдено товаров: {len(data)}")
     
-    # 2. Сохраняем в разные форматы
-    print("Сохраняем данные...")
-    saver.save_all(data)  # Сохраняет в results.csv, results.json, results.xlsx
-    saver.render_html(data, filename="results.html")
+    # 2. Сравниваем с прошлым обходом: изменения пишутся в output/delta_<время>.jsonl
+    # Если бюджет кончился раньше, непросмотренные товары не считаются удаленными.
+    # Индекс обхода записывается только после сохранения результатов (шаг 4)
+    changes = delta.detect_changes(data, full=frontier.complete, commit=False)
+    saver.save_sqlite(data)  # Дописывает в results.sqlite: история цен между запусками
+
+    # 3. Сохраняем в разные форматы, если что-то изменилось или прошлые файлы
+    # записаны по неполному обходу, а теперь каталог обойден целиком
+    previous_partial = PARTIAL_MARKER.exists()
+    if any(changes.values()) or (previous_partial and frontier.complete):
+        print("Сохраняем данные...")
+        saver.save_all(data)  # Сохраняет в results.csv, results.json, results.xlsx, results.html
+        if frontier.complete:
+            PARTIAL_MARKER.unlink(missing_ok=True)
+        else:
+            print(f"Обход неполный, не успели: {', '.join(frontier.unfinished)}")
+            PARTIAL_MARKER.touch()
+    else:
+        print("Данные не изменились, файлы results.* не перезаписываются.")
+
+    # 4. Результаты сохранены: запоминаем обход для следующего сравнения
+    changes.commit()
     
     print("\nПервые 3 товара:")
     for item in data[:3]:
         print(f"  - {item.get('name', 'Нет названия')}: {item.get('price', 'Нет цены')} {item.get('currency', '')}")
     
     print(f"\nДанные сохранены в папку: {saver.OUTPUT_DIR.absolute()}")
-    print("Файлы: results.csv, results.json, results.xlsx, results.html")
+    print("Файлы: results.csv, results.json, results.xlsx, results.html, results.sqlite")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+# conftest.py
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import threading
+import pytest
+
+PAGE = (Path(__file__).parent / "fixtures" / "category_page.html").read_bytes()
+
+
+class CategoryHandler(BaseHTTPRequestHandler):
+    """Отдает фикстуру на page=0 и пустую страницу на остальных, поддерживает ETag."""
+
+    requests = []
+    etag = '"v1"'
+
+    def do_GET(self):
+        CategoryHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE if self.path.endswith("page=0") else b"<html><body></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    """Локальный HTTP-сервер с одной страницей раздела."""
+    CategoryHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CategoryHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def site_requests(site):
+    """Запросы к локальному серверу: список (path, If-None-Match)."""
+    return CategoryHandler.requests
@@ -0,0 +1,81 @@
+# test_archive.py
+import json
+from pathlib import Path
+import pytest
+from myproject import archive, scraper
+from myproject.archive import PageArchive
+
+PAGE = (Path(__file__).parent / "fixtures" / "category_page.html").read_text(encoding="utf-8")
+
+
+@pytest.mark.unit
+def test_append_and_read(tmp_path):
+    with PageArchive(tmp_path / "pages.archive") as pages:
+        first = pages.append("https://www.divan.ru/category/svet?page=0", PAGE, timings={"load": 1.5})
+        pages.append("https://www.divan.ru/category/svet?page=1", "<html></html>")
+
+    pages = PageArchive(tmp_path / "pages.archive")
+    assert [entry["url"][-1] for entry in pages.entries()] == ["0", "1"]
+    record = pages.read(first)
+    assert record["html"] == PAGE and record["timings"] == {"load": 1.5}
+    assert [record["html"] for record in pages][1] == "<html></html>"
+    # Страницы хранятся сжатыми
+    assert (tmp_path / "pages.archive").stat().st_size < len(PAGE.encode("utf-8"))
+
+
+@pytest.mark.unit
+def test_recovers_after_crash(tmp_path):
+    path = tmp_path / "pages.archive"
+    with PageArchive(path) as pages:
+        for page in range(3):
+            pages.append(f"https://example.com/c?page={page}", PAGE)
+
+    # Падение: последняя строка индекса оборвана, последняя запись архива дописана наполовину
+    index = pages.index_path.read_text(encoding="utf-8").splitlines()
+    pages.index_path.write_text("\n".join(index[:1]) + "\n" + index[1][:10], encoding="utf-8")
+    size = path.stat().st_size
+    with open(path, "r+b") as f:
+        f.truncate(size - 5)
+
+    assert len(PageArchive(path).entries()) == 2
+    with PageArchive(path) as pages:
+        pages.append("https://example.com/c?page=3", PAGE)
+    entries = PageArchive(path).entries()
+    assert [entry["url"][-1] for entry in entries] == ["0", "1", "3"]
+    assert [json.loads(line)["url"][-1] for line in pages.index_path.read_text(encoding="utf-8").splitlines()
+            if line.startswith("{") and line.endswith("}")] == ["0", "1", "3"]
+
+
+@pytest.mark.unit
+def test_replay_in_parallel(tmp_path):
+    path = tmp_path / "pages.archive"
+    with PageArchive(path) as pages:
+        for page in range(5):
+            pages.append(f"https://www.divan.ru/category/svet?page={page}", PAGE, products=2)
+
+    records = list(archive.replay(path, workers=2, chunk_size=2))
+    assert [record["url"][-1] for record in records] == ["0", "1", "2", "3", "4"]
+    assert "html" not in records[0] and len(records[0]["products"]) == 2
+    assert [item["name"] for item in archive.replay_products(path, workers=2)] == ["Люстра Альфа", "Бра Бета"]
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_captures_pages(site, tmp_path):
+    path = tmp_path / "pages.archive"
+    data = scraper.scrape_all_pages(f"{site}/category/svet", engine="http", max_pages=3,
+                                    delay_between_pages=0, min_cards=0, archive=path)
+
+    # Пустая страница 1 (конец раздела) тоже записывается
+    records = list(PageArchive(path))
+    assert [(record["url"], record["products"]) for record in records] == [
+        (f"{site}/category/svet?page=0", 2), (f"{site}/category/svet?page=1", 0)]
+    assert [item["url"] for item in archive.replay_products(path, workers=1)] == [item["url"] for item in data]
+
+
+@pytest.mark.unit
+def test_zstd_records(tmp_path):
+    pytest.importorskip("zstandard")
+    with PageArchive(tmp_path / "pages.archive") as pages:
+        assert pages.codec == archive.CODEC_ZSTD
+        offset = pages.append("https://example.com/", PAGE)
+    assert PageArchive(tmp_path / "pages.archive").read(offset)["html"] == PAGE
@@ -0,0 +1,118 @@
+# test_async_crawler.py
+import asyncio
+import time
+import pytest
+from myproject import async_crawler
+from myproject.replay_server import CARD_TEMPLATE
+from myproject.throttle import AsyncTokenBucket
+
+
+async def collect(agen):
+    return [item async for item in agen]
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_async_streams_and_stops(site):
+    pages = asyncio.run(collect(async_crawler.scrape_all_pages_async(
+        f"{site}/category/svet", max_pages=10, rps=100, max_in_flight=3)))
+
+    assert [page for page, _ in pages] == [0]
+    assert [item["name"] for item in pages[0][1]] == ["Люстра Альфа", "Бра Бета"]
+
+
+@pytest.mark.unit
+def test_crawl_categories_async_dedups_per_category(site):
+    items = asyncio.run(collect(async_crawler.crawl_categories_async(
+        [f"{site}/category/svet", f"{site}/category/lamp"], max_pages=5, rps=100)))
+
+    assert sorted(url.rsplit("/", 1)[1] for url, _, _ in items) == ["lamp", "svet"]
+    # В фикстуре «Люстра Альфа» встречается дважды: в каждом разделе товар отдается один раз
+    for _, _, records in items:
+        assert [item["url"].rsplit("/", 1)[1] for item in records] == ["lyustra-alfa", "bra-beta"]
+
+
+def category_page(products, page_count=None):
+    cards = "".join(CARD_TEMPLATE.replace("{url}", f"/product/{name}").replace("{name}", name)
+                    .replace("{price}", "1000").replace("{price_text}", "1 000").replace("{count}", "1")
+                    for name in products)
+    links = "".join(f'<a href="?page={number}">{number + 1}</a>' for number in range(page_count or 0))
+    return f"<html><body>{cards}{links}</body></html>"
+
+
+def crawl_fake_pages(monkeypatch, pages, delays=None, **kwargs):
+    """Обходит раздел, страницы которого отдает fetch_html без сети. Returns: (страницы, запросы)."""
+    requested = []
+
+    async def fetch_html(session, url, limiter, timeout=30):
+        page = int(url.rsplit("page=", 1)[1])
+        requested.append(page)
+        await asyncio.sleep((delays or {}).get(page, 0))
+        return pages.get(page, "<html><body></body></html>")
+
+    async def crawl():
+        return [(page, [item["url"].rsplit("/", 1)[1] for item in records])
+                async for page, records in async_crawler.scrape_all_pages_async(
+                    "http://127.0.0.1/category/svet", rps=1000, **kwargs)]
+
+    monkeypatch.setattr(async_crawler, "fetch_html", fetch_html)
+    return asyncio.run(crawl()), requested
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_async_plans_pages(monkeypatch):
+    pages = {page: category_page([f"p{page}"], page_count=2) for page in range(5)}
+    result, requested = crawl_fake_pages(monkeypatch, pages, max_pages=10, max_in_flight=4)
+
+    assert result == [(0, ["p0"]), (1, ["p1"])]
+    assert sorted(requested) == [0, 1]
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_async_stops_on_duplicate_page(monkeypatch):
+    pages = {0: category_page(["a", "b"]), 1: category_page(["b", "c"]), 2: category_page(["a", "c"]),
+             3: category_page(["d"])}
+    result, requested = crawl_fake_pages(monkeypatch, pages, max_pages=10, max_in_flight=1)
+
+    assert result == [(0, ["a", "b"]), (1, ["c"])]
+    assert requested == [0, 1, 2]
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_async_stops_when_pages_finish_together(monkeypatch):
+    # Количество страниц неизвестно; все страницы завершаются в одной пачке asyncio.wait,
+    # пустые — вместе со страницами за ними
+    pages = {0: category_page(["a", "b"]), 1: category_page(["c"])}
+    result, _ = crawl_fake_pages(monkeypatch, pages, max_pages=10, max_in_flight=10)
+
+    assert sorted(result) == [(0, ["a", "b"]), (1, ["c"])]
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_async_skips_unparsable_page(monkeypatch):
+    # Пустое тело ответа: lxml бросает ParserError, обход продолжается со следующей страницы
+    pages = {0: category_page(["a"]), 1: "\n", 2: category_page(["b"])}
+    result, requested = crawl_fake_pages(monkeypatch, pages, max_pages=4, max_in_flight=1)
+
+    assert result == [(0, ["a"]), (2, ["b"])]
+    assert requested == [0, 1, 2, 3]
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_async_stops_at_lowest_empty_page(monkeypatch):
+    # Пустая страница 1 отвечает последней: страница 2 за концом раздела не отдается
+    pages = {0: category_page(["a"]), 2: category_page(["b"]), 3: category_page(["c"])}
+    result, _ = crawl_fake_pages(monkeypatch, pages, delays={1: 0.05}, max_pages=4, max_in_flight=4)
+
+    assert result == [(0, ["a"])]
+
+
+@pytest.mark.unit
+def test_token_bucket_rate():
+    async def run():
+        bucket = AsyncTokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 5 / 50 * 0.9
@@ -0,0 +1,66 @@
+# test_benchmark.py
+import json
+import pytest
+import requests
+from myproject import benchmark
+from myproject.extractor import extract_page_count, extract_products
+from myproject.replay_server import ReplaySite
+
+
+@pytest.mark.unit
+def test_replay_site_paginates_and_lazy_loads():
+    with ReplaySite(["svet"], page_count=3, per_page=10, eager=4) as site:
+        html = requests.get(f"{site.category_url('svet')}?page=1").text
+        products = extract_products(html, base_url=site.url)
+        # В HTML только первые eager карточек, остальные отдает /lazy
+        assert [item["url"].rsplit("/", 1)[1] for item in products] == ["svet-10", "svet-11", "svet-12", "svet-13"]
+        assert extract_page_count(html, per_page=len(products)) == 3
+        lazy = requests.get(f"{site.url}/lazy/svet?page=1&offset=4&batch=4").text
+        assert len(extract_products(lazy, base_url=site.url)) == 4
+        assert extract_products(requests.get(f"{site.category_url('svet')}?page=3").text) == []
+
+
+@pytest.mark.unit
+def test_benchmark_writes_json(tmp_path):
+    output = tmp_path / "benchmark.json"
+    report = benchmark.run_benchmarks(["scrape_all_pages_http"], output, workers=2,
+                                      site_options={"page_count": 3, "per_page": 5, "eager": None, "latency": 0})
+
+    [result] = json.loads(output.read_text(encoding="utf-8"))["results"]
+    assert result == report["results"][0]
+    assert (result["pages"], result["products"]) == (3, 15)
+    assert result["pages_per_sec"] > 0 and result["latency_p50_ms"] <= result["latency_p95_ms"]
+
+
+@pytest.mark.unit
+def test_compare_reports_regressions():
+    baseline = {"results": [benchmark.summarize("http", 1.0, [0.1] * 10, 100, 50.0)]}
+    slower = {"results": [benchmark.summarize("http", 2.0, [0.1] * 10, 100, 50.0)]}
+    assert benchmark.compare(baseline, baseline) == []
+    assert benchmark.compare(slower, baseline) == ["http: pages_per_sec 10.0 -> 5.0"]
+
+
+@pytest.mark.unit
+def test_compare_reports_errors_and_missing_products():
+    site = {"page_count": 10, "per_page": 10}
+    baseline = {"site": site, "results": [benchmark.summarize("http", 1.0, [0.1] * 10, 100, 50.0),
+                                          benchmark.summarize("async", 1.0, [0.1] * 10, 100, 50.0)]}
+    partial = {"site": site, "results": [benchmark.summarize("http", 1.0, [0.1] * 10, 50, 50.0),
+                                         {"case": "async", "error": "нет браузера"}]}
+    assert benchmark.compare(baseline, baseline) == []
+    assert benchmark.compare(partial, baseline) == ["http: собрано 50 товаров из 100",
+                                                    "http: products 100 -> 50",
+                                                    "async: ошибка — нет браузера"]
+
+
+@pytest.mark.unit
+def test_compare_relative_to_reference_case():
+    baseline = {"results": [benchmark.summarize("http", 1.0, [0.1] * 10, 100, 50.0),
+                            benchmark.summarize("async", 2.0, [0.1] * 10, 100, 50.0)]}
+    # Машина вдвое медленнее: соотношение сценариев то же, память не сравнивается
+    slower_machine = {"results": [benchmark.summarize("http", 2.0, [0.2] * 10, 100, 80.0),
+                                  benchmark.summarize("async", 4.0, [0.2] * 10, 100, 80.0)]}
+    http_regressed = {"results": [benchmark.summarize("http", 4.0, [0.2] * 10, 100, 50.0),
+                                  benchmark.summarize("async", 4.0, [0.2] * 10, 100, 50.0)]}
+    assert benchmark.compare(slower_machine, baseline, relative_to="async") == []
+    assert benchmark.compare(http_regressed, baseline, relative_to="async") == ["http: pages_per_sec 2.0 -> 1.0"]
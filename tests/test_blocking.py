@@ -0,0 +1,44 @@
+# test_blocking.py
+import json
+import pytest
+from myproject.blocking import BlockingProfile
+
+
+class FakeDriver:
+    def __init__(self, events):
+        self.commands = []
+        self._log = [{"message": json.dumps({"message": event})} for event in events]
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+
+    def get_log(self, name):
+        log, self._log = self._log, []
+        return log
+
+
+@pytest.mark.unit
+def test_profile_patterns_allow_and_deny():
+    profile = BlockingProfile(fonts=False, deny=["*ads.example.com*"], allow=["*.svg*"])
+    assert "*.png*" in profile.patterns
+    assert "*.svg*" not in profile.patterns
+    assert "*.woff2*" not in profile.patterns
+    assert "*ads.example.com*" in profile.patterns
+    assert BlockingProfile.resolve(False) is None
+    assert BlockingProfile.resolve(profile) is profile
+
+
+@pytest.mark.unit
+def test_profile_apply_and_stats():
+    profile = BlockingProfile()
+    driver = FakeDriver([
+        {"method": "Network.loadingFailed", "params": {"blockedReason": "inspector"}},
+        {"method": "Network.loadingFailed", "params": {"errorText": "net::ERR_FAILED"}},
+        {"method": "Network.loadingFinished", "params": {"encodedDataLength": 2048}},
+        {"method": "Network.loadingFinished", "params": {"encodedDataLength": 1024}},
+    ])
+    profile.apply(driver)
+    assert driver.commands[-1] == ("Network.setBlockedURLs", {"urls": profile.patterns})
+
+    stats = profile.collect_stats(driver)
+    assert stats == {"blocked_requests": 1, "allowed_requests": 2, "allowed_bytes": 3072}
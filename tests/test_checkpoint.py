@@ -0,0 +1,83 @@
+# test_checkpoint.py
+import pytest
+from myproject import scraper
+from myproject.checkpoint import CheckpointStore
+
+
+class Crash(BaseException):
+    """Имитация падения процесса (не перехватывается обработчиками Exception)."""
+
+
+PAGES = {n: [{"name": str(n), "url": f"u{n}"}] for n in range(5)}
+
+
+@pytest.mark.unit
+def test_resume_skips_finished_pages(tmp_path, monkeypatch):
+    path = tmp_path / "checkpoint.jsonl"
+    calls = []
+
+    def crashing(url, page_info=None, **kwargs):
+        page = int(url.rsplit("page=", 1)[1])
+        if page == 3:
+            raise Crash()
+        calls.append(page)
+        return [dict(item) for item in PAGES.get(page, [])]
+
+    monkeypatch.setattr(scraper, "scrape_section", crashing)
+    with pytest.raises(Crash):
+        scraper.scrape_all_pages("https://example.com/c", delay_between_pages=0, checkpoint=path)
+
+    # Имитируем строку, оборванную при падении
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"page": 3, "rec')
+
+    def resumed(url, page_info=None, **kwargs):
+        page = int(url.rsplit("page=", 1)[1])
+        calls.append(page)
+        return [dict(item) for item in PAGES.get(page, [])]
+
+    monkeypatch.setattr(scraper, "scrape_section", resumed)
+    data = scraper.scrape_all_pages("https://example.com/c", delay_between_pages=0,
+                                    checkpoint=path, resume=True)
+
+    assert [item["url"] for item in data] == ["u0", "u1", "u2", "u3", "u4"]
+    assert calls == [0, 1, 2, 3, 4, 5]
+    # Завершенный обход не продолжается повторно
+    assert CheckpointStore(path).load("https://example.com/c") is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 2])
+def test_resume_fills_gaps(tmp_path, monkeypatch, workers):
+    import json
+
+    path = tmp_path / "checkpoint.jsonl"
+    calls = []
+
+    def failing(url, page_info=None, **kwargs):
+        page = int(url.rsplit("page=", 1)[1])
+        if page == 2:
+            raise RuntimeError("timeout")
+        if page == 4:
+            raise Crash()
+        return [dict(item) for item in PAGES.get(page, [])]
+
+    monkeypatch.setattr(scraper, "scrape_section", failing)
+    with pytest.raises(Crash):
+        scraper.scrape_all_pages("https://example.com/c", delay_between_pages=0, checkpoint=path)
+
+    def resumed(url, page_info=None, **kwargs):
+        page = int(url.rsplit("page=", 1)[1])
+        calls.append(page)
+        return [dict(item) for item in PAGES.get(page, [])]
+
+    monkeypatch.setattr(scraper, "scrape_section", resumed)
+    data = scraper.scrape_all_pages("https://example.com/c", delay_between_pages=0, workers=workers,
+                                    checkpoint=path, resume=True)
+
+    # Страница 3 после пропуска восстановлена из контрольной точки, загружаются только недостающие
+    assert sorted(item["url"] for item in data) == ["u0", "u1", "u2", "u3", "u4"]
+    assert sorted(calls)[:2] == [2, 4] and 3 not in calls
+    with open(path, encoding="utf-8") as f:
+        pages = [entry["page"] for entry in map(json.loads, f) if "page" in entry]
+    assert sorted(pages) == [0, 1, 2, 3, 4]
@@ -0,0 +1,58 @@
+# test_delta.py
+import json
+import pytest
+from myproject import delta
+from myproject.product import Product
+
+ITEMS = [
+    Product(name="Люстра", price="12 990", currency="руб.", url="https://example.com/1"),
+    Product(name="Бра", price="4 590", currency="руб.", url="https://example.com/2"),
+]
+
+
+def read_events(tmp_path):
+    events = []
+    for path in sorted(tmp_path.glob("delta_*.jsonl")):
+        events.extend(json.loads(line) for line in path.read_text(encoding="utf-8").splitlines())
+        path.unlink()
+    return events
+
+
+@pytest.mark.unit
+def test_detect_changes_emits_only_deltas(tmp_path):
+    index = tmp_path / "index.json"
+
+    assert delta.detect_changes(ITEMS, index, tmp_path) == {"added": 2, "changed": 0, "removed": 0}
+    assert [event["event"] for event in read_events(tmp_path)] == ["added", "added"]
+
+    # Повторный обход без изменений: delta-файл не создается
+    assert not any(delta.detect_changes(ITEMS, index, tmp_path).values())
+    assert read_events(tmp_path) == []
+
+    changed = [Product.from_dict(dict(ITEMS[0], price="11 490")), Product(name="Торшер", url="https://example.com/3")]
+    assert delta.detect_changes(changed, index, tmp_path) == {"added": 1, "changed": 1, "removed": 1}
+    events = {event["event"]: event for event in read_events(tmp_path)}
+    assert events["changed"]["record"]["price"] == "11 490"
+    assert events["removed"]["url"] == "https://example.com/2"
+
+
+@pytest.mark.unit
+def test_partial_crawl_keeps_unseen_products(tmp_path):
+    index = tmp_path / "index.json"
+    delta.detect_changes(ITEMS, index, tmp_path)
+
+    assert delta.detect_changes(ITEMS[:1], index, tmp_path, full=False) == {"added": 0, "changed": 0, "removed": 0}
+    assert len(delta.SnapshotIndex(index).hashes) == 2
+
+
+@pytest.mark.unit
+def test_index_saved_only_on_commit(tmp_path):
+    index = tmp_path / "index.json"
+    changes = delta.detect_changes(ITEMS, index, tmp_path, commit=False)
+
+    # Сохранение результатов упало до commit(): следующий запуск видит те же изменения
+    assert not index.exists()
+    assert delta.detect_changes(ITEMS, index, tmp_path, commit=False) == changes
+
+    changes.commit()
+    assert not any(delta.detect_changes(ITEMS, index, tmp_path).values())
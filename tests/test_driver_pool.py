@@ -0,0 +1,97 @@
+# test_driver_pool.py
+import threading
+import pytest
+import myproject.driver_pool as driver_pool
+
+
+class FakeDriver:
+    """Заглушка WebDriver без запуска браузера."""
+
+    def __init__(self):
+        self.quit_called = False
+        self.window_handles = ["main"]
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def fake_create(monkeypatch):
+    created = []
+
+    def create_driver(headless=False, timeout=60, blocking=None):
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    monkeypatch.setattr(driver_pool, "create_driver", create_driver)
+    return created
+
+
+@pytest.mark.unit
+def test_pool_reuses_driver(fake_create):
+    pool = driver_pool.DriverPool(size=1)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    pool.release(second)
+    pool.close()
+
+    assert first is second
+    assert len(fake_create) == 1
+    assert first.quit_called
+
+
+@pytest.mark.unit
+def test_pool_recycles_after_max_pages(fake_create):
+    pool = driver_pool.DriverPool(size=1, max_pages_per_driver=2)
+    for _ in range(3):
+        pool.release(pool.acquire())
+    pool.close()
+
+    assert len(fake_create) == 2
+    assert fake_create[0].quit_called
+
+
+@pytest.mark.unit
+def test_pool_replaces_broken_and_dead_drivers(fake_create):
+    pool = driver_pool.DriverPool(size=1)
+    driver = pool.acquire()
+    pool.release(driver, broken=True)
+    assert driver.quit_called
+
+    driver = pool.acquire()
+    pool.release(driver)
+    driver.window_handles = []  # браузер «упал»
+    replacement = pool.acquire()
+    pool.release(replacement)
+    pool.close()
+
+    assert replacement is not driver
+    assert len(fake_create) == 3
+
+
+@pytest.mark.unit
+def test_acquire_wakes_up_when_busy_driver_is_discarded(fake_create):
+    pool = driver_pool.DriverPool(size=1)
+    driver = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    pool.release(driver, broken=True)  # место освобождается без возврата драйвера в очередь
+    waiter.join(timeout=5)
+    pool.release(acquired[0])
+    pool.close()
+
+    assert acquired and acquired[0] is not driver
+    assert len(fake_create) == 2
+
+
+@pytest.mark.unit
+def test_acquire_timeout(fake_create):
+    pool = driver_pool.DriverPool(size=1)
+    driver = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    pool.release(driver)
+    pool.close()
@@ -0,0 +1,47 @@
+# test_extractor.py
+from pathlib import Path
+import pytest
+from myproject import extractor
+
+FIXTURE = Path(__file__).parent / "fixtures" / "category_page.html"
+
+
+@pytest.fixture
+def page_html():
+    return FIXTURE.read_text(encoding="utf-8")
+
+
+@pytest.mark.unit
+def test_extract_products_fields(page_html):
+    data = extractor.extract_products(page_html, base_url="https://www.divan.ru/category/svet?page=0")
+
+    # Дубликат по URL и карточка без ссылки отброшены
+    assert len(data) == 2
+    first, second = data
+    assert first == {
+        "name": "Люстра Альфа",
+        "price": "12 990 руб.",
+        "currency": "руб.",
+        "url": "https://www.divan.ru/product/lyustra-alfa",
+        "instock_text": "В наличии 5 шт.",
+        "instock_schema": "http://schema.org/InStock",
+    }
+    # Нет meta[itemprop=priceCurrency] — валюта берется из span.ui-XXdez
+    assert second["currency"] == "руб."
+    assert second["url"] == "https://www.divan.ru/product/bra-beta"
+    assert second["instock_text"] == "нет данных"
+
+
+@pytest.mark.unit
+def test_extract_products_empty():
+    assert extractor.extract_products("") == []
+    assert extractor.extract_products("<html><body><p>Пусто</p></body></html>") == []
+
+
+@pytest.mark.unit
+def test_extract_page_count():
+    links = '<a href="/category/svet?sort=0&page=1">2</a><a href="/category/svet?sort=0&page=11">12</a>'
+    assert extractor.extract_page_count(links) == 12
+    assert extractor.extract_page_count('<script>{"pagesCount": 7}</script>') == 7
+    assert extractor.extract_page_count("<div>Найдено 245 товаров</div>", per_page=40) == 7
+    assert extractor.extract_page_count("<div>Найдено 245 товаров</div>") is None
@@ -0,0 +1,139 @@
+# test_frontier.py
+import json
+import time
+import pytest
+from myproject import scraper
+from myproject.extractor import extract_categories
+from myproject.frontier import Frontier
+from myproject.throttle import HostRateLimiter
+
+CATEGORIES = {
+    "https://example.com/category/a": {0: ["u1", "u2"], 1: ["u3"]},
+    "https://example.com/category/b": {0: ["u2", "u4"]},
+}
+
+
+def make_fake_section(categories, page_counts=None, delay=0):
+    """Подменяет scrape_section: товары по разделу и номеру страницы из URL."""
+    calls = []
+
+    def fake_scrape_section(url, headless=False, pool=None, page_info=None, **kwargs):
+        base, page = url.rsplit("?page=", 1)
+        calls.append((base, int(page)))
+        time.sleep(delay)
+        if page_info is not None and page_counts:
+            page_info["page_count"] = page_counts.get(base)
+        return [{"name": item, "url": item} for item in categories.get(base, {}).get(int(page), [])]
+
+    return fake_scrape_section, calls
+
+
+def make_frontier(tmp_path, categories, **kwargs):
+    return Frontier(categories, engine="selenium", workers=1, max_rps_per_host=None,
+                    state_path=tmp_path / "state.json", **kwargs)
+
+
+@pytest.mark.unit
+def test_categories_deduplicated_and_state_saved(monkeypatch, tmp_path):
+    fake, calls = make_fake_section(CATEGORIES)
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+
+    # Раздел b важнее, поэтому идет первым; повтор раздела a в списке игнорируется
+    frontier = make_frontier(tmp_path, [("https://example.com/category/a", 1.0),
+                                        ("https://example.com/category/b", 2.0),
+                                        "https://example.com/category/a"])
+    data = frontier.crawl()
+
+    assert [item["url"] for item in data] == ["u2", "u4", "u1", "u3"]
+    assert calls[0] == ("https://example.com/category/b", 0)
+    assert sorted(calls) == [("https://example.com/category/a", 0), ("https://example.com/category/a", 1),
+                             ("https://example.com/category/a", 2), ("https://example.com/category/b", 0),
+                             ("https://example.com/category/b", 1)]
+    assert frontier.complete
+    state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+    assert state["https://example.com/category/a"]["products"] == 2
+
+
+@pytest.mark.unit
+def test_stale_categories_first(monkeypatch, tmp_path):
+    fake, calls = make_fake_section(CATEGORIES, page_counts={"https://example.com/category/a": 2,
+                                                             "https://example.com/category/b": 1})
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+    now = time.time()
+    (tmp_path / "state.json").write_text(json.dumps({
+        "https://example.com/category/a": {"crawled_at": now - 60},
+        "https://example.com/category/b": {"crawled_at": now - 3600},
+    }), encoding="utf-8")
+
+    make_frontier(tmp_path, list(CATEGORIES)).crawl()
+
+    # Количество страниц известно: пустые страницы не запрашиваются
+    assert calls == [("https://example.com/category/b", 0), ("https://example.com/category/a", 0),
+                     ("https://example.com/category/a", 1)]
+
+
+@pytest.mark.unit
+def test_budget_leaves_categories_unfinished(monkeypatch, tmp_path):
+    fake, calls = make_fake_section(CATEGORIES)
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+
+    frontier = make_frontier(tmp_path, list(CATEGORIES), budget=1e-9)
+    assert frontier.crawl() == []
+    assert calls == []
+    assert not frontier.complete and len(frontier.unfinished) == 2
+    assert json.loads((tmp_path / "state.json").read_text(encoding="utf-8")) == {}
+
+
+@pytest.mark.unit
+def test_category_stops_on_page_of_duplicates(monkeypatch, tmp_path):
+    fake, calls = make_fake_section({"https://example.com/category/c": {0: ["x", "y"], 1: ["y", "x"], 2: ["z"]}})
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+
+    frontier = make_frontier(tmp_path, ["https://example.com/category/c"])
+    assert [item["url"] for item in frontier.crawl()] == ["x", "y"]
+    assert calls == [("https://example.com/category/c", 0), ("https://example.com/category/c", 1)]
+    assert frontier.complete
+
+
+@pytest.mark.unit
+def test_resume_continues_unfinished_category(monkeypatch, tmp_path):
+    fake, calls = make_fake_section(CATEGORIES, delay=0.3)
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+    url = "https://example.com/category/a"
+
+    # Бюджет кончается после первой страницы: раздел остается недообойденным
+    frontier = make_frontier(tmp_path, [url], budget=0.2, resume=True, checkpoint_dir=tmp_path / "checkpoints")
+    assert [item["url"] for item in frontier.crawl()] == ["u1", "u2"]
+    assert frontier.unfinished == [url]
+
+    calls.clear()
+    frontier = make_frontier(tmp_path, [url], resume=True, checkpoint_dir=tmp_path / "checkpoints")
+    assert [item["url"] for item in frontier.crawl()] == ["u1", "u2", "u3"]
+    assert calls == [(url, 1), (url, 2)]
+    assert frontier.complete
+
+
+@pytest.mark.unit
+def test_host_rate_limiter_is_per_host():
+    limiter = HostRateLimiter(max_rps=10)
+    start = time.monotonic()
+    for host in ("a", "b", "c"):
+        limiter.wait(f"https://{host}.example.com/")
+    assert time.monotonic() - start < 0.05
+    limiter.wait("https://a.example.com/page")
+    assert time.monotonic() - start >= 0.09
+
+
+@pytest.mark.unit
+def test_extract_categories_from_menu():
+    html = """<html><body><nav>
+        <a href="/category/svet">Свет</a>
+        <a href="https://www.divan.ru/category/svet/?utm_source=menu">Свет</a>
+        <a href="/category/divany-i-kresla#top">Диваны</a>
+        <a href="https://other.example.com/category/x">Чужой</a>
+        <a href="/product/lamp-1">Товар</a>
+    </nav></body></html>"""
+    assert extract_categories(html, base_url="https://www.divan.ru/") == [
+        "https://www.divan.ru/category/svet",
+        "https://www.divan.ru/category/divany-i-kresla",
+    ]
@@ -0,0 +1,70 @@
+# test_http_cache.py
+import os
+import pytest
+from myproject.http_cache import ResponseCache, normalize_url
+from myproject.http_engine import HttpFetcher
+
+
+@pytest.mark.unit
+def test_normalize_url():
+    assert (normalize_url("HTTPS://WWW.Divan.ru/category/svet?sort=0&page=1&utm_source=x#top")
+            == normalize_url("https://www.divan.ru/category/svet?page=1&sort=0"))
+
+
+@pytest.mark.unit
+def test_fetcher_uses_cache_and_revalidates(site, site_requests, tmp_path):
+    url = f"{site}/category/svet?page=0"
+    cache = ResponseCache(tmp_path, default_ttl=3600, ttl_rules=[("*page=0*", 0)])
+
+    with HttpFetcher(cache=cache) as fetcher:
+        first = fetcher.fetch(url)
+        second = fetcher.fetch(url)  # TTL 0 — условный запрос, сервер отвечает 304
+
+    assert first == second and "Люстра" in second
+    assert site_requests == [("/category/svet?page=0", None), ("/category/svet?page=0", '"v1"')]
+
+    cache.ttl_rules = []
+    with HttpFetcher(cache=cache) as fetcher:
+        assert fetcher.fetch(url) == first  # свежая запись — без запроса к серверу
+    assert len(site_requests) == 2
+    cache.close()
+
+
+@pytest.mark.unit
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=600)
+    body = os.urandom(500)  # не сжимается
+    cache.store("https://example.com/a", 200, {}, body)
+    cache.store("https://example.com/b", 200, {}, body)
+
+    assert cache.get("https://example.com/a") is None
+    assert cache.get("https://example.com/b").body == body
+    assert cache.total_bytes() <= 600
+    cache.close()
+
+
+@pytest.mark.unit
+def test_cached_text_uses_response_encoding(tmp_path):
+    cache = ResponseCache(tmp_path)
+    body = "<html><body>Люстра Альфа</body></html>".encode("cp1251")
+    cache.store("https://example.com/stored", 200, {}, body, encoding="windows-1251")
+    cache.store("https://example.com/header", 200, {"Content-Type": "text/html; charset=windows-1251"}, body)
+
+    assert "Люстра Альфа" in cache.get("https://example.com/stored").text
+    assert "Люстра Альфа" in cache.get("https://example.com/header").text
+    cache.close()
+
+
+@pytest.mark.unit
+def test_cache_created_without_encoding_column(tmp_path):
+    import sqlite3
+
+    db = sqlite3.connect(tmp_path / "responses.sqlite")
+    db.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, "
+               "body BLOB NOT NULL, size INTEGER NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+    db.close()
+
+    cache = ResponseCache(tmp_path)
+    cache.store("https://example.com/a", 200, {}, "Свет".encode("utf-8"))
+    assert cache.get("https://example.com/a").text == "Свет"
+    cache.close()
@@ -0,0 +1,97 @@
+# test_http_engine.py
+import pytest
+from myproject import scraper
+from myproject.http_engine import HttpFetcher, scrape_page_http
+from myproject.extractor import extract_products
+from myproject.replay_server import CARD_TEMPLATE, ReplaySite
+
+@pytest.mark.unit
+def test_scrape_page_http_falls_back_on_empty_page(site):
+    fallback_calls = []
+
+    def fallback(url):
+        fallback_calls.append(url)
+        return []
+
+    with HttpFetcher() as fetcher:
+        first = scrape_page_http(f"{site}/category/svet?page=0", fetcher, fallback=fallback)
+        second = scrape_page_http(f"{site}/category/svet?page=1", fetcher, fallback=fallback)
+
+    assert [item["name"] for item in first] == ["Люстра Альфа", "Бра Бета"]
+    assert second == []
+    assert fallback_calls == [f"{site}/category/svet?page=1"]
+
+
+@pytest.mark.unit
+def test_scrape_all_pages_http_engine(site, monkeypatch):
+    monkeypatch.setattr(scraper, "scrape_section", lambda url, **kwargs: [])
+
+    data = scraper.scrape_all_pages(f"{site}/category/svet", engine="http", delay_between_pages=0)
+
+    assert len(data) == 2
+    assert data[0]["url"].endswith("/product/lyustra-alfa")
+
+
+class FakeFetcher:
+    """HttpFetcher без сети: HTML страниц по номеру страницы."""
+    pages = {}
+
+    def __init__(self, **kwargs):
+        pass
+
+    def fetch(self, url):
+        return FakeFetcher.pages.get(scraper._page_number(url), "<html><body></body></html>")
+
+    def close(self):
+        pass
+
+
+def category_page(page, cards, page_count=None):
+    html = "".join(CARD_TEMPLATE.replace("{url}", f"/product/{page}-{index}").replace("{name}", f"Товар {index}")
+                   .replace("{price}", "1000").replace("{price_text}", "1 000").replace("{count}", "1")
+                   for index in range(cards))
+    if page_count:
+        html += "".join(f'<a href="?page={number}">{number + 1}</a>' for number in range(page_count))
+    return f"<html><body>{html}</body></html>"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("page_count", [3, None])
+def test_http_engine_threshold_from_first_page(monkeypatch, page_count):
+    # Страница 1 отдала без прокрутки только часть карточек, страница 2 — последняя неполная
+    FakeFetcher.pages = {0: category_page(0, 4, page_count), 1: category_page(1, 2), 2: category_page(2, 1)}
+    rendered = []
+
+    def fake_scrape_section(url, page_info=None, **kwargs):
+        rendered.append(scraper._page_number(url))
+        return [{"name": url, "url": url}] if rendered[-1] == 1 else []
+
+    monkeypatch.setattr(scraper, "HttpFetcher", FakeFetcher)
+    monkeypatch.setattr(scraper, "scrape_section", fake_scrape_section)
+
+    data = scraper.scrape_all_pages("https://example.com/category/svet", engine="http", max_pages=5,
+                                    delay_between_pages=0)
+
+    # Первая страница рендерится для калибровки, неполная страница 1 — браузером;
+    # страница 2 и пустая страница за ней — нет
+    assert rendered == [0, 1]
+    assert len(data) == 6
+
+
+@pytest.mark.unit
+def test_http_engine_calibrates_on_lazy_first_page(monkeypatch):
+    # Без прокрутки сайт отдает 12 карточек из 24, в том числе на первой странице
+    with ReplaySite(["svet"], page_count=3, per_page=24, eager=12) as site:
+        rendered = []
+
+        def fake_scrape_section(url, page_info=None, **kwargs):
+            page = scraper._page_number(url)
+            rendered.append(page)
+            return extract_products(site.cards("svet", page), base_url=site.url)
+
+        monkeypatch.setattr(scraper, "scrape_section", fake_scrape_section)
+
+        data = scraper.scrape_all_pages(site.category_url("svet"), engine="http", delay_between_pages=0)
+
+    assert rendered == [0, 1, 2]
+    assert len(data) == 72
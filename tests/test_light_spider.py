@@ -0,0 +1,81 @@
+# test_light_spider.py
+from pathlib import Path
+import pytest
+
+pytest.importorskip("scrapy")
+
+from scrapy.http import HtmlResponse, Request
+from myproject.myproject.middlewares import BackoffMiddleware
+from myproject.myproject.spiders.light_spider import LightSpider, page_url
+
+FIXTURE = Path(__file__).parent / "fixtures" / "category_page.html"
+BASE = "https://www.divan.ru/category/svet"
+
+
+def parse(spider, body, page=0, follow=False):
+    url = page_url(BASE, page) if page else BASE
+    request = Request(url, meta={"follow": follow})
+    response = HtmlResponse(url=url, body=body.encode("utf-8"), encoding="utf-8", request=request)
+    return list(spider.parse(response, base_url=BASE, page=page))
+
+
+@pytest.mark.unit
+def test_page_url_replaces_page_param():
+    assert page_url("https://www.divan.ru/category/svet?sort=0&page=1", 3) == \
+        "https://www.divan.ru/category/svet?sort=0&page=3"
+
+
+@pytest.mark.unit
+def test_first_page_schedules_all_pages():
+    html = FIXTURE.read_text(encoding="utf-8").replace("</body>", '<a href="?page=3">4</a></body>')
+    output = parse(LightSpider(), html)
+
+    requests = [item for item in output if isinstance(item, Request)]
+    assert len(output) - len(requests) == 2
+    assert [request.cb_kwargs["page"] for request in requests] == [1, 2, 3]
+    assert not any(request.meta["follow"] for request in requests)
+
+
+@pytest.mark.unit
+def test_pages_followed_until_empty_without_page_count():
+    spider = LightSpider(max_pages="10")
+    output = parse(spider, FIXTURE.read_text(encoding="utf-8"))
+    [request] = [item for item in output if isinstance(item, Request)]
+    assert request.cb_kwargs["page"] == 1 and request.meta["follow"]
+
+    # Пустая страница — конец раздела
+    assert parse(spider, "<html><body></body></html>", 1, True) == []
+
+
+@pytest.mark.unit
+def test_follow_stops_on_page_without_new_products():
+    spider = LightSpider(max_pages="10")
+    parse(spider, FIXTURE.read_text(encoding="utf-8"))
+
+    # Страница из уже найденных в разделе товаров: ничего не отдается и дальше не идем
+    assert parse(spider, FIXTURE.read_text(encoding="utf-8"), 1, True) == []
+
+
+@pytest.mark.unit
+def test_backoff_raises_slot_delay():
+    class Slot:
+        delay = 0.5
+
+    class Engine:
+        class downloader:
+            slots = {"www.divan.ru": Slot}
+
+    class Crawler:
+        engine = Engine
+
+    class Spider:
+        import logging
+        logger = logging.getLogger("test")
+
+    middleware = BackoffMiddleware(Crawler, codes=[429], min_delay=2.0, max_delay=30.0)
+    request = Request(BASE, meta={"download_slot": "www.divan.ru"})
+    response = HtmlResponse(url=BASE, status=429, headers={"Retry-After": "5"}, request=request)
+    assert middleware.process_response(request, response, Spider) is response
+    assert Slot.delay == 5.0
+    middleware.process_response(request, response, Spider)
+    assert Slot.delay == 10.0
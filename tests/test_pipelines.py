@@ -0,0 +1,48 @@
+# test_pipelines.py
+import csv
+import json
+import logging
+import openpyxl
+import pytest
+
+pytest.importorskip("scrapy")
+
+from myproject.myproject.items import MyprojectItem
+from myproject import saver
+from myproject.myproject.pipelines import FIELDS, SavePipeline
+
+
+class FakeSpider:
+    logger = logging.getLogger("test")
+
+
+@pytest.mark.unit
+def test_save_pipeline_streams_items(tmp_path):
+    items = [
+        MyprojectItem(name="Люстра", price="12 990", currency="руб.", url="https://example.com/1",
+                      instock_text="В наличии: 3 шт.", instock_schema="http://schema.org/InStock"),
+        MyprojectItem(name="Бра <new>", price="4 590", url="https://example.com/2"),
+    ]
+    pipeline = SavePipeline(output_dir=tmp_path, flush_every=1)
+    spider = FakeSpider()
+    pipeline.open_spider(spider)
+    pipeline.process_item(items[0], spider)
+
+    # Первый товар уже на диске до закрытия паука
+    assert "https://example.com/1" in (tmp_path / "results.jsonl").read_text(encoding="utf-8")
+
+    pipeline.process_item(items[1], spider)
+    pipeline.close_spider(spider)
+
+    # Колонки и заголовки — как у saver.save_all, отсутствующие поля пустые
+    assert FIELDS == ["name", "price", "currency", "url", "instock_text", "instock_schema"]
+    headers = [saver.HEADER_NAMES.get(field, field) for field in FIELDS]
+    with (tmp_path / "results.csv").open(encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == headers and rows[2][:4] == ["Бра <new>", "4 590", "", "https://example.com/2"]
+    assert [row["name"] for row in json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))] == \
+        ["Люстра", "Бра <new>"]
+    sheet = openpyxl.load_workbook(tmp_path / "results.xlsx").active
+    assert [cell.value for cell in sheet[1]] == headers and sheet["A3"].value == "Бра <new>"
+    html = (tmp_path / "results.html").read_text(encoding="utf-8")
+    assert "Бра &lt;new&gt;" in html and html.rstrip().endswith("</html>")
@@ -0,0 +1,39 @@
+# test_product.py
+import json
+import pytest
+from myproject import saver
+from myproject.product import NO_DATA, Product
+
+
+@pytest.mark.unit
+def test_product_behaves_like_dict():
+    product = Product(name="Люстра", price="12 990", currency="руб.", url="https://example.com/1")
+
+    assert not hasattr(product, "__dict__")
+    assert product["url"] == "https://example.com/1"
+    assert product.get("missing", "") == ""
+    assert product == {"name": "Люстра", "price": "12 990", "currency": "руб.", "url": "https://example.com/1",
+                       "instock_text": NO_DATA, "instock_schema": NO_DATA}
+    assert Product.from_dict(dict(product, extra=1)) == product
+
+
+@pytest.mark.unit
+def test_low_cardinality_fields_are_interned():
+    first = Product(currency="".join(["руб", "."]), instock_text="".join(["В наличии: ", "7 шт."]))
+    second = Product(currency="".join(["руб", "."]), instock_text="".join(["В наличии: ", "7 шт."]))
+
+    assert first.currency is second.currency
+    assert first.instock_text is second.instock_text
+
+
+@pytest.mark.unit
+def test_product_converts_to_item_and_saves(tmp_path):
+    pytest.importorskip("scrapy")
+    from myproject.myproject.items import MyprojectItem
+
+    product = Product(name="Бра", price="4 590", url="https://example.com/2")
+    assert dict(product.to_item(MyprojectItem)) == product.to_dict()
+
+    saver.OUTPUT_DIR = tmp_path
+    saver.save_json([product], filename="products.json")
+    assert json.loads((tmp_path / "products.json").read_text(encoding="utf-8")) == [product.to_dict()]
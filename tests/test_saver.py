@@ -89,3 +89,192 @@ def test_render_html(tmp_path):
     assert "Люстра" in content
     assert "12990" in content
     assert "https://example.com/lamp" in content
+
+
+@pytest.mark.unit
+def test_sinks_write_batches(tmp_path):
+    batches = [
+        [{"name": "Люстра", "price": "12 990", "currency": "руб.", "url": "https://example.com/1", "instock_text": "Есть"}],
+        [{"name": "Бра", "price": "4 590", "currency": "руб.", "url": "https://example.com/2", "instock_text": "Нет"},
+         {"name": "Торшер", "price": "7 000", "currency": "руб.", "url": "https://example.com/3", "instock_text": "Есть"}],
+    ]
+    saver.OUTPUT_DIR = tmp_path
+    sinks = saver.make_sinks()
+    for sink in sinks:
+        with sink:
+            for batch in batches:
+                sink.write_batch(batch)
+
+    names = ["Люстра", "Бра", "Торшер"]
+    assert [row["name"] for row in json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))] == names
+    lines = (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["name"] for line in lines] == names
+    with (tmp_path / "results.csv").open(encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "Название" and [row[0] for row in rows[1:]] == names
+    sheet = openpyxl.load_workbook(tmp_path / "results.xlsx").active
+    assert [sheet.cell(row=i, column=1).value for i in range(2, 5)] == names
+    html = (tmp_path / "results.html").read_text(encoding="utf-8")
+    assert html.count("<tr>") == 4 and "Торшер" in html and html.rstrip().endswith("</html>")
+
+
+@pytest.mark.unit
+def test_save_all_shares_table(tmp_path):
+    data = [
+        {"name": "Люстра", "price": "12 990", "url": "https://example.com/1", "instock_schema": True},
+        {"name": "Бра", "currency": "руб.", "url": "https://example.com/2"},
+    ]
+    table = saver.build_table(data)
+    assert table.fields == ["name", "price", "currency", "url", "instock_schema"]
+    assert table.headers == ["Название", "Цена", "Валюта", "Ссылка", "Наличие (schema.org)"]
+    assert table.rows[1] == ["Бра", "", "руб.", "https://example.com/2", ""]
+
+    saver.OUTPUT_DIR = tmp_path
+    timings = saver.save_all(data)
+
+    assert set(timings) == {"csv", "json", "xlsx", "html"}
+    for name in ("results.csv", "results.json", "results.xlsx", "results.html"):
+        assert (tmp_path / name).exists()
+    with (tmp_path / "results.csv").open(encoding="utf-8") as f:
+        assert list(csv.reader(f))[2] == ["Бра", "", "руб.", "https://example.com/2", ""]
+
+
+@pytest.mark.unit
+def test_save_xlsx_streams_iterator(tmp_path, monkeypatch):
+    saver.OUTPUT_DIR = tmp_path
+    monkeypatch.setattr(saver, "XLSX_MAX_HYPERLINKS", 2)
+    records = ({"name": f"Люстра {i}", "url": f"https://example.com/{i}"} for i in range(3))
+    saver.save_xlsx(records, filename="stream.xlsx")
+
+    sheet = openpyxl.load_workbook(tmp_path / "stream.xlsx").active
+    assert [cell.value for cell in sheet[1]] == ["Название", "Ссылка"]
+    assert sheet.max_row == 4
+    assert sheet["B2"].hyperlink.target == "https://example.com/0"
+    # Сверх лимита ссылки пишутся обычным текстом
+    assert sheet["B4"].hyperlink is None and sheet["B4"].value == "https://example.com/2"
+    assert sheet.column_dimensions["B"].width == saver.XLSX_COLUMN_WIDTHS["url"]
+    assert sheet.freeze_panes == "A2"
+
+
+@pytest.mark.unit
+def test_xlsx_sink_falls_back_when_file_locked(tmp_path, monkeypatch):
+    from openpyxl.workbook.workbook import Workbook
+
+    saver.OUTPUT_DIR = tmp_path / "output"
+    reports = tmp_path / "reports"
+    save = Workbook.save
+
+    def locked(self, filename):
+        if filename == reports / "locked.xlsx":
+            raise PermissionError(filename)
+        save(self, filename)
+
+    monkeypatch.setattr(Workbook, "save", locked)
+    # Временное имя — рядом с заблокированным файлом, а не в OUTPUT_DIR
+    with saver.XlsxSink(str(reports / "locked.xlsx")) as sink:
+        sink.write_batch([{"name": "Бра", "url": "https://example.com/1"}])
+
+    saved = list(reports.glob("locked_*.xlsx"))
+    assert len(saved) == 1
+    assert openpyxl.load_workbook(saved[0]).active["A2"].value == "Бра"
+
+
+@pytest.mark.unit
+def test_render_html_paginates_large_reports(tmp_path):
+    data = [{"name": f"Люстра {i}", "url": f"https://example.com/{i}"} for i in range(5)]
+    saver.OUTPUT_DIR = tmp_path
+    saver.render_html(data, filename="big.html", page_size=2)
+
+    pages = [tmp_path / name for name in ("big.html", "big_2.html", "big_3.html")]
+    assert [page.read_text(encoding="utf-8").count("<td><a ") for page in pages] == [2, 2, 1]
+    middle = pages[1].read_text(encoding="utf-8")
+    assert 'href="big.html"' in middle and 'href="big_3.html"' in middle and "Страница 2 из 3" in middle
+
+
+@pytest.mark.unit
+def test_html_sink_starts_new_page(tmp_path):
+    saver.OUTPUT_DIR = tmp_path
+    with saver.HtmlSink("sink.html", page_size=2) as sink:
+        sink.write_batch([{"name": "a", "url": "u1"}, {"name": "b", "url": "u2"}, {"name": "c", "url": "u3"}])
+
+    first = (tmp_path / "sink.html").read_text(encoding="utf-8")
+    second = (tmp_path / "sink_2.html").read_text(encoding="utf-8")
+    assert first.count("<td><a ") == 2 and 'href="sink_2.html"' in first
+    assert second.count("<td><a ") == 1 and 'href="sink.html"' in second
+    assert second.rstrip().endswith("</html>")
+
+
+@pytest.mark.unit
+def test_sinks_share_columns(tmp_path):
+    import csv
+
+    saver.OUTPUT_DIR = tmp_path
+    records = [{"name": "Бра", "url": "u1", "instock_schema": "InStock"}]
+    for sink in (saver.CsvSink("sink.csv"), saver.HtmlSink("sink.html"), saver.XlsxSink("sink.xlsx")):
+        with sink:
+            sink.write_batch(records)
+
+    with open(tmp_path / "sink.csv", encoding="utf-8") as f:
+        headers = next(csv.reader(f))
+    assert headers == ["Название", "Ссылка", "Наличие (schema.org)"]
+    html = (tmp_path / "sink.html").read_text(encoding="utf-8")
+    assert all(f"<th>{header}</th>" in html for header in headers) and "InStock" in html
+    assert [cell.value for cell in openpyxl.load_workbook(tmp_path / "sink.xlsx").active[1]] == headers
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_arrow_formats_are_typed(tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    data = [
+        {"name": "Торшер", "price": "13 990", "currency": "руб.", "url": "https://example.com/1",
+         "instock_text": "В наличии: более 20 шт."},
+        {"name": "Бра", "price": "нет данных", "currency": "нет данных", "url": "https://example.com/2",
+         "instock_text": "В наличии в других цветах: 471 шт."},
+        {"name": "Люстра", "price": "4990", "currency": "руб.", "url": "https://example.com/3",
+         "instock_text": "нет данных"},
+    ]
+    saver.OUTPUT_DIR = tmp_path
+    # Маленькие группы строк: словарь валют дописывается между пачками
+    getattr(saver, f"save_{fmt}")(data, row_group_size=1)
+
+    path = tmp_path / f"results.{fmt}"
+    table = pyarrow.parquet.read_table(path) if fmt == "parquet" else pyarrow.feather.read_table(path)
+    assert table.schema.field("price").type == pa.int64()
+    assert pa.types.is_dictionary(table.schema.field("currency").type)
+    assert pa.types.is_timestamp(table.schema.field("scraped_at").type)
+    assert table.column("price").to_pylist() == [13990, None, 4990]
+    assert table.column("currency").to_pylist() == ["руб.", "нет данных", "руб."]
+    assert table.column("in_stock").to_pylist() == [True, False, None]
+    assert table.column("stock_count").to_pylist() == [20, None, None]
+    if fmt == "parquet":
+        assert pyarrow.parquet.ParquetFile(path).num_row_groups == 3
+
+
+@pytest.mark.unit
+def test_save_sqlite_upserts_and_keeps_history(tmp_path):
+    import sqlite3
+    from datetime import datetime, timedelta, timezone
+
+    saver.OUTPUT_DIR = tmp_path
+    now = datetime.now(timezone.utc)
+    lamp = {"name": "Люстра", "price": "12 990", "currency": "руб.", "url": "https://example.com/1?utm_source=x",
+            "instock_text": "В наличии: 3 шт."}
+    sconce = {"name": "Бра", "price": "4 590", "currency": "руб.", "url": "https://example.com/2",
+              "instock_text": "В наличии: 1 шт."}
+    saver.save_sqlite([lamp, sconce], observed_at=now - timedelta(days=2))
+    saver.save_sqlite([lamp, sconce], observed_at=now - timedelta(days=1))  # без изменений
+    saver.save_sqlite([dict(lamp, price="11 490"), dict(sconce, instock_text="Нет в наличии")], observed_at=now)
+
+    db = sqlite3.connect(tmp_path / "results.sqlite")
+    assert db.execute("SELECT url, price FROM products ORDER BY url").fetchall() == [
+        ("https://example.com/1", 11490), ("https://example.com/2", 4590)]
+    assert db.execute("SELECT COUNT(*) FROM price_history").fetchone()[0] == 4
+    db.close()
+
+    changes = saver.price_changes(days=7)
+    assert [(url, old, new) for url, _, old, new in changes] == [("https://example.com/1", 12990, 11490)]
+    assert [url for url, _ in saver.out_of_stock(days=7)] == ["https://example.com/2"]
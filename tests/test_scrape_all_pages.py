@@ -0,0 +1,113 @@
+# test_scrape_all_pages.py
+import json
+import random
+import time
+import pytest
+from myproject import saver, scraper
+from myproject.throttle import RateLimiter
+
+
+def make_fake_section(pages):
+    """Подменяет scrape_section: отдает товары по номеру страницы из URL."""
+    calls = []
+
+    def fake_scrape_section(url, headless=False, timeout=60, pool=None, page_info=None, **kwargs):
+        page = int(url.rsplit("page=", 1)[1])
+        calls.append(page)
+        time.sleep(random.uniform(0, 0.01))  # перемешиваем порядок завершения
+        return [dict(item) for item in pages.get(page, [])]
+
+    return fake_scrape_section, calls
+
+
+PAGES = {
+    0: [{"name": "a", "url": "u1"}, {"name": "b", "url": "u2"}],
+    1: [{"name": "b", "url": "u2"}, {"name": "c", "url": "u3"}],
+    2: [{"name": "d", "url": "u4"}],
+}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 3])
+def test_pages_merged_in_order_with_dedup(monkeypatch, workers):
+    fake, calls = make_fake_section(PAGES)
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+
+    data = scraper.scrape_all_pages("https://example.com/c", max_pages=10,
+                                    delay_between_pages=0, workers=workers)
+
+    assert [item["url"] for item in data] == ["u1", "u2", "u3", "u4"]
+    # Пустая страница 3 останавливает обход, окно не уходит дальше workers страниц
+    assert max(calls) <= 3 + workers - 1
+
+
+@pytest.mark.unit
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(max_rps=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 3])
+def test_pages_planned_from_first_page(monkeypatch, workers):
+    pages = {n: [{"name": str(n), "url": f"u{n}"}] for n in range(10)}
+    fake, calls = make_fake_section(pages)
+
+    def planned(url, page_info=None, **kwargs):
+        if page_info is not None:
+            page_info["page_count"] = 4
+        return fake(url)
+
+    monkeypatch.setattr(scraper, "scrape_section", planned)
+
+    data = scraper.scrape_all_pages("https://example.com/c", max_pages=10,
+                                    delay_between_pages=0, workers=workers)
+
+    assert [item["url"] for item in data] == ["u0", "u1", "u2", "u3"]
+    assert sorted(calls) == [0, 1, 2, 3]
+
+
+@pytest.mark.unit
+def test_pages_streamed_to_sinks(monkeypatch, tmp_path):
+    fake, _ = make_fake_section(PAGES)
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+    monkeypatch.setattr(saver, "OUTPUT_DIR", tmp_path)
+
+    data = scraper.scrape_all_pages("https://example.com/c", delay_between_pages=0,
+                                    sinks=[saver.JsonLinesSink()], collect=False)
+
+    assert data == []
+    lines = (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["url"] for line in lines] == ["u1", "u2", "u3", "u4"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 3])
+def test_iter_products_stops_early(monkeypatch, workers):
+    pages = {n: [{"name": str(n), "url": f"u{n}"}] for n in range(10)}
+    fake, calls = make_fake_section(pages)
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+    closed = []
+    monkeypatch.setattr(scraper.DriverPool, "close", lambda self: closed.append(self))
+
+    items = list(scraper.iter_products("https://example.com/c", limit=2, max_pages=10,
+                                       delay_between_pages=0, workers=workers))
+
+    assert [item["url"] for item in items] == ["u0", "u1"]
+    # Дальше окна параллельной загрузки страницы не запрашиваются, пул закрыт сразу
+    assert max(calls) <= 1 + workers
+    assert len(closed) == 1
+
+
+@pytest.mark.unit
+def test_iter_products_until(monkeypatch):
+    fake, _ = make_fake_section(PAGES)
+    monkeypatch.setattr(scraper, "scrape_section", fake)
+
+    items = list(scraper.iter_products("https://example.com/c", delay_between_pages=0,
+                                       until=lambda item: item["name"] == "c"))
+
+    assert [item["url"] for item in items] == ["u1", "u2", "u3"]